@@ -1,22 +1,155 @@
+import hashlib
+import io
+import json
 import logging
+import os
 import pickle
+import struct
+import zlib
 from typing import Dict
 
 from hardware.Configuration import Configuration
 from hardware.Interface import Interface
+from runtime.RuntimePlan import RuntimePlan
+from exceptions import InvalidUserConfigException
+
+# User config file format, all values are little endian
+#   Header: magic "ZUSR", format version u16, reserved u16, payload length u32, payload crc32 u32
+#   Payload: utf-8 json of the config, its "Version" is the schema version handled by the migrations
+MAGIC = b"ZUSR"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHHII")
+
+class OptionalKey:
+    """ Marks a schema entry that may be left out """
+    def __init__(self, schema):
+        self.schema = schema
+
+class ListOf:
+    """ A schema for lists of an exact length, each item matching the given schema """
+    def __init__(self, schema, length:int):
+        self.schema = schema
+        self.length = length
+
+class MapOf:
+    """ A schema for dictionaries with any string keys, each value matching the given schema """
+    def __init__(self, schema):
+        self.schema = schema
+
+Number = (int, float)
+
+# Dictionaries list their known keys, extra keys are allowed. Lists hold the schema of each item
+SCHEMA = {
+    "Version": int,
+    "Hardware": [{
+        "Name": str,
+        "Library": OptionalKey(str),
+        "Arguments": dict,
+        "Brightness": Number,
+        "Gamma": OptionalKey(Number),
+        "White_balance": OptionalKey(ListOf(Number, 3)),
+        "Width": int,
+        "Height": int
+    }],
+    "Interfaces": [{
+        "Hardware": str,
+        "Name": str,
+        "Form": int,
+        "Offset": [int],
+        "Size": [int],
+        "Strip": OptionalKey(dict)
+    }],
+    "Groups": [{
+        "Name": str,
+        "Members": [{"Interface": str, "Transform": OptionalKey(str)}]
+    }],
+    "Sets": MapOf({
+        "Name": str,
+        "Trigger_bindings": OptionalKey(MapOf(dict)),
+        "Animations": [{
+            "Name": str,
+            "Path": str,
+            "Package": OptionalKey((str, type(None))),
+            "Arguments": OptionalKey(dict)
+        }]
+    })
+}
+
+def validate(value, schema, path:str="UserConfig"):
+    """ Checks a config value against a schema
+
+    Args:
+        value: The value to check
+        schema: A type or tuple of types, a list, dictionary, OptionalKey, ListOf or MapOf schema
+        path: (OPTIONAL) Where the value is in the config, used in error messages
+    Raises:
+        InvalidUserConfigException: The value doesn't match the schema
+    """
+    if isinstance(schema, OptionalKey):
+        schema = schema.schema
+
+    if isinstance(schema, MapOf):
+        if not isinstance(value, dict):
+            raise InvalidUserConfigException(f"{path} must be a dictionary")
+        for key, item in value.items():
+            if not isinstance(key, str):
+                raise InvalidUserConfigException(f"{path} has a key that isn't a string")
+            validate(item, schema.schema, f"{path}.{key}")
+    elif isinstance(schema, ListOf):
+        if not isinstance(value, list) or len(value) != schema.length:
+            raise InvalidUserConfigException(f"{path} must be a list of {schema.length}")
+        for index, item in enumerate(value):
+            validate(item, schema.schema, f"{path}[{index}]")
+    elif isinstance(schema, dict):
+        if not isinstance(value, dict):
+            raise InvalidUserConfigException(f"{path} must be a dictionary")
+        for key, item_schema in schema.items():
+            if key in value:
+                validate(value[key], item_schema, f"{path}.{key}")
+            elif not isinstance(item_schema, OptionalKey):
+                raise InvalidUserConfigException(f"{path} is missing {key}")
+    elif isinstance(schema, list):
+        if not isinstance(value, list):
+            raise InvalidUserConfigException(f"{path} must be a list")
+        for index, item in enumerate(value):
+            validate(item, schema[0], f"{path}[{index}]")
+    elif not isinstance(value, schema):
+        raise InvalidUserConfigException(f"{path} has the wrong type {type(value).__name__}")
+
+def _migrate_v1(config:dict) -> dict:
+    """ Version 1 saved hardware as a dictionary keyed by name and didn't save groups or sets """
+    hardware = config.get("Hardware", {})
+    config["Hardware"] = list(hardware.values()) if isinstance(hardware, dict) else hardware
+    config.setdefault("Groups", [])
+    config.setdefault("Sets", {})
+    return config
+
+# Upgrades a config from the keyed version to the next version
+MIGRATIONS = {
+    1: _migrate_v1
+}
+
+class RestrictedUnpickler(pickle.Unpickler):
+    """
+        Unpickler for legacy user configs which only allows plain data, loading any class or function fails
+        so an untrusted file can't run code
+    """
+    def find_class(self, module:str, name:str):
+        raise InvalidUserConfigException(f"Legacy user config references {module}.{name}, only plain data is allowed")
 
 class UserConfig:
     """
         Represents a users configuration, this is normally directed at a binary file for configuration
         Use this class for the following:
             Hardware configuration
-            Profiles config
+            Interfaces and interface groups
+            Animation sets
     """
-    VERSION = 1
+    VERSION = 2
 
     def __init__(self, config_path:str):
         """ Creates an instance of UserConfig
-        
+
         Args:
             config_path: The full path to user configuration file
         """
@@ -25,41 +158,124 @@ class UserConfig:
 
         self._hardware = {}
         self.interfaces = []
+        self.groups = []
         self.sets = {}
-    
+        self.plan = None
+
     @property
     def hardware(self) -> Dict[str, Configuration]:
         return self._hardware
-    
+
+    @property
+    def plan_path(self) -> str:
+        return self._filepath + ".plan"
+
+    @staticmethod
+    def migrate(config:dict) -> dict:
+        """ Upgrades a config to the current version
+
+        Args:
+            config: The config as loaded, of any supported version
+        Returns:
+            dict: The config at the current version
+        Raises:
+            InvalidUserConfigException: The config is from a newer or unsupported version
+        """
+        version = config.get("Version") if isinstance(config, dict) else None
+        if not isinstance(version, int) or version > UserConfig.VERSION:
+            raise InvalidUserConfigException(f"Unsupported user config version {version}")
+        while version < UserConfig.VERSION:
+            if version not in MIGRATIONS:
+                raise InvalidUserConfigException(f"No migration from user config version {version}")
+            logging.info(f"Migrating user config from version {version}")
+            config = MIGRATIONS[version](config)
+            version += 1
+            config["Version"] = version
+        return config
+
+    def _read(self) -> tuple:
+        """ Reads the user config file, legacy pickled configs are loaded with a restricted unpickler
+
+        Returns:
+            tuple: The config and the bytes it was decoded from
+        Raises:
+            InvalidUserConfigException: The file is corrupt or not a user config
+        """
+        with open(self._filepath, "rb") as usrFile:
+            data = usrFile.read()
+
+        if data[:len(MAGIC)] != MAGIC:
+            logging.info("Loading legacy pickled user config, it will be converted when next saved")
+            try:
+                return RestrictedUnpickler(io.BytesIO(data)).load(), data
+            except (pickle.UnpicklingError, EOFError, ValueError) as error:
+                raise InvalidUserConfigException(f"{self._filepath} is not a user config: {error}")
+
+        if len(data) < HEADER.size:
+            raise InvalidUserConfigException(f"{self._filepath} is truncated")
+        _, format_version, _, length, crc = HEADER.unpack_from(data, 0)
+        if format_version != FORMAT_VERSION:
+            raise InvalidUserConfigException(f"Unsupported user config format {format_version}")
+        payload = data[HEADER.size:HEADER.size + length]
+        if len(payload) != length or zlib.crc32(payload) != crc:
+            raise InvalidUserConfigException(f"{self._filepath} is corrupt, the checksum doesn't match")
+        try:
+            return json.loads(payload), payload
+        except ValueError as error:
+            raise InvalidUserConfigException(f"{self._filepath} has an invalid payload: {error}")
+
     def load_userconfig(self):
-        """ Loads the assigned user configuration into this object """
+        """ Loads the assigned user configuration into this object
+        The config is only validated when its runtime plan isn't cached, a cached plan means this exact config
+        has already been validated
+
+        Raises:
+            InvalidUserConfigException: The config is corrupt, unsupported or doesn't match the schema
+        """
         logging.debug("Loading user config")
+        config, data = self._read()
+        config = self.migrate(config)
+        logging.debug(f"User config version: {config['Version']}")
 
-        with open(self._filepath, "rb") as usrFile:
-            config = pickle.load(usrFile)
+        config_hash = hashlib.sha256(data).hexdigest()
+        plan = RuntimePlan.load(self.plan_path, config_hash)
+        if plan is None:
+            validate(config, SCHEMA)
+            plan = RuntimePlan.compile(config, config_hash)
+            plan.save(self.plan_path)
+        self.plan = plan
 
-        version = config["Version"]
-        logging.debug(f"User config version: {version}")
-        
         self.hardware.clear()
         for hardware_config in config["Hardware"]:
             self.hardware[hardware_config["Name"]] = Configuration()
             self.hardware[hardware_config["Name"]].load_from_user_config(hardware_config)
-        
+
         self.interfaces = config["Interfaces"]
+        self.groups = config["Groups"]
+        self.sets = config["Sets"]
 
     def save_userconfig(self):
-        """ Saves the settings in this object to the user configuration file """
+        """ Saves the settings in this object to the user configuration file
+        The file is replaced atomically, so a power cut while saving leaves the previous config intact
+
+        Raises:
+            InvalidUserConfigException: The settings don't match the schema
+        """
         logging.debug("Saving user config")
-        
+
         config = {}
         config["Version"] = self.VERSION
-
-        hardware_configs = {}
-        for hardware in self.hardware.values():
-            hardware_configs[hardware.name] = hardware.format_as_dictionary()
-        config["Hardware"] = hardware_configs
+        config["Hardware"] = [hardware.format_as_dictionary() for hardware in self.hardware.values()]
         config["Interfaces"] = self.interfaces
+        config["Groups"] = self.groups
+        config["Sets"] = self.sets
+        validate(config, SCHEMA)
 
-        with open(self._filepath, "wb") as usrFile:
-            pickle.dump(config, usrFile)
+        payload = json.dumps(config, separators=(",", ":")).encode("utf-8")
+        temporary = self._filepath + ".tmp"
+        with open(temporary, "wb") as usrFile:
+            usrFile.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(payload), zlib.crc32(payload)))
+            usrFile.write(payload)
+            usrFile.flush()
+            os.fsync(usrFile.fileno())
+        os.replace(temporary, self._filepath)
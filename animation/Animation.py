@@ -1,4 +1,7 @@
 import logging
+import threading
+import time
+from typing import Callable
 
 from animation.AnimationStatus import AnimationStatus
 from animation.IAnimation import IAnimation
@@ -9,40 +12,71 @@ class Animation:
         This is used to manage a single animation and it's class instance
     """
 
-    def __init__(self, name:str, manager:InterfaceManager, class_ref:IAnimation=None):
+    def __init__(self, name:str, manager:InterfaceManager, class_ref:IAnimation=None, arguments:dict=None,
+            loader:Callable=None):
         """ Creates an instance of Animation
+        The animation class isn't created until the animation is loaded, either when first started or by a preloader
         
         Args:
             name: The name of the animation
             manager: An instance of the interface manager, with all the relavent interfaces loaded
-            class_ref: (OPTIONAL) The class of the animation to create when started
+            class_ref: (OPTIONAL) The class of the animation to create when loaded
+            arguments: (OPTIONAL) The animation arguments from the user config
+            loader: (OPTIONAL) Called to import and return the animation class when no class is given
         """
-        self.status = AnimationStatus.Standby
-
-        if class_ref:
-            try:
-                self._instance = class_ref(manager)
-            except:
-                logging.exception(f"Failed to create instance of animation for {name}")
-                self._instance = None
-                self.status = AnimationStatus.Failed
-        else:
-            self._instance = None
+        self.status = AnimationStatus.Waiting if class_ref or loader else AnimationStatus.Standby
+        self._instance = None
+        self._class_ref = class_ref
+        self._loader = loader
+        self._arguments = arguments
+        self._lock = threading.Lock()
         
         self.name = name
         self.manager = manager
         self.triggers = []
+        self.last_used = 0
     
     @property
     def instance(self) -> IAnimation:
         return self._instance
+
+    @property
+    def loaded(self) -> bool:
+        return self._instance is not None
+
+    def load(self):
+        """ Imports and creates the animation class if it isn't already, safe to call from a preloading thread """
+        with self._lock:
+            if self._instance is not None or self.status != AnimationStatus.Waiting:
+                return
+
+            try:
+                if self._class_ref is None:
+                    self._class_ref = self._loader()
+                instance = self._class_ref(self.manager)
+                if self._arguments:
+                    instance.load_from_user_config(self._arguments)
+            except:
+                logging.exception(f"Failed to create instance of animation for {self.name}")
+                self.status = AnimationStatus.Failed
+                return
+
+            self._instance = instance
+            self.status = AnimationStatus.Standby
+
+    def memory_usage(self) -> int:
+        """ Returns the estimated bytes held by the animation instance, 0 when not loaded """
+        instance = self._instance
+        return instance.memory_usage() if instance is not None else 0
     
     def start(self):
         """ Starts the animation """
+        self.load()
         if self.status in [AnimationStatus.Failed, AnimationStatus.Disabled]:
             logging.warning(f"Cannot start animation {self.name}, animation is in state {self.status.name}")
             return
         
+        self.last_used = time.monotonic()
         if self.instance is not None:
             self.status = AnimationStatus.Running
             self.instance.start()
@@ -52,15 +86,37 @@ class Animation:
         if self.instance:
             self.instance.update()
 
+    def set_parameter(self, name:str, value):
+        """ Sets a parameter of the animation, loading it first if needed
+
+        Args:
+            name: The name of the parameter
+            value: The new value of the parameter
+        """
+        self.load()
+        if self.instance is not None:
+            self.instance.set_parameter(name, value)
+
     def stop(self):
         """ Stops the current animation """
         if self.instance:
             self.status = AnimationStatus.Standby
+            self.last_used = time.monotonic()
             self.instance.stop()
         
     def teardown(self):
         """ Tears down the animation """
-        if self.instance:
-            self.instance.teardown()
-            self._instance = None
+        with self._lock:
+            if self.instance:
+                self.instance.teardown()
+                self._instance = None
+
+    def unload(self):
+        """ Tears down the animation instance to free its memory, it will be loaded again when next used """
+        with self._lock:
+            if self.instance:
+                logging.debug(f"Unloading idle animation {self.name}")
+                self.instance.teardown()
+                self._instance = None
+                self.status = AnimationStatus.Waiting
 
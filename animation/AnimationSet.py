@@ -1,29 +1,69 @@
 import logging
 import importlib
+import functools
+import threading
 
 from animation.Animation import Animation
 from animation.AnimationStatus import AnimationStatus
+from animation.Transition import Transition, TransitionType
 from hardware.InterfaceManager import InterfaceManager
 from exceptions import UnknownAnimationException
 
 class AnimationSet:
     """
         Represents a set containing one or more animations
+        Animations are created on first use or warmed up by a background preloader, idle animations are
+        unloaded when the set goes over its memory budget
     """
-    def __init__(self, config:dict):
+    def __init__(self, config:dict, modules:dict=None):
         """ Creates an instance of AnimationSet
         
         Args:
             config: The configuration provided from the user config file
+            modules: (OPTIONAL) Animation name to absolute module path, as resolved by the runtime plan
         """
         self._config = config
+        self._modules = modules or {}
         self.name = config["Name"]
+        self.preload = config.get("Preload", True)  # True, False or a list of animation names
+        self.memory_budget = config.get("Memory_budget", None)  # Bytes, unlimited if not set
+        self.max_loaded = config.get("Max_loaded", None)  # Animation instances, unlimited if not set
+
+        transition = config.get("Transition", {})
+        self.transition = TransitionType[transition.get("Type", "Cut")]  # Default transition between animations
+        self.transition_duration = transition.get("Duration", 0.3)
 
         self._current_animation = None
+        self._transition = None
+        self._transition_buffers = {}
+        self._manager = None
         self.animations = {}
+
+        self._preloader = None
+        self._preloading = False
+    
+    @staticmethod
+    def import_animation(config:dict, module:str=None) -> type:
+        """ Imports the animation class for the given config
+        
+        Args:
+            config: The configuration within the user config for the animation
+            module: (OPTIONAL) The already resolved absolute module of the animation
+        Returns:
+            type: The animation class
+        """
+        if module is not None:
+            library = importlib.import_module(module)
+        else:
+            library = importlib.import_module(config["Path"], config.get("Package"))
+        try:
+            return getattr(library, config["Path"].split(".")[-1])
+        except AttributeError:
+            logging.error(f"Failed to get animation class, have you named it the same as the file?")
+            raise
     
     def load_animation(self, config:dict, manager:InterfaceManager) -> Animation:
-        """ Loads the given animation by the provided config
+        """ Creates the animation for the given config, its module is imported when the animation is loaded
         
         Args:
             config: The configuration within the user config for the animation
@@ -31,61 +71,144 @@ class AnimationSet:
         Returns:
             Animation: The animation instance
         """
-        failure = False
-        try:
-            library = importlib.import_module(config["Path"], config["Package"])
-        except:
-            logging.exception(f"Failed to load animation {config['Name']}")
-            failure = True
-
-        if not failure:
-            try:
-                class_obj = getattr(library, config["Path"].split(".")[-1])
-            except:
-                logging.exception(f"Failed to get animation class, have you named it the same as the file?")
-                failure = True
-        
-        if failure:
-            anim = Animation(config["Name"], manager)
-            anim.status = AnimationStatus.Failed
-            return anim
-        else:
-            anim = Animation(config["Name"], manager, class_obj)
-            return anim
+        if config.get("Isolated", False):
+            # Runs in a worker process, "Isolated" may be true or a dictionary of options
+            from animation.IsolatedAnimation import IsolatedAnimation  # Imports multiprocessing, so only when used
+            options = config["Isolated"] if isinstance(config["Isolated"], dict) else {}
+            isolated = functools.partial(IsolatedAnimation, path=config["Path"], package=config.get("Package"),
+                rate=options.get("Rate", IsolatedAnimation.DEFAULT_RATE))
+            return Animation(config["Name"], manager, isolated, config.get("Arguments"))
+
+        return Animation(config["Name"], manager, arguments=config.get("Arguments"),
+            loader=lambda: self.import_animation(config, self._modules.get(config["Name"])))
         
-    def load_animations(self, manager:InterfaceManager):
-        """ Create all animation instances within the set, ready for preloading
+    def load_animations(self, manager:InterfaceManager, preload:bool=True):
+        """ Create all animations within the set and starts preloading them in the background
         
         Args:
             manager: The interface manager
+            preload: (OPTIONAL) Start preloading now, otherwise call start_preloading later
         """
+        self._manager = manager
         for animation in self._config["Animations"]:
-            logging.debug(f"Loading animation {animation['Name']}")
+            logging.debug(f"Adding animation {animation['Name']}")
             self.animations[animation["Name"]] = self.load_animation(animation, manager)
+
+        if preload:
+            self.start_preloading()
+
+    def start_preloading(self):
+        """ Starts loading the sets animations on a background thread, if the set preloads """
+        if self.preload and self._preloader is None:
+            names = list(self.animations) if self.preload is True else list(self.preload)
+            self._preloading = True
+            self._preloader = threading.Thread(target=self._preload_loop, args=(names,),
+                name=f"Preload {self.name}", daemon=True)
+            self._preloader.start()
+
+    def _preload_loop(self, names:list):
+        """ Preloading thread, loads the given animations until the set is full
+        
+        Args:
+            names: The animations to preload in order
+        """
+        for name in names:
+            if not self._preloading or self._over_budget():
+                break
+            if name in self.animations:
+                self.animations[name].load()
+        logging.debug(f"Finished preloading set {self.name}")
+    
+    def _over_budget(self, extra:int=1) -> bool:
+        """ Checks if the loaded animations, plus extra instances about to load, exceed the set limits
+        
+        Args:
+            extra: (OPTIONAL) The number of extra animations that will be loaded
+        Returns:
+            bool: If the set is over its limit
+        """
+        loaded = [animation for animation in self.animations.values() if animation.loaded]
+        if self.max_loaded is not None and len(loaded) + extra > self.max_loaded:
+            return True
+        if self.memory_budget is not None and \
+                sum(animation.memory_usage() for animation in loaded) > self.memory_budget:
+            return True
+        return False
+
+    def enforce_budget(self):
+        """ Unloads the least recently used idle animations until the set is within its limits """
+        in_use = [self.current_animation]
+        if self._transition is not None:
+            in_use.append(self._transition.outgoing)
+        idle = sorted(
+            (animation for animation in self.animations.values()
+                if animation.loaded and animation not in in_use),
+            key=lambda animation: animation.last_used
+        )
+        for animation in idle:
+            if not self._over_budget(0):
+                break
+            animation.unload()
     
     @property
     def current_animation(self) -> Animation:
         return self._current_animation
     
-    def change_animation(self, name:str):
+    @property
+    def transitioning(self) -> bool:
+        return self._transition is not None
+    
+    def change_animation(self, name:str, transition:TransitionType=None, duration:float=None):
         """ Changes the current animation in the set to the specified
 
         Args:
             name: The name of the animation to load
+            transition: (OPTIONAL) How to transition from the current animation, the sets default if not given
+            duration: (OPTIONAL) The length of the transition in seconds, the sets default if not given
         """
 
         if name in self.animations:
-            if self.current_animation is not None:
-                self.current_animation.stop()
+            if self._transition is not None:
+                self._transition.finish()
+                self._transition = None
+
+            transition = self.transition if transition is None else transition
+            duration = self.transition_duration if duration is None else duration
+            previous = self.current_animation
             
             logging.info(f"Changing to animation {name}")
             self._current_animation = self.animations[name]
-            self.current_animation.start()
+            if previous is None or previous is self.current_animation or \
+                    transition == TransitionType.Cut or duration <= 0:
+                if previous is not None:
+                    previous.stop()
+                self.current_animation.start()
+            else:
+                self.current_animation.start()
+                self._transition = Transition(transition, duration, previous, self.current_animation,
+                    self._manager.render_targets, self._transition_buffers)
+            self.enforce_budget()
         else:
             raise UnknownAnimationException(f"Unknown animation {name}")
 
+    def update(self):
+        """ Updates the current animation, rendering and blending both animations while transitioning """
+        if self._transition is not None:
+            self._transition.update()
+            if self._transition.finished:
+                self._transition.finish()
+                self._transition = None
+        elif self.current_animation is not None:
+            self.current_animation.update()
+
     def teardown(self):
-        """ Tears down all animations in this set """
+        """ Stops preloading and tears down all animations in this set """
+        self._preloading = False
+        self._transition = None
+        if self._preloader is not None:
+            self._preloader.join()
+            self._preloader = None
+
         logging.debug(f"Tearing down animation set of {len(self.animations)} animations('s)")
         for animation in self.animations.values():
             animation.teardown()
@@ -0,0 +1,146 @@
+import time
+from abc import abstractmethod
+from typing import Tuple
+import numpy
+
+from animation.IAnimation import IAnimation
+from hardware.InterfaceManager import InterfaceManager
+from hardware.Types import DisplayForms
+
+class ArrayEffect(IAnimation):
+    """
+        Base of procedural effects that compute whole frames as NumPy arrays instead of drawing per pixel
+        A frame is rendered once per interface size and handed to each interface with a single copy, written straight
+        into the framebuffer of interfaces bound to one and decoded into the image of the rest
+
+        Arguments:
+            Interfaces: (OPTIONAL) Names of the interfaces to show the effect on, all matrix interfaces by default
+            Speed: (OPTIONAL) How fast the effect moves, defaults to 1
+    """
+    PARAMETERS = ("Speed",)  # Arguments that can be changed while running through trigger bindings
+    GRID_PARAMETERS = ()  # Parameters the precomputed grids depend on, changing one recomputes the grids
+    CYCLIC_PALETTE = False  # Blend the last of the colours back into the first
+
+    def __init__(self, manager:InterfaceManager):
+        """ Creates an instance of ArrayEffect
+
+        Args:
+            manager: The instance of the interface manager with all it's interfaces loaded
+        """
+        self.manager = manager
+        self.speed = 1.0
+        self.interfaces = [interface for interface in manager.render_targets if interface.form == DisplayForms.Matrix]
+        self._time = 0.0
+        self._last = None
+        self._grids = {}  # Size to the coordinate grids of that size
+        self._palette = None
+
+    def load_from_user_config(self, config:dict):
+        for parameter in self.PARAMETERS:
+            if parameter in config:
+                self.set_parameter(parameter, config[parameter])
+        if "Interfaces" in config:
+            self.interfaces = [self.manager.get_interface(name) for name in config["Interfaces"]]
+            self.interfaces = [interface for interface in self.interfaces if interface is not None]
+
+    def set_parameter(self, name:str, value):
+        if name not in self.PARAMETERS:
+            super().set_parameter(name, value)
+            return
+        setattr(self, name.lower(), value)
+        if name == "Colours":
+            self._palette = None
+        if name in self.GRID_PARAMETERS:
+            self._grids.clear()
+
+    @property
+    def palette(self) -> numpy.ndarray:
+        """ Returns the lookup table of the effects colours, built when first used after they change """
+        if self._palette is None:
+            self._palette = palette(self.colours, cyclic=self.CYCLIC_PALETTE)
+        return self._palette
+
+    def grid(self, size:Tuple[int, int]) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """ Gets the float32 x and y pixel coordinates of a size, each shaped (height, width), computed once per size
+
+        Args:
+            size: The width and height of the frame
+        Returns:
+            tuple: The x and y coordinate arrays
+        """
+        if size not in self._grids:
+            y, x = numpy.mgrid[0:size[1], 0:size[0]].astype(numpy.float32)
+            self._grids[size] = self.prepare(size, x, y)
+        return self._grids[size]
+
+    def prepare(self, size:Tuple[int, int], x:numpy.ndarray, y:numpy.ndarray):
+        """ Precomputes whatever an effect needs per size, the coordinate grids by default
+
+        Args:
+            size: The width and height of the frame
+            x: The x coordinate of every pixel
+            y: The y coordinate of every pixel
+        Returns:
+            any: The value returned by grid for this size
+        """
+        return x, y
+
+    @abstractmethod
+    def render(self, size:Tuple[int, int], t:float) -> numpy.ndarray:
+        """ Computes a frame
+
+        Args:
+            size: The width and height of the frame
+            t: The effect time in seconds, scaled by the speed
+        Returns:
+            numpy.ndarray: The uint8 RGB frame shaped (height, width, 3)
+        """
+        pass
+
+    def start(self):
+        self._last = None
+
+    def update(self):
+        now = time.monotonic()
+        if self._last is not None:
+            self._time += (now - self._last) * self.speed
+        self._last = now
+
+        frames = {}
+        for interface in self.interfaces:
+            size = interface.size
+            if size not in frames:
+                frames[size] = self.render(size, self._time)
+
+            array = interface.array
+            if array is not None:
+                array[..., :3] = frames[size]
+            else:
+                if not frames[size].flags.c_contiguous:
+                    frames[size] = numpy.ascontiguousarray(frames[size])
+                interface.image.frombytes(frames[size])
+
+    def stop(self):
+        pass
+
+    def memory_usage(self) -> int:
+        return sum(array.nbytes for grids in self._grids.values() for array in grids if isinstance(array, numpy.ndarray))
+
+    def teardown(self):
+        self._grids.clear()
+
+def palette(colours:list, entries:int=256, cyclic:bool=False) -> numpy.ndarray:
+    """ Builds a lookup table blending evenly between colours, indexed by a uint8 frame to colour it
+
+    Args:
+        colours: The RGB colours to blend between, in order
+        entries: (OPTIONAL) The number of entries in the table
+        cyclic: (OPTIONAL) Blend the last colour back into the first, for effects that wrap around
+    Returns:
+        numpy.ndarray: The uint8 table shaped (entries, 3)
+    """
+    colours = numpy.array(colours + colours[:1] if cyclic else colours, numpy.float32)
+    stops = numpy.linspace(0, entries - 1, len(colours))
+    positions = numpy.arange(entries)
+    return numpy.stack([numpy.interp(positions, stops, colours[:, channel]) for channel in range(3)], axis=1) \
+        .round().astype(numpy.uint8)
@@ -0,0 +1,138 @@
+import logging
+import os
+import threading
+from collections import OrderedDict
+from PIL import Image
+
+from animation.FrameCache import FrameCache
+
+class AssetCache:
+    """
+        Process wide cache of decoded images, keyed by the file, the size it was scaled to, its mode and resampling
+        Animations sharing sprites get the same image instead of each decoding their own copy. Images are reference
+        counted, an image is only evicted once every animation has released it, least recently used first, when the
+        cache is over its byte budget
+        Cached images are shared and must be treated as read only, copy an image before drawing on it
+        Isolated animations run in their own process and so have their own cache
+    """
+    DEFAULT_BUDGET = 8 * 1024 * 1024
+    _shared = None
+
+    def __init__(self, byte_budget:int=DEFAULT_BUDGET):
+        """ Creates an instance of AssetCache, use shared for the process wide cache
+
+        Args:
+            byte_budget: (OPTIONAL) The bytes of unreferenced images to keep before evicting them
+        """
+        self.byte_budget = byte_budget
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # Key to [image, references, bytes], least recently used first
+        self._keys = {}  # id of a handed out image to its key
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def shared() -> "AssetCache":
+        """ Returns the process wide cache, creating it on first use """
+        if AssetCache._shared is None:
+            AssetCache._shared = AssetCache()
+        return AssetCache._shared
+
+    @staticmethod
+    def _load(path:str, size:tuple, mode:str, resample:int) -> Image.Image:
+        with Image.open(path) as image:
+            image = image.convert(mode)
+        if size is not None and image.size != size:
+            image = image.resize(size, resample)
+        return image
+
+    def acquire(self, path:str, size:tuple=None, mode:str="RGB", resample:int=Image.NEAREST) -> Image.Image:
+        """ Gets an image, decoding and scaling it if it isn't cached. Every acquire must be matched by a release
+
+        Args:
+            path: The image file
+            size: (OPTIONAL) The size to scale the image to, the files size if not given
+            mode: (OPTIONAL) The PIL mode to convert the image to
+            resample: (OPTIONAL) The PIL resampling filter used when scaling
+        Returns:
+            Image.Image: The shared, read only image
+        Raises:
+            OSError: The file couldn't be opened or decoded
+        """
+        key = (os.path.abspath(path), tuple(size) if size is not None else None, mode, resample)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                entry[1] += 1
+                self._entries.move_to_end(key)
+                return entry[0]
+            self.misses += 1
+
+        # Decoding can be slow, so it's done outside the lock and the first of any racing decodes is kept
+        image = self._load(path, key[1], mode, resample)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = [image, 0, FrameCache.image_bytes(image)]
+                self._entries[key] = entry
+                self._keys[id(image)] = key
+                self.used_bytes += entry[2]
+            entry[1] += 1
+            self._evict()
+            return entry[0]
+
+    def release(self, image:Image.Image) -> bool:
+        """ Releases an image from acquire, once it has no references it may be evicted
+
+        Args:
+            image: The image to release
+        Returns:
+            bool: True if the image came from this cache
+        """
+        with self._lock:
+            key = self._keys.get(id(image))
+            entry = self._entries.get(key)
+            if entry is None or entry[0] is not image:
+                return False
+            if entry[1] <= 0:
+                logging.warning(f"Asset {key[0]} was released more times than it was acquired")
+                return True
+            entry[1] -= 1
+            self._evict()
+            return True
+
+    def _evict(self):
+        """ Evicts unreferenced images, least recently used first, until the cache is within budget """
+        if self.used_bytes <= self.byte_budget:
+            return
+        for key in [key for key, entry in self._entries.items() if entry[1] == 0]:
+            image, _, size = self._entries.pop(key)
+            del self._keys[id(image)]
+            self.used_bytes -= size
+            if self.used_bytes <= self.byte_budget:
+                return
+
+    def clear(self):
+        """ Removes every unreferenced image, images still in use stay cached """
+        with self._lock:
+            budget, self.byte_budget = self.byte_budget, -1
+            self._evict()
+            self.byte_budget = budget
+
+    def stats(self) -> dict:
+        """ Returns the cache usage for debugging and the API
+
+        Returns:
+            dict: The number of images, referenced images, bytes used, budget, hits and misses
+        """
+        with self._lock:
+            return {
+                "Images": len(self._entries),
+                "Referenced": sum(1 for entry in self._entries.values() if entry[1] > 0),
+                "Bytes": self.used_bytes,
+                "Budget": self.byte_budget,
+                "Hits": self.hits,
+                "Misses": self.misses
+            }
@@ -0,0 +1,89 @@
+import glob
+import os
+import threading
+from typing import Dict, List, Tuple
+from PIL import Image
+
+from animation.AssetCache import AssetCache
+
+class ClipDecoder:
+    """
+        Decodes frames of an animated image (GIF, APNG, WebP) or an image sequence one at a time when requested
+        Frames are returned already scaled to the requested sizes, nothing is decoded up front
+        Frames of still images and image sequences can come from an asset cache, so sprites used by several clips
+        are only decoded once
+    """
+    DEFAULT_DURATION = 0.1  # Seconds per frame when the file doesn't specify one
+    SEQUENCE_EXTENSIONS = (".png", ".gif", ".bmp", ".jpg", ".jpeg", ".webp")
+
+    def __init__(self, path:str, resample:int=Image.NEAREST, assets:AssetCache=None):
+        """ Creates an instance of ClipDecoder
+
+        Args:
+            path: An animated or still image, a directory of images or a glob pattern of images
+            resample: (OPTIONAL) The PIL resampling filter used when scaling frames
+            assets: (OPTIONAL) The asset cache still frames are acquired from, the caller releases them
+        Raises:
+            FileNotFoundError: No images were found at the path
+        """
+        self.path = path
+        self.resample = resample
+        self.assets = assets
+        self._lock = threading.Lock()
+        self._image = None
+        self._files = []
+
+        if os.path.isdir(path):
+            self._files = sorted(
+                os.path.join(path, file) for file in os.listdir(path)
+                if file.lower().endswith(self.SEQUENCE_EXTENSIONS)
+            )
+        elif glob.has_magic(path):
+            self._files = sorted(glob.glob(path))
+        else:
+            self._image = Image.open(path)
+
+        if self._image is None and not self._files:
+            raise FileNotFoundError(f"No images found for clip {path}")
+
+    @property
+    def frame_count(self) -> int:
+        if self._image is not None:
+            return getattr(self._image, "n_frames", 1)
+        return len(self._files)
+
+    def decode(self, index:int, sizes:List[Tuple[int, int]]) -> Tuple[Dict[Tuple[int, int], Image.Image], float]:
+        """ Decodes a single frame and scales it to every requested size
+
+        Args:
+            index: The frame to decode
+            sizes: The sizes the frame is needed in
+        Returns:
+            tuple: The scaled RGB frames keyed by size, and the frame duration in seconds
+        """
+        if self.assets is not None and (self._files or self.frame_count == 1):
+            path = self._files[index] if self._files else self.path
+            return {size: self.assets.acquire(path, size, "RGB", self.resample) for size in sizes}, \
+                self.DEFAULT_DURATION
+
+        with self._lock:
+            if self._image is not None:
+                self._image.seek(index)
+                frame = self._image.convert("RGB")
+                duration = self._image.info.get("duration", 0) / 1000 or self.DEFAULT_DURATION
+            else:
+                with Image.open(self._files[index]) as image:
+                    frame = image.convert("RGB")
+                duration = self.DEFAULT_DURATION
+
+        scaled = {}
+        for size in sizes:
+            scaled[size] = frame if frame.size == size else frame.resize(size, self.resample)
+        return scaled, duration
+
+    def close(self):
+        """ Closes the open image file """
+        with self._lock:
+            if self._image is not None:
+                self._image.close()
+                self._image = None
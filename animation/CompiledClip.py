@@ -0,0 +1,210 @@
+import mmap
+import struct
+import numpy
+from typing import List, Tuple
+from PIL import Image
+
+from animation.ClipDecoder import ClipDecoder
+from exceptions import InvalidClipException
+
+# Compiled clip format, all values are little endian
+#   Header: magic "ZCLP", version u16, reserved u16, frame count u32, interface count u16, reserved u16
+#   Interfaces: name length u8, utf-8 name, width u16, height u16 (repeated per interface)
+#   Frame index: data offset u64, data length u32, duration ms u16, encoding u8, padding u8 (repeated per frame)
+#   Frame data: the RGB pixels of every interface in layout order, raw or run length encoded
+# Run length encoded frames are runs of count u8, red u8, green u8, blue u8
+MAGIC = b"ZCLP"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIHH")
+INTERFACE = struct.Struct("<HH")
+INDEX_ENTRY = struct.Struct("<QIHBx")
+
+ENCODING_RAW = 0
+ENCODING_RLE = 1
+
+def _rle_encode(pixels:bytes) -> bytes:
+    """ Run length encodes RGB pixels into (count, red, green, blue) runs of up to 255 pixels
+
+    Args:
+        pixels: The raw RGB bytes
+    Returns:
+        bytes: The encoded runs
+    """
+    values = numpy.frombuffer(pixels, numpy.uint8).reshape(-1, 3)
+    if len(values) == 0:
+        return b""
+    packed = (values[:, 0].astype(numpy.uint32) << 16) | (values[:, 1].astype(numpy.uint32) << 8) | values[:, 2]
+    starts = numpy.flatnonzero(numpy.concatenate(([True], packed[1:] != packed[:-1])))
+    lengths = numpy.diff(numpy.concatenate((starts, [len(packed)])))
+
+    runs = []
+    for start, length in zip(starts, lengths):
+        while length > 0:
+            count = min(int(length), 255)
+            runs.append(bytes((count,)) + values[start].tobytes())
+            length -= count
+    return b"".join(runs)
+
+def _rle_decode(data, pixel_count:int) -> bytes:
+    """ Decodes (count, red, green, blue) runs back into raw RGB bytes
+
+    Args:
+        data: The encoded runs
+        pixel_count: The number of pixels the runs expand to
+    Returns:
+        bytes: The raw RGB bytes
+    """
+    runs = numpy.frombuffer(data, numpy.uint8).reshape(-1, 4)
+    pixels = numpy.repeat(runs[:, 1:], runs[:, 0], axis=0)
+    if len(pixels) != pixel_count:
+        raise InvalidClipException("Run length encoded frame has the wrong number of pixels")
+    return pixels.tobytes()
+
+def compile_clip(source:str, output:str, layout:List[Tuple[str, Tuple[int, int]]], rle:bool=False,
+        resample:int=Image.NEAREST):
+    """ Compiles a clip into the compiled clip format for a specific interface layout
+
+    Args:
+        source: The clip to compile, anything ClipDecoder can open
+        output: The compiled clip file to write
+        layout: The name and size of each interface the clip is played on
+        rle: (OPTIONAL) Run length encode frames when it makes them smaller
+        resample: (OPTIONAL) The PIL resampling filter used to scale frames
+    """
+    decoder = ClipDecoder(source, resample)
+    sizes = [tuple(size) for _, size in layout]
+
+    table = b""
+    for name, size in layout:
+        encoded_name = name.encode("utf-8")
+        table += bytes((len(encoded_name),)) + encoded_name + INTERFACE.pack(*size)
+
+    frame_count = decoder.frame_count
+    data_offset = HEADER.size + len(table) + INDEX_ENTRY.size * frame_count
+
+    with open(output, "wb") as clip_file:
+        clip_file.write(HEADER.pack(MAGIC, VERSION, 0, frame_count, len(layout), 0))
+        clip_file.write(table)
+        clip_file.seek(data_offset)
+
+        index = []
+        for frame_number in range(frame_count):
+            frames, duration = decoder.decode(frame_number, sizes)
+            data = b"".join(frames[size].tobytes() for size in sizes)
+            encoding = ENCODING_RAW
+            if rle:
+                encoded = _rle_encode(data)
+                if len(encoded) < len(data):
+                    data, encoding = encoded, ENCODING_RLE
+
+            index.append(INDEX_ENTRY.pack(clip_file.tell(), len(data), min(65535, round(duration * 1000)), encoding))
+            clip_file.write(data)
+
+        clip_file.seek(HEADER.size + len(table))
+        clip_file.write(b"".join(index))
+    decoder.close()
+
+
+class CompiledClip:
+    """
+        Memory maps a compiled clip, frames are handed out as slices of the mapping without decoding
+        The OS page cache decides which parts of the clip stay in memory
+    """
+    def __init__(self, path:str):
+        """ Creates an instance of CompiledClip
+
+        Args:
+            path: The compiled clip file
+        Raises:
+            InvalidClipException: The file isn't a supported compiled clip
+        """
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # Empty files can't be mapped
+            self._file.close()
+            raise InvalidClipException(f"{path} is too small to be a compiled clip")
+        self._view = memoryview(self._map)
+
+        try:
+            self._parse()
+        except InvalidClipException as error:
+            self.close()
+            raise InvalidClipException(f"{path} {error}")
+
+    def _require(self, end:int, part:str):
+        """ Checks the file extends to the given position
+
+        Raises:
+            InvalidClipException: The file is truncated before the end of the part
+        """
+        if end > len(self._map):
+            raise InvalidClipException(f"is truncated in the {part}")
+
+    def _parse(self):
+        """ Reads the header, interface table and frame index
+
+        Raises:
+            InvalidClipException: The file isn't a supported compiled clip or is truncated
+        """
+        self._require(HEADER.size, "header")
+        magic, version, _, self.frame_count, interface_count, _ = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise InvalidClipException(f"is not a version {VERSION} compiled clip")
+
+        # Interface layout, with the offset of each interface within a raw frame
+        self.layout = []
+        position = HEADER.size
+        frame_offset = 0
+        for _ in range(interface_count):
+            self._require(position + 1, "interface table")
+            name_length = self._map[position]
+            self._require(position + 1 + name_length + INTERFACE.size, "interface table")
+            try:
+                name = bytes(self._view[position + 1:position + 1 + name_length]).decode("utf-8")
+            except UnicodeDecodeError:
+                raise InvalidClipException("has an interface name that isn't utf-8")
+            position += 1 + name_length
+            size = INTERFACE.unpack_from(self._map, position)
+            position += INTERFACE.size
+            self.layout.append((name, size, frame_offset))
+            frame_offset += size[0] * size[1] * 3
+        self.frame_bytes = frame_offset
+
+        self._require(position + self.frame_count * INDEX_ENTRY.size, "frame index")
+        self._index = [INDEX_ENTRY.unpack_from(self._map, position + frame * INDEX_ENTRY.size)
+            for frame in range(self.frame_count)]
+        for offset, length, _, encoding in self._index:
+            self._require(offset + length, "frame data")
+            if encoding not in (ENCODING_RAW, ENCODING_RLE):
+                raise InvalidClipException(f"has a frame with unknown encoding {encoding}")
+
+    def duration(self, frame:int) -> float:
+        """ Gets how long a frame is shown for
+
+        Args:
+            frame: The frame number
+        Returns:
+            float: The duration in seconds
+        """
+        return self._index[frame][2] / 1000
+
+    def frame(self, frame:int):
+        """ Gets the raw RGB pixels of every interface for a frame
+
+        Args:
+            frame: The frame number
+        Returns:
+            memoryview: The pixels of each interface in layout order, a view into the mapping for raw frames
+        """
+        offset, length, _, encoding = self._index[frame]
+        data = self._view[offset:offset + length]
+        if encoding == ENCODING_RLE:
+            return memoryview(_rle_decode(data, self.frame_bytes // 3))
+        return data
+
+    def close(self):
+        """ Unmaps and closes the clip file """
+        self._view.release()
+        self._map.close()
+        self._file.close()
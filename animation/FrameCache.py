@@ -0,0 +1,93 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable
+from PIL import Image
+
+class FrameCache:
+    """
+        Least recently used cache of decoded frames, bounded by the memory the frames take up
+        Safe to use from a prefetch thread and the render thread at the same time
+    """
+    def __init__(self, byte_budget:int, on_evict:Callable=None):
+        """ Creates an instance of FrameCache
+
+        Args:
+            byte_budget: The maximum number of bytes of frames to keep
+            on_evict: (OPTIONAL) Called with each frame removed from the cache
+        """
+        self.byte_budget = byte_budget
+        self.on_evict = on_evict
+        self.used_bytes = 0
+        self._frames = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def image_bytes(image:Image.Image) -> int:
+        """ Estimates the memory taken by an image, PIL stores 3 band images with 4 bytes per pixel
+
+        Args:
+            image: The image to measure
+        Returns:
+            int: The estimated number of bytes
+        """
+        bands = len(image.getbands())
+        return image.size[0] * image.size[1] * (4 if bands == 3 else bands)
+
+    def __contains__(self, key:Hashable) -> bool:
+        with self._lock:
+            return key in self._frames
+
+    def get(self, key:Hashable, touch:bool=True):
+        """ Gets a cached frame, marking it as recently used
+
+        Args:
+            key: The key the frame was stored under
+            touch: (OPTIONAL) Mark the frame as recently used, without this frames are evicted in the order they were stored
+        Returns:
+            any: The cached frame
+            None: The frame isn't cached
+        """
+        with self._lock:
+            entry = self._frames.get(key)
+            if entry is None:
+                return None
+            if touch:
+                self._frames.move_to_end(key)
+            return entry[0]
+
+    def put(self, key:Hashable, frame, size:int):
+        """ Stores a frame, evicting the least recently used frames to stay within the budget
+
+        Args:
+            key: The key to store the frame under
+            frame: The frame to store
+            size: The number of bytes the frame takes up
+        """
+        evicted = []
+        with self._lock:
+            if key in self._frames:
+                replaced, replaced_size = self._frames.pop(key)
+                self.used_bytes -= replaced_size
+                evicted.append(replaced)
+            self._frames[key] = (frame, size)
+            self.used_bytes += size
+
+            while self.used_bytes > self.byte_budget and len(self._frames) > 1:
+                _, (evicted_frame, evicted_size) = self._frames.popitem(last=False)
+                self.used_bytes -= evicted_size
+                evicted.append(evicted_frame)
+        self._evicted(evicted)
+
+    def _evicted(self, frames:list):
+        """ Passes removed frames to on_evict, outside the lock so it can't deadlock with the callback """
+        if self.on_evict is not None:
+            for frame in frames:
+                self.on_evict(frame)
+
+    def clear(self):
+        """ Removes every frame from the cache """
+        with self._lock:
+            evicted = [frame for frame, _ in self._frames.values()]
+            self._frames.clear()
+            self.used_bytes = 0
+        self._evicted(evicted)
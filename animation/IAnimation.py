@@ -1,3 +1,4 @@
+import logging
 from abc import ABCMeta, abstractmethod
 
 class IAnimation(metaclass=ABCMeta):
@@ -17,3 +18,20 @@ class IAnimation(metaclass=ABCMeta):
     def teardown(self):
         pass
 
+    def load_from_user_config(self, config:dict):
+        """ Called after creation with the animations "Arguments" from the user config, if any """
+        pass
+
+    def set_parameter(self, name:str, value):
+        """ Called by trigger bindings to change a named parameter of the animation while it runs """
+        logging.warning(f"Animation {type(self).__name__} has no parameter {name}")
+
+    def memory_usage(self) -> int:
+        """ Returns an estimate of the bytes held by this animation, used by set memory budgets """
+        return 0
+
+    async def run_async(self):
+        """ Optional coroutine hook, run by the asyncio runtime while this animation is current and cancelled when
+        it changes. Lets an animation await I/O and update its state between frames without blocking update """
+        pass
+
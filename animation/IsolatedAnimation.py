@@ -0,0 +1,208 @@
+import importlib
+import logging
+import multiprocessing
+import queue
+import struct
+import time
+from multiprocessing import shared_memory
+from typing import List
+
+from animation.IAnimation import IAnimation
+from hardware.HardwareManager import HardwareManager
+from hardware.InterfaceManager import InterfaceManager
+from runtime.FrameScheduler import FrameScheduler
+
+# Shared memory layout: header of latest slot i32, reading slot i32, sequence u32, followed by SLOTS frame slots
+# Each slot holds the RGB pixels of every render target, groups and ungrouped interfaces, in order
+HEADER = struct.Struct("<iiI")
+SLOTS = 3  # Triple buffered, the worker always has a slot that is neither the latest or being read
+
+def _worker_main(path:str, package:str, arguments:dict, interface_configs:List[dict], group_configs:List[dict],
+        memory_name:str, lock, commands, rate:int):
+    """ Entry point of the worker process, runs the animation and publishes its frames into shared memory
+
+    Args:
+        path: The module path of the animation
+        package: The package of the animation module
+        arguments: The animation arguments from the user config
+        interface_configs: The configs of the interfaces to recreate in the worker
+        group_configs: The configs of the interface groups to recreate in the worker
+        memory_name: The name of the shared memory framebuffer
+        lock: Guards the slot indices in the shared memory header
+        commands: Queue of start, stop and teardown commands from the main process
+        rate: The frame rate to run the animation at
+    """
+    memory = shared_memory.SharedMemory(name=memory_name)
+    try:
+        manager = InterfaceManager()
+        manager.initilize_interfaces(interface_configs, HardwareManager())
+        manager.initilize_groups(group_configs)
+        interfaces = manager.render_targets
+        slot_size = sum(interface.size[0] * interface.size[1] * 3 for interface in interfaces)
+
+        library = importlib.import_module(path, package)
+        animation = getattr(library, path.split(".")[-1])(manager)
+        if arguments:
+            animation.load_from_user_config(arguments)
+
+        scheduler = FrameScheduler(rate)
+        running = False
+        while True:
+            try:
+                command = commands.get_nowait() if running else commands.get()
+            except queue.Empty:
+                command = None
+
+            if command == "start":
+                animation.start()
+                scheduler.start()
+                running = True
+            elif command == "stop":
+                animation.stop()
+                running = False
+            elif command == "teardown":
+                animation.teardown()
+                return
+
+            if not running:
+                continue
+
+            animation.update()
+
+            with lock:
+                latest, reading, sequence = HEADER.unpack_from(memory.buf, 0)
+            slot = next(index for index in range(SLOTS) if index not in (latest, reading))
+
+            position = HEADER.size + slot * slot_size
+            for interface in interfaces:
+                pixels = interface.image.tobytes()
+                memory.buf[position:position + len(pixels)] = pixels
+                position += len(pixels)
+                interface.reset_access_flag()
+
+            with lock:
+                _, reading, sequence = HEADER.unpack_from(memory.buf, 0)
+                HEADER.pack_into(memory.buf, 0, slot, reading, (sequence + 1) & 0xFFFFFFFF)
+
+            delay = scheduler.frame_done()
+            if delay > 0:
+                time.sleep(delay)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        memory.close()
+
+class IsolatedAnimation(IAnimation):
+    """
+        Runs an animation in a worker process which renders into a shared memory framebuffer
+        The main process copies in the latest completed frame each update, so a slow, hung or crashing
+        animation never stalls the hardware refresh
+    """
+    DEFAULT_RATE = 60
+    JOIN_TIMEOUT = 2.0
+
+    def __init__(self, manager:InterfaceManager, path:str, package:str=None, rate:int=DEFAULT_RATE):
+        """ Creates an instance of IsolatedAnimation, the worker is started when the animation first starts
+
+        Args:
+            manager: The instance of the interface manager with all it's interfaces loaded
+            path: The module path of the animation to run in the worker
+            package: (OPTIONAL) The package of the animation module
+            rate: (OPTIONAL) The frame rate the worker renders at
+        """
+        self.manager = manager
+        self.path = path
+        self.package = package
+        self.rate = rate
+        self.arguments = {}
+
+        self._interfaces = list(manager.render_targets)
+        self._slot_size = sum(interface.size[0] * interface.size[1] * 3 for interface in self._interfaces)
+        self._context = multiprocessing.get_context("spawn")  # Forking a process with running threads isn't safe
+        self._memory = None
+        self._process = None
+        self._commands = None
+        self._lock = None
+        self._sequence = 0
+        self._failed = False
+
+    def load_from_user_config(self, config:dict):
+        self.arguments = config
+
+    def memory_usage(self) -> int:
+        return self._memory.size if self._memory is not None else 0
+
+    def _launch(self):
+        """ Creates the shared memory framebuffer and starts the worker process """
+        self._memory = shared_memory.SharedMemory(create=True, size=HEADER.size + SLOTS * self._slot_size)
+        HEADER.pack_into(self._memory.buf, 0, -1, -1, 0)
+        self._sequence = 0
+        self._lock = self._context.Lock()
+        self._commands = self._context.Queue()
+
+        interface_configs = [dict(interface.format_as_dict(), Hardware="")
+            for interface in self.manager.output_interfaces]
+        group_configs = [group.format_as_dict() for group in self.manager.groups]
+        self._process = self._context.Process(
+            target=_worker_main,
+            args=(self.path, self.package, self.arguments, interface_configs, group_configs, self._memory.name,
+                self._lock, self._commands, self.rate),
+            name=f"Animation {self.path}",
+            daemon=True
+        )
+        self._process.start()
+        logging.debug(f"Started worker process {self._process.pid} for animation {self.path}")
+
+    def start(self):
+        if self._failed:
+            return
+        if self._process is None:
+            self._launch()
+        self._commands.put("start")
+
+    def update(self):
+        if self._process is None or self._failed:
+            return
+
+        if not self._process.is_alive():
+            logging.error(f"Worker process for animation {self.path} exited with code {self._process.exitcode}, "
+                "the last frame will be kept")
+            self._failed = True
+            return
+
+        with self._lock:
+            latest, _, sequence = HEADER.unpack_from(self._memory.buf, 0)
+            if sequence == self._sequence or latest < 0:
+                return
+            HEADER.pack_into(self._memory.buf, 0, latest, latest, sequence)
+
+        position = HEADER.size + latest * self._slot_size
+        for interface in self._interfaces:
+            length = interface.size[0] * interface.size[1] * 3
+            interface.image.frombytes(self._memory.buf[position:position + length], "raw", "RGB")
+            position += length
+        self._sequence = sequence
+
+        with self._lock:
+            latest, _, sequence = HEADER.unpack_from(self._memory.buf, 0)
+            HEADER.pack_into(self._memory.buf, 0, latest, -1, sequence)
+
+    def stop(self):
+        if self._process is not None and self._process.is_alive():
+            self._commands.put("stop")
+
+    def teardown(self):
+        if self._process is not None:
+            if self._process.is_alive():
+                self._commands.put("teardown")
+                self._process.join(self.JOIN_TIMEOUT)
+            if self._process.is_alive():
+                logging.warning(f"Worker process for animation {self.path} did not exit, terminating it")
+                self._process.terminate()
+                self._process.join()
+            self._process = None
+
+        if self._memory is not None:
+            self._memory.close()
+            self._memory.unlink()
+            self._memory = None
@@ -0,0 +1,128 @@
+import os
+import time
+from enum import Enum
+from typing import List
+from PIL import Image
+
+from animation.Animation import Animation
+from hardware.Interface import Interface
+
+class TransitionType(Enum):
+    Cut = 0
+    Crossfade = 1
+    Wipe = 2
+    Dissolve = 3
+
+class TransitionBuffers:
+    """
+        Per interface images reused by every transition of a set, so transitions never allocate while running
+    """
+    DISSOLVE_STEPS = 32
+
+    def __init__(self, interface:Interface):
+        """ Creates an instance of TransitionBuffers
+
+        Args:
+            interface: The interface the buffers are for
+        """
+        size = interface.size
+        self.outgoing = Image.new(interface.image.mode, size)  # The canvas of the animation being left
+        self.incoming = Image.new(interface.image.mode, size)  # The canvas of the animation being changed to
+        self.mask = Image.new("L", size)  # Where the outgoing canvas is shown, 255 is fully shown
+        self._dissolve_masks = None
+
+    def dissolve_mask(self, amount:float) -> Image.Image:
+        """ Gets a precomputed dissolve mask, masks are built once from fixed noise on first use
+
+        Args:
+            amount: How much of the outgoing canvas is still shown, 0 to 1
+        Returns:
+            Image.Image: The mask showing roughly that fraction of pixels
+        """
+        if self._dissolve_masks is None:
+            size = self.mask.size
+            noise = Image.frombytes("L", size, os.urandom(size[0] * size[1]))
+            self._dissolve_masks = []
+            for step in range(self.DISSOLVE_STEPS + 1):
+                threshold = 256 * step // self.DISSOLVE_STEPS
+                self._dissolve_masks.append(noise.point(lambda value: 255 if value < threshold else 0))
+        return self._dissolve_masks[round(amount * self.DISSOLVE_STEPS)]
+
+class Transition:
+    """
+        A timed transition between two animations, both are rendered every frame and blended per interface
+        Each animation draws onto its own canvas, so animations that only redraw when changed still blend correctly
+    """
+    def __init__(self, kind:TransitionType, duration:float, outgoing:Animation, incoming:Animation,
+            interfaces:List[Interface], buffers:dict):
+        """ Creates an instance of Transition, capturing the current interface contents as both canvases
+
+        Args:
+            kind: The type of transition
+            duration: The length of the transition in seconds
+            outgoing: The animation being left
+            incoming: The animation being changed to
+            interfaces: The output interfaces to blend
+            buffers: The sets reusable TransitionBuffers keyed by interface, filled in as needed
+        """
+        self.kind = kind
+        self.duration = duration
+        self.outgoing = outgoing
+        self.incoming = incoming
+        self._targets = []
+        self._start = time.monotonic()
+
+        for interface in interfaces:
+            if interface not in buffers:
+                buffers[interface] = TransitionBuffers(interface)
+            interface_buffers = buffers[interface]
+            interface_buffers.outgoing.paste(interface.image)
+            interface_buffers.incoming.paste(interface.image)
+            self._targets.append((interface, interface_buffers))
+
+    @property
+    def progress(self) -> float:
+        """ Returns how far through the transition is, from 0 to 1 """
+        if self.duration <= 0:
+            return 1.0
+        return min(1.0, (time.monotonic() - self._start) / self.duration)
+
+    @property
+    def finished(self) -> bool:
+        return self.progress >= 1.0
+
+    def _render(self, animation:Animation, canvas:str):
+        """ Renders an animation onto its canvas, via the interface images it draws to """
+        for interface, buffers in self._targets:
+            interface.image.paste(getattr(buffers, canvas))
+        animation.update()
+        for interface, buffers in self._targets:
+            getattr(buffers, canvas).paste(interface.image)
+
+    def update(self):
+        """ Renders both animations and blends them onto the interfaces """
+        self._render(self.outgoing, "outgoing")
+        self._render(self.incoming, "incoming")
+
+        shown = 1.0 - self.progress  # Fraction of the outgoing animation still shown
+        for interface, buffers in self._targets:
+            width, height = interface.size
+            if self.kind == TransitionType.Crossfade:
+                buffers.mask.paste(round(255 * shown), (0, 0, width, height))
+                mask = buffers.mask
+            elif self.kind == TransitionType.Wipe:
+                edge = round(width * (1.0 - shown))
+                buffers.mask.paste(0, (0, 0, edge, height))
+                buffers.mask.paste(255, (edge, 0, width, height))
+                mask = buffers.mask
+            elif self.kind == TransitionType.Dissolve:
+                mask = buffers.dissolve_mask(shown)
+            else:
+                continue
+            interface.image.paste(buffers.outgoing, (0, 0), mask)
+
+    def finish(self):
+        """ Ends the transition, leaving the incoming animations canvas on the interfaces """
+        for interface, buffers in self._targets:
+            interface.image.paste(buffers.incoming)
+        self.outgoing.stop()
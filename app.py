@@ -1,18 +1,21 @@
 import logging
+import threading
 import time
-import traceback
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable
 
 from UserConfig import UserConfig
 from hardware.HardwareManager import HardwareManager
 from hardware.InterfaceManager import InterfaceManager
+from hardware.FramePipeline import FramePipeline
+from runtime.FrameScheduler import FrameScheduler, SchedulePolicy
+from runtime.FrameProfiler import FrameProfiler
+from runtime.TriggerEngine import TriggerEngine
 from animation.AnimationSet import AnimationSet
-from exceptions import UnknownSetException
-try:
-    from hardware.Simulator import Simulator
-except:
-    print("Simulator import failed, simulator is disabled!")
-    traceback.print_exc()
-    Simulator = None
+from animation.Transition import TransitionType
+from runtime.StartupTimer import StartupTimer
+from exceptions import UnknownSetException, UnknownAnimationException
 
 class App:
     """
@@ -27,7 +30,13 @@ class App:
         self.config = config
         self.hardware = HardwareManager()
         self.interfaces = InterfaceManager()
-        self._simulator = None
+        self._simulator = None  # The simulator window or headless preview shown instead of hardware
+        self._pipeline = None
+        self.scheduler = None
+        self.profiler = FrameProfiler()
+        self._trace_request = None
+        self._frame_calls = deque()
+        self.triggers = TriggerEngine(self)
         self._running = True
         self._set = None
     
@@ -35,30 +44,72 @@ class App:
     def set(self) -> AnimationSet:
         return self._set
     
-    def load_hardware_and_interfaces(self):
-        """ Loads all hardware instances and user interfaces """
+    def load_hardware_and_interfaces(self, shared_framebuffers:bool=False):
+        """ Loads all hardware instances and user interfaces
+        
+        Args:
+            shared_framebuffers: (OPTIONAL) Let interfaces draw straight into their hardware's framebuffer
+        """
         logging.info("Loading all hardware and interfaces")
-        self.hardware.load_hardware(self.config.hardware)
-        self.interfaces.initilize_interfaces(self.config.interfaces, self.hardware)
+        plan = self.config.plan
+        self.hardware.load_hardware(self.config.hardware, plan.hardware_libraries if plan else None)
+        self.interfaces.initilize_interfaces(self.config.interfaces, self.hardware, shared_framebuffers)
+        self.interfaces.initilize_groups(self.config.groups)
         self.interfaces.initilize_input_interfaces(self.hardware)
         logging.debug("Hardware and interfaces created!")
     
-    def load_simulator_and_interfaces(self):
-        """ Loads up a simulator and user interfaces """
+    def load_simulator_and_interfaces(self, rate:int=60):
+        """ Loads up a simulator and user interfaces
+        
+        Args:
+            rate: (OPTIONAL) The refresh rate of the simulator window, independent of the app rate
+        """
         logging.info("Loading simulator and all interfaces")
 
-        assert Simulator is not None, "Simulator import failed!"
+        from hardware.Simulator import Simulator  # Imports tkinter, so only when simulating
+        self.interfaces.initilize_interfaces(self.config.interfaces, self.hardware)
+        self.interfaces.initilize_groups(self.config.groups)
+        self.interfaces.initilize_input_interfaces(self.hardware)
+        self._simulator = Simulator(self.interfaces, self.signal_terminate, rate)
+        
+        logging.info("Interfaces created!")
+    
+    def load_preview_and_interfaces(self, sink:str, output:str=None, rate:int=30, scale:int=1):
+        """ Loads up a headless preview in place of the simulator and user interfaces
+        
+        Args:
+            sink: Where frames are written, png for a numbered sequence, gif for an animated gif or mjpeg for a
+                local http stream
+            output: (OPTIONAL) The directory for png, the file for gif or the port for mjpeg
+            rate: (OPTIONAL) The rate frames are composed at, independent of the app rate
+            scale: (OPTIONAL) The integer scale frames are enlarged by
+        """
+        logging.info(f"Loading {sink} preview and all interfaces")
+
+        from hardware.Preview import Preview
         self.interfaces.initilize_interfaces(self.config.interfaces, self.hardware)
+        self.interfaces.initilize_groups(self.config.groups)
         self.interfaces.initilize_input_interfaces(self.hardware)
-        self._simulator = Simulator(self.interfaces, self.signal_terminate)
+        self._simulator = Preview(self.interfaces, Preview.create_sink(sink, output), rate, scale)
         
         logging.info("Interfaces created!")
     
-    def load_set(self, name:str):
+    def enable_pipelined_push(self, queue_size:int=1):
+        """ Pushes frames to the hardware on a seperate thread while the next frame is rendered
+        
+        Args:
+            queue_size: (OPTIONAL) The number of frames that can wait to be pushed before stale frames are dropped
+        """
+        if self._pipeline is None:
+            logging.info(f"Enabling pipelined hardware push with a queue of {queue_size} frame(s)")
+            self._pipeline = FramePipeline(queue_size)
+    
+    def load_set(self, name:str, preload:bool=True):
         """ Loads the given animation set
         
         Args:
             name: The name of the set to load
+            preload: (OPTIONAL) Start preloading the sets animations in the background straight away
         """
         if name in self.config.sets:
             if self.set is not None:
@@ -67,35 +118,194 @@ class App:
             logging.info(f"Loading set {name}")
             if self._set:
                 self.set.teardown()
-            self._set = AnimationSet(self.config.sets[name])
-            self._set.load_animations(self.interfaces)
+            plan = self.config.plan
+            self._set = AnimationSet(self.config.sets[name], plan.animation_modules.get(name) if plan else None)
+            self._set.load_animations(self.interfaces, preload)
+            self.triggers.load_bindings(self.config.sets[name].get("Trigger_bindings", {}))
         else:
             raise UnknownSetException(f"Unknown set {name}")
+
+    def change_set(self, name:str, animation:str=None):
+        """ Loads the given animation set and starts one of its animations, so the panels aren't left blank
+        
+        Args:
+            name: The name of the set to load
+            animation: (OPTIONAL) The animation of the set to start, the sets first animation if not given
+        Raises:
+            UnknownSetException: The set doesn't exist
+            UnknownAnimationException: The set has no such animation, the current set is kept
+        """
+        if name not in self.config.sets:
+            raise UnknownSetException(f"Unknown set {name}")
+        names = [config["Name"] for config in self.config.sets[name]["Animations"]]
+        if animation is not None and animation not in names:
+            raise UnknownAnimationException(f"Set {name} has no animation {animation}")
+
+        self.load_set(name)
+        if animation is None and names:
+            animation = names[0]
+        if animation is not None:
+            self.set.change_animation(animation, TransitionType.Cut)
+
+    def boot(self, set_name:str, animation_name:str, budget:float=0.5, timer:StartupTimer=None):
+        """ Loads a set and gets its first frame onto the hardware as soon as possible
+        If the boot animation isn't loaded within the budget a plain boot frame is shown while it finishes loading.
+        The rest of the set and the modules of the other sets are loaded in the background afterwards
+        
+        Args:
+            set_name: The name of the set to boot into
+            animation_name: The animation of the set to show first
+            budget: (OPTIONAL) Seconds to wait for the boot animation before showing a boot frame
+            timer: (OPTIONAL) Records the time each boot phase took
+        """
+        timer = timer or StartupTimer()
+        self.load_set(set_name, preload=False)
+        timer.mark("set")
+
+        animation = self.set.animations.get(animation_name)
+        if animation is not None:
+            loader = threading.Thread(target=animation.load, name="BootAnimation", daemon=True)
+            loader.start()
+            loader.join(budget)
+            if loader.is_alive():
+                logging.warning(f"Boot animation {animation_name} wasn't ready within {budget}s, showing a boot frame")
+                self._draw_boot_frame()
+                self.update()
+                timer.mark("boot frame")
+                loader.join()
+
+        self.set.change_animation(animation_name, TransitionType.Cut)
+        self.update()
+        timer.mark("first frame")
+
+        self.set.start_preloading()
+        threading.Thread(target=self._warm_sets, args=(set_name,), name="WarmSets", daemon=True).start()
+
+    def _draw_boot_frame(self):
+        """ Draws a plain frame on every interface, shown while the boot animation loads """
+        for interface in self.interfaces.render_targets:
+            width, height = interface.size
+            interface.draw.rectangle((0, 0, width, height), (0, 0, 0))
+            interface.draw.line((width // 4, height // 2, width - width // 4, height // 2), (32, 32, 32))
+
+    def _warm_sets(self, booted_set:str):
+        """ Imports the animation modules of every other set, so changing set later doesn't wait on imports """
+        plan = self.config.plan
+        for name, set_config in list(self.config.sets.items()):
+            if name == booted_set or not self._running:
+                continue
+            modules = plan.animation_modules.get(name, {}) if plan else {}
+            for animation in set_config["Animations"]:
+                if animation.get("Isolated", False):
+                    continue  # Imported by its worker process
+                try:
+                    AnimationSet.import_animation(animation, modules.get(animation["Name"]))
+                except Exception:
+                    logging.debug(f"Failed to import animation {animation['Name']} of set {name} in advance")
+        logging.debug("Finished importing the animations of other sets")
     
-    def update(self):
-        """ Renders the animation and updates all hardware """
-        for interface in self.interfaces.interfaces:
-            interface.reset_access_flag()
+    def call_on_frame(self, func:Callable, *args) -> Future:
+        """ Queues a function to run on the render thread at the start of the next frame
+        Safe to call from any thread, use this to change sets or animations from services and the API
+        
+        Args:
+            func: The function to call
+            args: The arguments to call the function with
+        Returns:
+            Future: Resolved with the result of the function once it has run
+        """
+        future = Future()
+        self._frame_calls.append((func, args, future))
+        return future
+
+    def _run_frame_calls(self):
+        """ Runs the functions queued with call_on_frame """
+        while self._frame_calls:
+            func, args, future = self._frame_calls.popleft()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(func(*args))
+            except Exception as exception:
+                future.set_exception(exception)
 
-        if self.set is not None and self.set.current_animation is not None:
-            self.set.current_animation.update()
+    def update(self):
+        """ Renders the animation and updates all hardware with changed areas """
+        self.profiler.begin_frame()
+        self._run_frame_calls()
+        self.triggers.update()
+        if self.set is not None:
+            self.set.update()
+        self.profiler.mark("animation")
         
-        hardware_accessed = []  # TODO
-        for interface in self.interfaces.interfaces:
+        for group in self.interfaces.groups:
+            group.blit_to_members()
+
+        output_interfaces = self.interfaces.output_interfaces
+        for interface in output_interfaces:
             if interface.accessed:
                 interface.paste_on_hardware()
+        self.profiler.mark("paste")
         
         if self._simulator:
             self._simulator.update()
+            self.profiler.mark("simulator")
         else:
-            for hardware in self.hardware.hardware.values():
-                hardware.update()
+            damaged = [hardware for hardware in self.hardware.hardware.values()
+                if hardware.damage is not None or hardware.paces_frames]
+            if self._pipeline:
+                self._pipeline.submit(damaged)
+            else:
+                for hardware in damaged:
+                    hardware.update()
+            for hardware in damaged:
+                hardware.clear_damage()
+            self.profiler.mark("push")  # Only the hand over to the push thread when pipelined
+
+        for interface in output_interfaces:
+            interface.reset_access_flag()
+        for group in self.interfaces.groups:
+            group.reset_access_flag()
+        self.profiler.end_frame()
+
+        if self._trace_request is not None:
+            self.dump_trace(self._trace_request)
+            self._trace_request = None
+
+    def request_trace(self, path:str):
+        """ Requests a trace of the recent frames to be written at the end of the current frame
+        Safe to call from signal handlers
+        
+        Args:
+            path: The json file to write the trace to
+        """
+        self._trace_request = path
+
+    def dump_trace(self, path:str):
+        """ Writes the recent frame timings as a Chrome/Perfetto trace and logs the stage percentiles
+        
+        Args:
+            path: The json file to write the trace to
+        """
+        logging.info(f"Frame timings: {self.profiler.format_report()}")
+        try:
+            self.profiler.export_trace(path)
+        except OSError:
+            logging.exception(f"Failed to write frame trace to {path}")
+            return
+        logging.info(f"Frame trace written to {path}")
 
     def teardown(self):
         """ Shuts down all the hardware and closes all the interfaces """
         logging.debug("Tearing down all sets and hardware")
+        while self._frame_calls:
+            self._frame_calls.popleft()[2].cancel()
         if self.set:
             self.set.teardown()
+        if self._pipeline:
+            self._pipeline.stop()
+            logging.debug(f"Frame pipeline pushed {self._pipeline.pushed_frames} frame(s), "
+                f"dropped {self._pipeline.dropped_frames}")
         self.hardware.teardown_hardware()
         if self._simulator:
             self._simulator.destroy()
@@ -105,22 +315,40 @@ class App:
         logging.debug("Application signalled for termination")
         self._running = False
 
-    def mainloop(self, rate:int):
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    @property
+    def paced_by_hardware(self) -> bool:
+        """ Returns true if pushing a frame blocks until the hardware refreshes, so the app shouldn't sleep """
+        return self._simulator is None and self._pipeline is None and \
+            any(hardware.paces_frames for hardware in self.hardware.hardware.values())
+
+    def mainloop(self, rate:int, policy:SchedulePolicy=SchedulePolicy.Drop):
         """ Continuesly runs the update method until the program is terminated
         
         Args:
             rate: Refresh rate in hz to update the app
+            policy: (OPTIONAL) How frames that overrun their deadline are handled
         """
+        paced = self.paced_by_hardware
+        if paced:
+            logging.info("Frame rate is paced by the hardware refresh")
+
+        self.scheduler = FrameScheduler(rate, policy)
+        self.scheduler.start()
         while self._running:
             try:
-                next_frame = time.monotonic() + (1/rate)
                 self.update()
 
-                delay = next_frame - time.monotonic()
-                if delay > 0:
+                delay = self.scheduler.frame_done()
+                if delay > 0 and not paced:
                     time.sleep(delay)
             except KeyboardInterrupt:
                 logging.warning("Recieved keyboard interrupt, exiting...")
                 self.signal_terminate()
 
+        logging.info(f"Ran {self.scheduler.frames} frame(s), {self.scheduler.late_frames} late "
+            f"and {self.scheduler.dropped_frames} dropped")
         self.teardown()
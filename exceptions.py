@@ -7,3 +7,9 @@ class UnknownSetException(Exception):
 
 class UnknownAnimationException(Exception):
     pass
+
+class InvalidClipException(Exception):
+    pass
+
+class InvalidUserConfigException(Exception):
+    pass
@@ -0,0 +1,76 @@
+from typing import List, Sequence
+from PIL import Image
+
+class ColourCorrection:
+    """
+        Folds brightness, a gamma curve and per channel white balance into one 256 entry lookup table per channel
+        The tables are only rebuilt when the settings change and are applied to a frame in a single pass
+    """
+    def __init__(self):
+        """ Creates an instance of ColourCorrection """
+        self._settings = None
+        self._tables = [list(range(256))] * 3
+        self._luts = {}
+        self.identity = True
+
+    def configure(self, brightness:int, gamma:float, white_balance:Sequence[float]):
+        """ Sets the correction settings, rebuilding the tables if they changed
+
+        Args:
+            brightness: The brightness from 0 to 100
+            gamma: The gamma exponent applied to each channel, 1 is linear
+            white_balance: The red, green and blue channel multipliers from 0 to 1
+        Raises:
+            ValueError: The white balance doesn't have exactly 3 channels
+        """
+        if len(white_balance) != 3:
+            raise ValueError(f"White balance needs red, green and blue multipliers, got {list(white_balance)}")
+        settings = (brightness, gamma, tuple(white_balance))
+        if settings == self._settings:
+            return
+        self._settings = settings
+
+        scale = max(0, min(100, brightness)) / 100
+        self._tables = [self._build_table(scale * max(0.0, min(1.0, balance)), gamma) for balance in white_balance]
+        self._luts.clear()
+        self.identity = all(table == list(range(256)) for table in self._tables)
+
+    @staticmethod
+    def _build_table(scale:float, gamma:float) -> List[int]:
+        """ Builds the lookup table for one channel
+
+        Args:
+            scale: The output multiplier from 0 to 1
+            gamma: The gamma exponent
+        Returns:
+            list: The 256 corrected output values
+        """
+        return [round(255 * ((value / 255) ** gamma) * scale) for value in range(256)]
+
+    def lut(self, bands:int) -> List[int]:
+        """ Gets the PIL point table for images with the given number of bands
+        Bands after the colour channels, e.g. the X in RGBX, are left unchanged
+
+        Args:
+            bands: The number of bands in the image
+        Returns:
+            list: The concatenated tables for every band
+        """
+        if bands not in self._luts:
+            lut = []
+            for band in range(bands):
+                lut.extend(self._tables[band] if band < 3 else range(256))
+            self._luts[bands] = lut
+        return self._luts[bands]
+
+    def apply(self, image:Image.Image) -> Image.Image:
+        """ Applies the correction to a frame
+
+        Args:
+            image: An RGB or RGBX frame
+        Returns:
+            Image.Image: The corrected frame, or the given frame when the correction changes nothing
+        """
+        if self.identity:
+            return image
+        return image.point(self.lut(len(image.getbands())))
@@ -6,6 +6,8 @@ class Configuration:
     def __init__(self):
         """ Creates an instance of Configuration """
         self.brightness = 100
+        self.gamma = 1.0
+        self.white_balance = [1.0, 1.0, 1.0]  # Red, green and blue multipliers
         self.hardware_library = "NotSet"
         self.name = "Unnamed"
         self.args = {}
@@ -21,8 +23,11 @@ class Configuration:
             config: The settings provided from the user config
         """
         self.name = config["Name"]
+        self.hardware_library = config.get("Library", self.hardware_library)
         self.args = config["Arguments"]
         self.brightness = config["Brightness"]
+        self.gamma = config.get("Gamma", 1.0)
+        self.white_balance = list(config.get("White_balance", [1.0, 1.0, 1.0]))
         self.width = config["Width"]
         self.height = config["Height"]
 
@@ -34,8 +39,11 @@ class Configuration:
         """
         config = {
             "Name": self.name,
+            "Library": self.hardware_library,
             "Arguments": self.args,
             "Brightness": self.brightness,
+            "Gamma": self.gamma,
+            "White_balance": self.white_balance,
             "Width": self.width,
             "Height": self.height
         }
@@ -0,0 +1,202 @@
+import functools
+import inspect
+import math
+from typing import Callable, Iterable, Optional, Tuple
+
+from PIL import ImageDraw
+
+Box = Tuple[int, int, int, int]
+
+def union_box(first:Optional[Box], second:Optional[Box]) -> Optional[Box]:
+    """ Combines two damage boxes into the box covering both
+
+    Args:
+        first: The first box (x0, y0, x1, y1) or None
+        second: The second box (x0, y0, x1, y1) or None
+    Returns:
+        tuple: The box covering both boxes
+        None: Both boxes were None
+    """
+    if first is None:
+        return second
+    if second is None:
+        return first
+    return (
+        min(first[0], second[0]),
+        min(first[1], second[1]),
+        max(first[2], second[2]),
+        max(first[3], second[3])
+    )
+
+def clip_box(box:Box, size:Tuple[int, int]) -> Optional[Box]:
+    """ Clips a box to the given image size
+
+    Args:
+        box: The box (x0, y0, x1, y1) to clip, x1 and y1 are exclusive
+        size: The width and height of the image
+    Returns:
+        tuple: The clipped box
+        None: The box lies entirely outside the image
+    """
+    clipped = (
+        max(0, box[0]),
+        max(0, box[1]),
+        min(size[0], box[2]),
+        min(size[1], box[3])
+    )
+    if clipped[0] >= clipped[2] or clipped[1] >= clipped[3]:
+        return None
+    return clipped
+
+def offset_box(box:Box, offset:Tuple[int, int]) -> Box:
+    """ Moves a box by the given offset
+
+    Args:
+        box: The box (x0, y0, x1, y1) to move
+        offset: The x and y offset to apply
+    Returns:
+        tuple: The moved box
+    """
+    return (box[0] + offset[0], box[1] + offset[1], box[2] + offset[0], box[3] + offset[1])
+
+def flip_box(box:Box, size:Tuple[int, int], horizontal:bool, vertical:bool) -> Box:
+    """ Mirrors a box within an image, matching a flipped copy of the image
+
+    Args:
+        box: The box (x0, y0, x1, y1) to mirror
+        size: The width and height of the image
+        horizontal: Mirror left to right
+        vertical: Mirror top to bottom
+    Returns:
+        tuple: The mirrored box
+    """
+    x0, y0, x1, y1 = box
+    if horizontal:
+        x0, x1 = size[0] - x1, size[0] - x0
+    if vertical:
+        y0, y1 = size[1] - y1, size[1] - y0
+    return (x0, y0, x1, y1)
+
+def _flatten_points(xy:Iterable) -> list:
+    """ Flattens PIL style coordinates, e.g. [(x, y), (x, y)] or [x, y, x, y] into a flat list """
+    points = []
+    for value in xy:
+        if isinstance(value, (int, float)):
+            points.append(value)
+        else:
+            points.extend(value)
+    return points
+
+def points_box(xy:Iterable, padding:int=0) -> Box:
+    """ Gets the box covering the given PIL style coordinates
+
+    Args:
+        xy: The coordinates passed to an ImageDraw method
+        padding: (OPTIONAL) Pixels to pad the box by on every side, used for line widths
+    Returns:
+        tuple: The box covering all the coordinates, x1 and y1 are exclusive
+    """
+    points = _flatten_points(xy)
+    xs = points[0::2]
+    ys = points[1::2]
+    return (
+        math.floor(min(xs)) - padding,
+        math.floor(min(ys)) - padding,
+        math.ceil(max(xs)) + 1 + padding,
+        math.ceil(max(ys)) + 1 + padding
+    )
+
+
+class DamageDraw:
+    """
+        Wraps an ImageDraw instance, reporting the area touched by each drawing call as damage
+        Drawing methods without a known area report the whole image as damaged
+    """
+    READ_ONLY = {"getfont", "textbbox", "textlength", "multiline_textbbox", "textsize", "multiline_textsize"}
+
+    def __init__(self, draw:ImageDraw.ImageDraw, invalidate:Callable):
+        """ Creates an instance of DamageDraw
+
+        Args:
+            draw: The draw instance to wrap
+            invalidate: Called with the damaged box, or None for the whole image
+        """
+        self._draw = draw
+        self._invalidate = invalidate
+
+    def __getattr__(self, name:str):
+        attribute = getattr(self._draw, name)
+        if callable(attribute) and name not in self.READ_ONLY:
+            def full_damage(*args, **kwargs):
+                self._invalidate(None)
+                return attribute(*args, **kwargs)
+            return full_damage
+        return attribute
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def _width_position(method:str) -> Optional[int]:
+        """ Gets the position of the width argument of an ImageDraw method among the arguments after xy """
+        parameters = list(inspect.signature(getattr(ImageDraw.ImageDraw, method)).parameters)[2:]  # After self, xy
+        return parameters.index("width") if "width" in parameters else None
+
+    def _shape(self, method:str, xy, args:tuple, kwargs:dict):
+        """ Invalidates the area of a shape drawn between the given coordinates and draws it """
+        width = kwargs.get("width")
+        if width is None:
+            position = self._width_position(method)
+            width = args[position] if position is not None and position < len(args) else None
+        self._invalidate(points_box(xy, width if width is not None else 1))
+        return getattr(self._draw, method)(xy, *args, **kwargs)
+
+    def arc(self, xy, *args, **kwargs):
+        return self._shape("arc", xy, args, kwargs)
+
+    def chord(self, xy, *args, **kwargs):
+        return self._shape("chord", xy, args, kwargs)
+
+    def ellipse(self, xy, *args, **kwargs):
+        return self._shape("ellipse", xy, args, kwargs)
+
+    def line(self, xy, *args, **kwargs):
+        return self._shape("line", xy, args, kwargs)
+
+    def pieslice(self, xy, *args, **kwargs):
+        return self._shape("pieslice", xy, args, kwargs)
+
+    def point(self, xy, *args, **kwargs):
+        return self._shape("point", xy, args, kwargs)
+
+    def polygon(self, xy, *args, **kwargs):
+        return self._shape("polygon", xy, args, kwargs)
+
+    def rectangle(self, xy, *args, **kwargs):
+        return self._shape("rectangle", xy, args, kwargs)
+
+    def rounded_rectangle(self, xy, *args, **kwargs):
+        return self._shape("rounded_rectangle", xy, args, kwargs)
+
+    def bitmap(self, xy, bitmap, *args, **kwargs):
+        self._invalidate((xy[0], xy[1], xy[0] + bitmap.size[0], xy[1] + bitmap.size[1]))
+        return self._draw.bitmap(xy, bitmap, *args, **kwargs)
+
+    def text(self, xy, text, *args, **kwargs):
+        self._invalidate_text("textbbox", xy, text, args, kwargs)
+        return self._draw.text(xy, text, *args, **kwargs)
+
+    def multiline_text(self, xy, text, *args, **kwargs):
+        self._invalidate_text("multiline_textbbox", xy, text, args, kwargs)
+        return self._draw.multiline_text(xy, text, *args, **kwargs)
+
+    def _invalidate_text(self, method:str, xy, text, args:tuple, kwargs:dict):
+        """ Invalidates the area text will be drawn at, falling back to the whole image """
+        options = {key: value for key, value in kwargs.items()
+            if key in ("font", "anchor", "spacing", "align", "direction", "features", "language", "stroke_width")}
+        if len(args) > 1:
+            options.setdefault("font", args[1])
+        try:
+            box = getattr(self._draw, method)(xy, text, **options)
+        except:
+            self._invalidate(None)
+            return
+        self._invalidate((math.floor(box[0]) - 1, math.floor(box[1]) - 1, math.ceil(box[2]) + 1, math.ceil(box[3]) + 1))
@@ -0,0 +1,67 @@
+import numpy
+from typing import Tuple
+from PIL import Image
+
+class FrameBuffer:
+    """
+        A NumPy backed framebuffer for a piece of hardware
+        Interfaces can be given PIL image views onto areas of it, so drawing writes straight into the hardware frame
+    """
+    MODE = "RGBX"  # PIL can only share memory with 4 byte per pixel modes
+
+    def __init__(self, size:Tuple[int, int]):
+        """ Creates an instance of FrameBuffer
+
+        Args:
+            size: The width and height of the framebuffer
+        """
+        self.size = tuple(size)
+        width, height = self.size
+
+        # PIL requires a whole stride of memory after a views start, the spare row allows views at any offset
+        self._memory = numpy.zeros((height + 1) * width * 4, numpy.uint8)
+        self.array = self._memory[:height * width * 4].reshape(height, width, 4)
+        self.image = self.view((0, 0), self.size)
+
+    def contains(self, offset:Tuple[int, int], size:Tuple[int, int]) -> bool:
+        """ Checks if an area lies within the framebuffer
+
+        Args:
+            offset: The top left position of the area
+            size: The width and height of the area
+        Returns:
+            bool: True if the area is fully inside the framebuffer
+        """
+        return offset[0] >= 0 and offset[1] >= 0 and \
+            offset[0] + size[0] <= self.size[0] and offset[1] + size[1] <= self.size[1]
+
+    def view(self, offset:Tuple[int, int], size:Tuple[int, int]) -> Image.Image:
+        """ Creates a PIL image sharing memory with an area of the framebuffer
+
+        Args:
+            offset: The top left position of the area
+            size: The width and height of the area
+        Returns:
+            Image.Image: An image whose pixels are stored in the framebuffer
+        Raises:
+            ValueError: The area doesn't fit in the framebuffer
+        """
+        if not self.contains(offset, size):
+            raise ValueError(f"Area {size} at {offset} does not fit in framebuffer of size {self.size}")
+
+        stride = self.size[0] * 4
+        start = offset[1] * stride + offset[0] * 4
+        image = Image.frombuffer(self.MODE, tuple(size), memoryview(self._memory)[start:], "raw", self.MODE, stride, 1)
+        image.readonly = 0  # PIL marks mapped images read only and would copy on the first write
+        return image
+
+    def array_view(self, offset:Tuple[int, int], size:Tuple[int, int]) -> numpy.ndarray:
+        """ Gets a NumPy view (height, width, 4) of an area of the framebuffer
+
+        Args:
+            offset: The top left position of the area
+            size: The width and height of the area
+        Returns:
+            numpy.ndarray: An array whose pixels are stored in the framebuffer
+        """
+        return self.array[offset[1]:offset[1] + size[1], offset[0]:offset[0] + size[0]]
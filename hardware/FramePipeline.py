@@ -0,0 +1,126 @@
+import logging
+import threading
+from collections import deque
+from typing import Dict, List
+
+from PIL import Image
+
+from hardware.IHardware import IHardware
+
+class FramePipeline:
+    """
+        Pushes completed frames to the hardware on a dedicated thread, letting the next frame render meanwhile
+        Each submitted frame is copied into a pooled back buffer, if the push thread falls behind
+        the oldest queued frame is dropped in favour of the newest
+    """
+    def __init__(self, queue_size:int=1):
+        """ Creates an instance of FramePipeline
+
+        Args:
+            queue_size: (OPTIONAL) The maximum number of frames waiting to be pushed before stale frames are dropped
+        """
+        self.queue_size = max(1, queue_size)
+        self.pushed_frames = 0
+        self.dropped_frames = 0
+
+        self._queue = deque()
+        self._buffers = {}
+        self._condition = threading.Condition()
+        self._running = True
+        self._thread = threading.Thread(target=self._push_loop, name="FramePipeline", daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def supports_push(hardware:IHardware) -> bool:
+        """ Checks if the hardware can push frames other than its own image
+
+        Args:
+            hardware: The hardware instance to check
+        Returns:
+            bool: True if the hardware supports push
+        """
+        return hardware.supports_push
+
+    def _get_buffer(self, hardware:IHardware) -> Image.Image:
+        """ Gets a free back buffer for the hardware, must be called with the condition held
+
+        Args:
+            hardware: The hardware the buffer is for
+        Returns:
+            Image.Image: A back buffer matching the hardware image
+        """
+        pool = self._buffers.setdefault(hardware, [])
+        if pool:
+            buffer = pool.pop()
+            if buffer.size == hardware.image.size and buffer.mode == hardware.image.mode:
+                return buffer
+        return Image.new(hardware.image.mode, hardware.image.size)
+
+    def _recycle(self, frame:Dict[IHardware, Image.Image]):
+        """ Returns the buffers of a frame to the pool, must be called with the condition held
+
+        Args:
+            frame: The frame to recycle
+        """
+        for hardware, buffer in frame.items():
+            self._buffers.setdefault(hardware, []).append(buffer)
+
+    def submit(self, hardware_list:List[IHardware]):
+        """ Snapshots the current hardware images and queues them to be pushed
+        Hardware that cannot push arbitrary frames is updated synchronously instead
+
+        Args:
+            hardware_list: The hardware instances with a completed frame
+        """
+        frame = {}
+        with self._condition:
+            for hardware in hardware_list:
+                if self.supports_push(hardware):
+                    buffer = self._get_buffer(hardware)
+                    buffer.paste(hardware.image)
+                    frame[hardware] = buffer
+
+            if frame:
+                while len(self._queue) >= self.queue_size:
+                    stale = self._queue.popleft()
+                    self.dropped_frames += 1
+
+                    # Hardware absent from the new frame still needs the stale frames content pushed
+                    for hardware in list(stale):
+                        if hardware not in frame:
+                            frame[hardware] = stale.pop(hardware)
+                    self._recycle(stale)
+
+                self._queue.append(frame)
+                self._condition.notify()
+
+        for hardware in hardware_list:
+            if hardware not in frame:
+                hardware.update()
+
+    def _push_loop(self):
+        """ Push thread, sends queued frames to their hardware """
+        while True:
+            with self._condition:
+                while self._running and not self._queue:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                frame = self._queue.popleft()
+
+            for hardware, buffer in frame.items():
+                try:
+                    hardware.push(buffer)
+                except:
+                    logging.exception(f"Failed to push frame to hardware {type(hardware).__name__}")
+
+            with self._condition:
+                self.pushed_frames += 1
+                self._recycle(frame)
+
+    def stop(self):
+        """ Stops the push thread, any frames still queued are discarded """
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        self._thread.join()
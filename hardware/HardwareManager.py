@@ -68,21 +68,27 @@ class HardwareManager:
             logging.exception(f"Failed to load hardware interface {name}")
             return
 
+        instance.config = config
         self._hardware[name] = instance
     
-    def load_hardware(self, hardware_devices:Dict[str, Configuration]):
+    def load_hardware(self, hardware_devices:Dict[str, Configuration], libraries:Dict[str, str]=None):
         """ Initilizes all the hardware instances from the user configuration
         
         Args:
             hardware_devices: A dictionary of hardware configurations
+            libraries: (OPTIONAL) Hardware name to library already found by the runtime plan, skips searching presets
         Raises:
             UnknownHardwareException: A hardware device in config is unknown
         """
-        self.availible_hardware = []
-        preset_hardware = os.path.join(os.path.dirname(os.path.dirname(__file__)), "presets", "hardware")
-        for file in os.listdir(preset_hardware):
-            if file.endswith(".py"):
-                self.availible_hardware.append(file.strip(".py"))
+        if libraries is not None and all(libraries.get(name) == config.hardware_library
+                for name, config in hardware_devices.items()):
+            self.availible_hardware = list(libraries.values())
+        else:
+            self.availible_hardware = []
+            preset_hardware = os.path.join(os.path.dirname(os.path.dirname(__file__)), "presets", "hardware")
+            for file in os.listdir(preset_hardware):
+                if file.endswith(".py"):
+                    self.availible_hardware.append(file.strip(".py"))
 
         for config in hardware_devices.values():
             name = config.hardware_library
@@ -99,6 +105,7 @@ class HardwareManager:
                     logging.exception(f"Failed to load hardware interface {name}")
                     continue
 
+                instance.config = config
                 self._hardware[config.name] = instance
             else:
                 raise UnknownHardwareException(f"Unkown hardware library {name}")
@@ -1,14 +1,25 @@
 from abc import ABCMeta, abstractmethod, abstractproperty
+from typing import TYPE_CHECKING
 from PIL import Image
 
 from hardware.Types import DisplayForms
 from hardware.Configuration import Configuration
+from hardware.Damage import union_box, clip_box
+from hardware.ColourCorrection import ColourCorrection
+if TYPE_CHECKING:
+    from hardware.FrameBuffer import FrameBuffer
 
 
 class IHardware(metaclass=ABCMeta):
     """
         Interface class used for hardware
     """
+    damage = None  # Bounding box (x0, y0, x1, y1) of the area of the image changed since the last update
+    framebuffer = None  # Shared framebuffer backing the image, when interfaces are views onto it
+    strip_data = None  # Encoded LED strip data written by strip interfaces, 3 bytes per LED in wiring order
+    config = None  # The configuration this hardware was loaded with, set by the hardware manager
+    _colour_correction = None
+
     @property
     @abstractproperty
     def has_inputs(self) -> bool:
@@ -25,6 +36,20 @@ class IHardware(metaclass=ABCMeta):
         # This method exists as only boiler plate and IHardware should never be made an instance
         self.image = Image.new("RGB", (3, 3))
 
+    @property
+    def paces_frames(self) -> bool:
+        """ Returns true if updating this hardware blocks until its next refresh, e.g. waiting on vsync
+        When set, the hardware is updated every frame and drives the frame rate of the main loop
+        """
+        return False
+
+    @property
+    def supports_push(self) -> bool:
+        """ Returns true if this hardware overrides push to show frames other than its own image
+        When set, the frame pipeline pushes frames on its own thread while the next frame renders
+        """
+        return False
+
     # Required methods
     
     @abstractmethod
@@ -41,3 +66,81 @@ class IHardware(metaclass=ABCMeta):
     def teardown(self):
         """ Shuts down the hardware interface """
         pass
+
+    # Damage tracking
+
+    def invalidate(self, box:tuple=None):
+        """ Marks an area of the hardware image as changed, hardware with no damage is not updated
+        
+        Args:
+            box: (OPTIONAL) The area (x0, y0, x1, y1) that changed, the whole image if not given
+        """
+        if box is None:
+            box = (0, 0) + self.image.size
+        else:
+            box = clip_box(box, self.image.size)
+            if box is None:
+                return
+        self.damage = union_box(self.damage, box)
+
+    def clear_damage(self):
+        """ Called once the hardware has been updated with all the damaged areas """
+        self.damage = None
+
+    def enable_framebuffer(self) -> "FrameBuffer":
+        """ Moves the hardware image into a shared framebuffer that interfaces can draw into directly
+        The image mode becomes RGBX, hardware that requires RGB must convert when pushing
+        
+        Returns:
+            FrameBuffer: The framebuffer now backing the image
+        """
+        if self.framebuffer is None:
+            from hardware.FrameBuffer import FrameBuffer  # Imports NumPy, so only when framebuffers are used
+            self.framebuffer = FrameBuffer(self.image.size)
+            self.framebuffer.image.paste(self.image)
+            self.image = self.framebuffer.image
+        return self.framebuffer
+
+    def write_strip(self, start:int, data:bytes):
+        """ Writes encoded LED data from a strip interface into the strip data of this hardware
+        
+        Args:
+            start: The index of the first LED driven by the interface
+            data: The encoded colours, 3 bytes per LED
+        """
+        begin = start * 3
+        end = begin + len(data)
+        if self.strip_data is None:
+            self.strip_data = bytearray(end)
+        elif len(self.strip_data) < end:
+            self.strip_data.extend(bytes(end - len(self.strip_data)))
+        self.strip_data[begin:end] = data
+        self.invalidate()
+
+    def colour_correct(self, image:Image.Image) -> Image.Image:
+        """ Applies the brightness, gamma and white balance of this hardwares config to a frame
+        Call this just before pushing a frame, the lookup tables are only rebuilt when the config changes
+        
+        Args:
+            image: The RGB or RGBX frame to correct
+        Returns:
+            Image.Image: The corrected frame, this is the given image if no correction is needed
+        """
+        if self.config is None:
+            return image
+        if self._colour_correction is None:
+            self._colour_correction = ColourCorrection()
+        self._colour_correction.configure(self.config.brightness, self.config.gamma, self.config.white_balance)
+        return self._colour_correction.apply(image)
+
+    # Optional methods
+
+    def push(self, image:Image.Image):
+        """ Pushes the given frame to the hardware instead of the hardwares own image
+        Hardware that overrides this must also return true from supports_push, otherwise the frame pipeline updates
+        it synchronously and this falls back to updating the hardware with its own image
+        
+        Args:
+            image: The completed frame, matching the size and mode of this hardware's image
+        """
+        self.update()
@@ -1,13 +1,20 @@
+import time
+from collections import deque
+from typing import TYPE_CHECKING
 from PIL import Image, ImageDraw
 
 from hardware.Types import DisplayForms, HardwareType
 from hardware.IHardware import IHardware
+from hardware.Damage import DamageDraw, union_box, clip_box, offset_box
+if TYPE_CHECKING:
+    from hardware.FrameBuffer import FrameBuffer
 
 class InputInterface:
     """
         Used to represent input interfaces only, this interface is auto generated from hardware config.
         It cannot be defined in the interface config
     """
+    MAX_PENDING_EVENTS = 64  # Oldest events are discarded if nothing takes them
     def __init__(self, hardware:IHardware):
         """ Creates an instance of Interface
         
@@ -15,7 +22,29 @@ class InputInterface:
             hardware: The hardware instance used for this interface
         """
         self.type = HardwareType.Input
+        self.name = hardware.config.name if hardware.config is not None else type(hardware).__name__
         self._hardware = hardware
+        self._events = deque(maxlen=self.MAX_PENDING_EVENTS)
+
+    def push_event(self, event:str, value=None):
+        """ Queues an input event for the trigger engine, safe to call from hardware polling threads
+
+        Args:
+            event: The name of the event, e.g. Pressed
+            value: (OPTIONAL) A value carried by the event, e.g. the position of a dial
+        """
+        self._events.append((event, value, time.monotonic()))
+
+    def poll_events(self) -> list:
+        """ Takes every queued event in the order they happened
+
+        Returns:
+            list: The (event, value, monotonic time) of each event
+        """
+        events = []
+        while self._events:
+            events.append(self._events.popleft())
+        return events
 
 class Interface:
     """
@@ -27,38 +56,118 @@ class Interface:
         Args:
             hardware: The hardware instance used for this interface
         """
-        self.accessed = False
+        self.damage = None  # Bounding box (x0, y0, x1, y1) of the area changed this frame
         self.type = HardwareType.Output
         self.form = DisplayForms.Other
         self.name = "Untitled"
         self.size = (1, 1)
         self.offset = (0, 0)
         self._image = Image.new("RGB", (1, 1))
-        self._draw = ImageDraw.Draw(self.image)
+        self._draw = DamageDraw(ImageDraw.Draw(self._image), self.invalidate)
+        self._framebuffer = None
+        self._strip_encoder = None
 
         self._hardware = hardware
     
     @property
     def image(self) -> Image.Image:
-        """ Returns the PIL image used for this interface """
-        self.accessed = True
+        """ Returns the PIL image used for this interface
+        As any part of the image can be changed through it, the whole interface is marked as damaged
+        """
+        self.invalidate()
+        return self._image
+
+    @property
+    def current_image(self) -> Image.Image:
+        """ Returns the PIL image without marking any damage, only use this to read the interface """
         return self._image
 
     @property
     def draw(self) -> ImageDraw.ImageDraw:
-        """ Returns the image draw for this interface, use this for PIL drawing functions """
-        self.accessed = True
+        """ Returns the image draw for this interface, use this for PIL drawing functions
+        Only the area covered by each drawing call is marked as damaged
+        """
         return self._draw
+
+    @property
+    def array(self):
+        """ Returns a NumPy view (height, width, 4) of this interface when bound to a shared framebuffer
+        As any part of the array can be changed through it, the whole interface is marked as damaged
+        
+        Returns:
+            numpy.ndarray: The view into the hardware framebuffer
+            None: This interface owns a seperate image
+        """
+        if self._framebuffer is None:
+            return None
+        self.invalidate()
+        return self._framebuffer.array_view(self.offset, self.size)
+
+    @property
+    def accessed(self) -> bool:
+        """ Returns true if this interface has been changed amoungst an animation this frame """
+        return self.damage is not None
+
+    def invalidate(self, box:tuple=None):
+        """ Marks an area of this interface as changed, so it's pasted on the hardware
+        
+        Args:
+            box: (OPTIONAL) The area (x0, y0, x1, y1) that changed, the whole interface if not given
+        """
+        if box is None:
+            box = (0, 0) + self._image.size
+        else:
+            box = clip_box(box, self._image.size)
+            if box is None:
+                return
+        self.damage = union_box(self.damage, box)
     
     def reset_access_flag(self):
-        """ Resets the access flag used to tell if this interface has been used amoungst an animation """
-        self.accessed = False
+        """ Resets the damaged area used to tell if this interface has been used amoungst an animation """
+        self.damage = None
     
+    def blit(self, image:Image.Image, box:tuple):
+        """ Pastes an image into an area of this interface and marks only that area as damaged
+
+        Args:
+            image: The image to paste, the size of the box
+            box: The area (x0, y0, x1, y1) to paste into
+        """
+        self._image.paste(image, box[:2])
+        self.invalidate(box)
+
+    def bind_framebuffer(self, framebuffer:"FrameBuffer") -> bool:
+        """ Replaces the image of this interface with a view onto the hardware framebuffer
+        Drawing then lands directly in the hardware frame and no paste is needed
+        
+        Args:
+            framebuffer: The framebuffer of this interfaces hardware
+        Returns:
+            bool: If the interface fits in the framebuffer and was bound
+        """
+        if not framebuffer.contains(self.offset, self.size):
+            return False
+        self._framebuffer = framebuffer
+        self._image = framebuffer.view(self.offset, self.size)
+        self._draw = DamageDraw(ImageDraw.Draw(self._image), self.invalidate)
+        self.invalidate()
+        return True
+
     def paste_on_hardware(self):
-        """ Submits the contained image to the assosiated hardware interface """
-        if self._hardware:
-            self._hardware.image.paste(self._image, self.offset)
-            # TODO, check hardware type and turn into strip data if need be
+        """ Submits the damaged area of the contained image to the assosiated hardware interface """
+        if self._hardware and self.damage is not None:
+            if self._strip_encoder is not None:
+                # Strips take the whole interface in wiring order, starting at the LED index in the x offset
+                image = self._hardware.colour_correct(self._image)
+                self._hardware.write_strip(self.offset[0], self._strip_encoder.encode(image))
+                return
+            elif self._framebuffer is not None:
+                pass  # Already drawn into the hardware image
+            elif self.damage == (0, 0) + self._image.size:
+                self._hardware.image.paste(self._image, self.offset)
+            else:
+                self._hardware.image.paste(self._image.crop(self.damage), offset_box(self.damage, self.offset)[:2])
+            self._hardware.invalidate(offset_box(self.damage, self.offset))
 
     def load_from_user_config(self, config:dict):
         """ Loads from the given user configuration dictionary
@@ -71,7 +180,20 @@ class Interface:
         self.form = DisplayForms(config["Form"])
         self.size = tuple(config["Size"])
         self._image = Image.new("RGB", self.size)
-        self._draw = ImageDraw.Draw(self.image)
+        self._draw = DamageDraw(ImageDraw.Draw(self._image), self.invalidate)
+        self.invalidate()
+
+        if self.form == DisplayForms.Strip:
+            from hardware.StripEncoder import StripEncoder  # Imports NumPy, so only when strips are used
+            strip = config.get("Strip", {})
+            self._strip_encoder = StripEncoder(
+                self.size,
+                strip.get("Serpentine", False),
+                strip.get("Start_corner", "Top left"),
+                strip.get("Vertical", False),
+                strip.get("Colour_order", "RGB")
+            )
+            self._strip_config = strip
 
     def format_as_dict(self) -> dict:
         """ Formats this interfaces config as a dictionary for user config savings
@@ -85,4 +207,6 @@ class Interface:
             "Size": list(self.size),
             "Offset": list(self.offset)
         }
+        if self._strip_encoder is not None:
+            config["Strip"] = self._strip_config
         return config
@@ -0,0 +1,89 @@
+import logging
+from typing import List
+from PIL import Image, ImageDraw
+
+from hardware.Interface import Interface
+from hardware.Damage import DamageDraw, flip_box
+from hardware.Types import GroupTransform
+
+class InterfaceGroup(Interface):
+    """
+        A group of same sized interfaces showing the same content, e.g. a pair of eyes
+        Animations draw into the group once like any other interface, the damaged area is then blitted to every member
+        through its transform
+    """
+    TRANSPOSE = {
+        GroupTransform.Flip_horizontal: Image.FLIP_LEFT_RIGHT,
+        GroupTransform.Flip_vertical: Image.FLIP_TOP_BOTTOM,
+        GroupTransform.Rotate_180: Image.ROTATE_180
+    }
+    FLIPS = {
+        GroupTransform.Identity: (False, False),
+        GroupTransform.Flip_horizontal: (True, False),
+        GroupTransform.Flip_vertical: (False, True),
+        GroupTransform.Rotate_180: (True, True)
+    }
+
+    def __init__(self):
+        """ Creates an instance of InterfaceGroup, load it with load_from_user_config """
+        super().__init__(None)
+        self.members = []  # (interface, transform) of every member
+        self._config = {}
+
+    def load_from_user_config(self, config:dict, interfaces:List[Interface]):
+        """ Loads the group from the given user configuration dictionary
+
+        Args:
+            config: The group configuration provided from the user config file
+            interfaces: The output interfaces the members are found in
+        """
+        self.name = config["Name"]
+        self._config = config
+        named = {interface.name.lower(): interface for interface in interfaces}
+
+        self.members = []
+        for member in config["Members"]:
+            interface = named.get(member["Interface"].lower())
+            if interface is None:
+                logging.warning(f"Group {self.name} member {member['Interface']} doesn't exist, it will be skipped")
+                continue
+            if self.members and interface.size != self.size:
+                logging.warning(f"Group {self.name} member {interface.name} is {interface.size}, "
+                    f"the group is {self.size}, it will be skipped")
+                continue
+            if not self.members:
+                self.size = interface.size
+                self.form = interface.form
+            self.members.append((interface, GroupTransform[member.get("Transform", "Identity")]))
+
+        self._image = Image.new("RGB", self.size)
+        self._draw = DamageDraw(ImageDraw.Draw(self._image), self.invalidate)
+        self.invalidate()
+
+    def blit_to_members(self):
+        """ Copies the damaged area of the group to every member, mirrored by the members transform """
+        if self.damage is None:
+            return
+
+        full = self.damage == (0, 0) + self.size
+        area = self._image if full else self._image.crop(self.damage)
+        transposed = {GroupTransform.Identity: area}
+        for interface, transform in self.members:
+            if transform not in transposed:
+                transposed[transform] = area.transpose(self.TRANSPOSE[transform])
+            interface.blit(transposed[transform], flip_box(self.damage, self.size, *self.FLIPS[transform]))
+
+    def paste_on_hardware(self):
+        """ Groups have no hardware, blit_to_members passes the group on to its members """
+        pass
+
+    def format_as_dict(self) -> dict:
+        """ Formats this groups config as a dictionary for user config savings
+
+        Returns:
+            dict: The settings for this group
+        """
+        return {
+            "Name": self.name,
+            "Members": [dict(member) for member in self._config["Members"]]  # Includes members skipped when loaded
+        }
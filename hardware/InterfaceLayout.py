@@ -0,0 +1,78 @@
+from typing import List
+from PIL import Image, ImageDraw, ImageFont
+
+from hardware.Interface import Interface
+
+class InterfaceLayout:
+    """
+        Arranges interfaces side by side in rows for displaying them together, as used by the simulator and previews
+    """
+    def __init__(self, interfaces:List[Interface], max_width:int=300, padding:int=1, spacing:int=5,
+            label_height:int=10):
+        """ Creates an instance of InterfaceLayout
+
+        Args:
+            interfaces: The output interfaces to lay out
+            max_width: (OPTIONAL) The width after which a new row is started
+            padding: (OPTIONAL) The space around the edge of the layout
+            spacing: (OPTIONAL) The space between interfaces
+            label_height: (OPTIONAL) The space left above each interface for its name
+        """
+        self.interfaces = list(interfaces)
+        self.positions = {}
+        self.dimensions = [1, 1]
+
+        x = padding
+        y = padding + label_height
+        max_height = 0
+        for interface in self.interfaces:
+            self.positions[interface] = (x, y)
+
+            # Expand dimensions to fit the interface
+            self.dimensions[0] = max(self.dimensions[0], x + interface.size[0] + padding)
+            self.dimensions[1] = max(self.dimensions[1], y + interface.size[1] + padding)
+
+            # Compute next position
+            x += interface.size[0] + spacing
+            max_height = max(max_height, interface.size[1])
+            if x > max_width:  # New row
+                x = padding
+                y += max_height + spacing + label_height
+                max_height = 0
+        self.dimensions = tuple(self.dimensions)
+
+    def create_backdrop(self, outline:str=None, labels:bool=False) -> Image.Image:
+        """ Creates an image the size of the layout to paste interfaces onto
+
+        Args:
+            outline: (OPTIONAL) The colour to outline each interface with
+            labels: (OPTIONAL) Write each interfaces name above it
+        Returns:
+            Image.Image: The black backdrop
+        """
+        backdrop = Image.new("RGB", self.dimensions, "black")
+        if outline is None and not labels:
+            return backdrop
+
+        draw = ImageDraw.Draw(backdrop)
+        font = ImageFont.load_default()
+        for interface, position in self.positions.items():
+            if outline is not None:
+                draw.rectangle((
+                    position[0] - 1,
+                    position[1] - 1,
+                    position[0] + interface.size[0],
+                    position[1] + interface.size[1]
+                ), outline=outline)
+            if labels:
+                draw.text((position[0], position[1] - 12), interface.name, "white", font)
+        return backdrop
+
+    def compose(self, image:Image.Image):
+        """ Pastes every interface onto an image made by create_backdrop
+
+        Args:
+            image: The image to paste onto
+        """
+        for interface, position in self.positions.items():
+            image.paste(interface.current_image, position)
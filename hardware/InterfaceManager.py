@@ -3,7 +3,8 @@ from typing import List
 
 from hardware.HardwareManager import HardwareManager
 from hardware.Interface import Interface, InputInterface
-from hardware.Types import HardwareType
+from hardware.InterfaceGroup import InterfaceGroup
+from hardware.Types import HardwareType, DisplayForms
 
 class InterfaceManager:
     """
@@ -11,22 +12,66 @@ class InterfaceManager:
     """
     def __init__(self):
         self._interfaces = []
+        self._output_interfaces = []
+        self._groups = []
+        self._render_targets = []
     
     @property
     def interfaces(self) -> List[Interface]:
         return self._interfaces
+
+    @property
+    def output_interfaces(self) -> List[Interface]:
+        return self._output_interfaces
+
+    @property
+    def groups(self) -> List[InterfaceGroup]:
+        return self._groups
+
+    @property
+    def render_targets(self) -> List[Interface]:
+        """ Returns the interfaces animations should draw into, every group and the interfaces not in a group """
+        return self._render_targets
     
-    def initilize_interfaces(self, interfaces:list, manager:HardwareManager):
+    def initilize_interfaces(self, interfaces:list, manager:HardwareManager, shared_framebuffers:bool=False):
         """ Initilize all interfaces and attaches them to their equivilent hardware instance
         
         Args:
             interfaces: The interface configuration list provided by the user configuration file
             manager: The hardware manager with all the relavent hardware loaded and ready
+            shared_framebuffers: (OPTIONAL) Make interfaces views onto their hardware's framebuffer instead of pasting
         """
         for interface in interfaces:
-            instance = Interface(manager.hardware.get(interface["Hardware"], None))
+            hardware = manager.hardware.get(interface["Hardware"], None)
+            instance = Interface(hardware)
             instance.load_from_user_config(interface)
+            if shared_framebuffers and hardware is not None and instance.form != DisplayForms.Strip:
+                if not instance.bind_framebuffer(hardware.enable_framebuffer()):
+                    logging.warning(f"Interface {instance.name} does not fit in its hardware, it will be pasted instead")
             self._interfaces.append(instance)
+            self._output_interfaces.append(instance)
+            self._render_targets.append(instance)
+
+    def initilize_groups(self, groups:list):
+        """ Initilizes the interface groups, members are drawn through their group instead of directly
+        Call after initilizing the interfaces
+
+        Args:
+            groups: The group configuration list provided by the user configuration file
+        """
+        grouped = set()
+        for group in groups:
+            instance = InterfaceGroup()
+            instance.load_from_user_config(group, self._output_interfaces)
+            if not instance.members:
+                logging.warning(f"Group {instance.name} has no members, it will be skipped")
+                continue
+            self._groups.append(instance)
+            self._interfaces.append(instance)
+            grouped.update(interface for interface, _ in instance.members)
+
+        self._render_targets = self._groups + [interface for interface in self._output_interfaces
+            if interface not in grouped]
     
     def initilize_input_interfaces(self, manager:HardwareManager):
         """ Initilizes all input interfaces from hardware
@@ -0,0 +1,266 @@
+import io
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from PIL import Image
+
+from hardware.InterfaceManager import InterfaceManager
+from hardware.InterfaceLayout import InterfaceLayout
+from hardware.Damage import union_box
+
+class PreviewSink:
+    """
+        Receives composed preview frames on the preview worker thread
+    """
+    def write(self, image:Image.Image, timestamp:float):
+        """ Writes a frame
+
+        Args:
+            image: The composed frame, owned by the sink
+            timestamp: The monotonic time the frame was composed
+        """
+        pass
+
+    def close(self):
+        """ Finishes writing, called on the worker thread once no more frames will be written """
+        pass
+
+class PngSequenceSink(PreviewSink):
+    """
+        Writes every frame as a numbered PNG into a directory
+    """
+    def __init__(self, directory:str):
+        """ Creates an instance of PngSequenceSink, nothing is ever deleted so the directory has to be empty
+
+        Args:
+            directory: The new or empty directory to write frame_00000.png, frame_00001.png, ... into
+        Raises:
+            FileExistsError: The directory already has files in it
+        """
+        self.directory = directory
+        self.frame_count = 0
+        os.makedirs(directory, exist_ok=True)
+        if os.listdir(directory):
+            raise FileExistsError(f"Preview directory {directory} isn't empty, choose a new directory")
+
+    def write(self, image:Image.Image, timestamp:float):
+        image.save(os.path.join(self.directory, f"frame_{self.frame_count:05d}.png"), compress_level=1)
+        self.frame_count += 1
+
+class GifSink(PreviewSink):
+    """
+        Collects frames and writes them as an animated GIF when closed, keeping the time between frames
+    """
+    def __init__(self, path:str, max_frames:int=1000):
+        """ Creates an instance of GifSink
+
+        Args:
+            path: The GIF file to write
+            max_frames: (OPTIONAL) The number of frames kept, the oldest frames are discarded after this
+        """
+        self.path = path
+        self.max_frames = max_frames
+        self._frames = []
+        self._timestamps = []
+
+    def write(self, image:Image.Image, timestamp:float):
+        if len(self._frames) >= self.max_frames:
+            self._frames.pop(0)
+            self._timestamps.pop(0)
+        self._frames.append(image.quantize(256))  # A palette image is a third of the size to keep
+        self._timestamps.append(timestamp)
+
+    def close(self):
+        if not self._frames:
+            return
+        durations = [max(20, round((end - start) * 1000)) for start, end in zip(self._timestamps, self._timestamps[1:])]
+        durations.append(durations[-1] if durations else 100)
+        self._frames[0].save(self.path, save_all=True, append_images=self._frames[1:], duration=durations, loop=0)
+        logging.info(f"Wrote {len(self._frames)} preview frame(s) to {self.path}")
+
+class MjpegSink(PreviewSink):
+    """
+        Serves the frames as an MJPEG stream over HTTP, open / in a browser or /frame.jpg for a single frame
+        Each client is sent the latest frame when it is ready for one, so slow clients skip frames
+    """
+    def __init__(self, port:int, host:str="127.0.0.1", quality:int=80):
+        """ Creates an instance of MjpegSink and starts serving
+
+        Args:
+            port: The port to serve on
+            host: (OPTIONAL) The address to serve on, local only by default
+            quality: (OPTIONAL) The JPEG quality of each frame
+        """
+        self.quality = quality
+        self._frame = None
+        self._sequence = 0
+        self._condition = threading.Condition()
+        self._running = True
+
+        sink = self
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                sink._serve(self)
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="MjpegSink", daemon=True)
+        self._thread.start()
+        logging.info(f"Serving the MJPEG preview on http://{host}:{port}/")
+
+    def _serve(self, request:BaseHTTPRequestHandler):
+        """ Handles a request on its server thread """
+        if request.path == "/frame.jpg":
+            with self._condition:
+                self._condition.wait_for(lambda: self._frame is not None or not self._running)
+                frame = self._frame
+            request.send_response(200)
+            request.send_header("Content-Type", "image/jpeg")
+            request.send_header("Content-Length", str(len(frame or b"")))
+            request.end_headers()
+            request.wfile.write(frame or b"")
+            return
+        if request.path != "/":
+            request.send_error(404)
+            return
+
+        request.send_response(200)
+        request.send_header("Content-Type", "multipart/x-mixed-replace; boundary=frame")
+        request.end_headers()
+        sequence = -1
+        try:
+            while True:
+                with self._condition:
+                    self._condition.wait_for(lambda: self._sequence != sequence or not self._running)
+                    if not self._running:
+                        return
+                    frame, sequence = self._frame, self._sequence
+                request.wfile.write(b"--frame\r\nContent-Type: image/jpeg\r\n"
+                    + f"Content-Length: {len(frame)}\r\n\r\n".encode() + frame + b"\r\n")
+        except (ConnectionError, OSError):
+            return
+
+    def write(self, image:Image.Image, timestamp:float):
+        output = io.BytesIO()
+        image.save(output, "JPEG", quality=self.quality)
+        with self._condition:
+            self._frame = output.getvalue()
+            self._sequence += 1
+            self._condition.notify_all()
+
+    def close(self):
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        self._server.shutdown()
+        self._server.server_close()
+
+class Preview:
+    """
+        Headless alternative to the simulator, composes the interfaces at its own rate and hands the frames to a sink
+        Frames are encoded on a worker thread, a frame still waiting when the next is composed is dropped, so a slow
+        sink never changes the apps frame rate
+    """
+    SINKS = ("png", "gif", "mjpeg")
+
+    def __init__(self, interface_manager:InterfaceManager, sink:PreviewSink, rate:int=30, scale:int=1):
+        """ Creates an instance of Preview and starts its worker
+
+        Args:
+            interface_manager: The interface manager with all interfaces loaded
+            sink: Where composed frames are written
+            rate: (OPTIONAL) The rate in hz frames are composed at
+            scale: (OPTIONAL) The integer scale frames are enlarged by
+        """
+        self.sink = sink
+        self.period = 1 / rate
+        self.scale = scale
+        self.frames = 0
+        self.dropped_frames = 0
+
+        self.layout = InterfaceLayout(interface_manager.output_interfaces, padding=0, spacing=1, label_height=0)
+        self.backdrop = self.layout.create_backdrop()
+        self._pending = {interface: (0, 0) + interface.size for interface in self.layout.interfaces}
+        self._next_frame = time.monotonic()
+
+        self._slot = None  # The latest composed frame waiting for the worker
+        self._condition = threading.Condition()
+        self._running = True
+        self._worker = threading.Thread(target=self._work, name="Preview", daemon=True)
+        self._worker.start()
+
+    @staticmethod
+    def create_sink(kind:str, output:str) -> PreviewSink:
+        """ Creates a sink by name
+
+        Args:
+            kind: One of png, gif or mjpeg
+            output: The directory for png, the file for gif or the port for mjpeg
+        Returns:
+            PreviewSink: The sink
+        """
+        if kind == "png":
+            return PngSequenceSink(output or "preview")
+        if kind == "gif":
+            return GifSink(output or "preview.gif")
+        if kind == "mjpeg":
+            return MjpegSink(int(output or 8080))
+        raise ValueError(f"Unknown preview sink {kind}, expected one of {', '.join(Preview.SINKS)}")
+
+    def _work(self):
+        """ Worker thread, writes the latest composed frame to the sink """
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._slot is not None or not self._running)
+                if self._slot is None:
+                    break
+                image, timestamp = self._slot
+                self._slot = None
+            try:
+                self.sink.write(image, timestamp)
+            except Exception:
+                logging.exception("Preview sink failed to write a frame")
+
+        try:
+            self.sink.close()
+        except Exception:
+            logging.exception("Preview sink failed to close")
+
+    def update(self):
+        """ Collects the damaged areas of every interface and composes a frame when one is due """
+        for interface in self.layout.interfaces:
+            if interface.damage is not None:
+                self._pending[interface] = union_box(self._pending.get(interface), interface.damage)
+
+        now = time.monotonic()
+        if now < self._next_frame or not self._pending:
+            return
+        self._next_frame = max(self._next_frame + self.period, now)
+
+        for interface, damage in self._pending.items():
+            x, y = self.layout.positions[interface]
+            self.backdrop.paste(interface.current_image.crop(damage), (x + damage[0], y + damage[1]))
+        self._pending.clear()
+
+        image = self.backdrop.copy()
+        if self.scale != 1:
+            image = image.resize((image.width * self.scale, image.height * self.scale), Image.NEAREST)
+        with self._condition:
+            if self._slot is not None:
+                self.dropped_frames += 1
+            self._slot = (image, now)
+            self._condition.notify()
+        self.frames += 1
+
+    def destroy(self):
+        """ Writes any waiting frame, then stops the worker and closes the sink """
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        self._worker.join()
+        logging.info(f"Preview composed {self.frames} frame(s), {self.dropped_frames} dropped")
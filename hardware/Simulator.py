@@ -1,25 +1,33 @@
 import logging
+import time
 from PIL import Image as PilImage
-from PIL import ImageOps, ImageDraw, ImageTk, ImageFont
+from PIL import ImageTk
 from tkinter import *
 from typing import Callable
 
 from hardware.InterfaceManager import InterfaceManager
+from hardware.InterfaceLayout import InterfaceLayout
+from hardware.Damage import union_box
 
 
 class Simulator(Tk):
     """
         Simulator UI used to show an interface for running this application on a local machine
+        The window shows a static backdrop with a PhotoImage per interface on top, only the damaged areas of
+        interfaces are rescaled and only damaged interfaces are uploaded to Tk. The window refreshes at its own rate,
+        independent of the app
     """
     MAX_WIDTH = 300
     SCALE = 3
+    DEFAULT_RATE = 60
 
-    def __init__(self, interface_manager:InterfaceManager, close_event:Callable):
+    def __init__(self, interface_manager:InterfaceManager, close_event:Callable, rate:int=DEFAULT_RATE):
         """ Creates an instance of Simulator
         
         Args:
             interface_manager: The interface manager with all interfaces loaded
             close_event: The function to call when this window is signalled to close
+            rate: (OPTIONAL) The refresh rate of the window in hz
         """
         super().__init__()
         self.resizable(False, False)
@@ -28,65 +36,50 @@ class Simulator(Tk):
 
         self.interfaces = interface_manager
         self.close_event = close_event
+        self.period = 1 / rate
+        self.refreshes = 0
 
         logging.debug("Generating simulator layout from interfaces..")
+        self.layout = InterfaceLayout(interface_manager.output_interfaces, self.MAX_WIDTH)
+        backdrop = self.layout.create_backdrop(outline="red", labels=True)
+        backdrop = backdrop.resize((backdrop.width * self.SCALE, backdrop.height * self.SCALE), PilImage.NEAREST)
+        self.backdrop_photo = ImageTk.PhotoImage(backdrop)
+        self.canvas = Canvas(self, width=backdrop.width, height=backdrop.height, highlightthickness=0)
+        self.canvas.create_image(0, 0, anchor=NW, image=self.backdrop_photo)
+        self.canvas.pack()
 
-        # Calculate interface positions
-        self.positions = {}
-        self.dimensions = [1, 1]
-        x = 1
-        y = 10
-        max_height = 0
-        for interface in interface_manager.interfaces:
-            self.positions[interface] = [x, y]
+        self.scaled = {}  # Interface to its scaled image, damaged areas are rescaled into it
+        self.photos = {}  # Interface to the PhotoImage showing it
+        for interface in self.layout.interfaces:
+            x, y = self.layout.positions[interface]
+            self.scaled[interface] = PilImage.new("RGB", (interface.size[0] * self.SCALE, interface.size[1] * self.SCALE))
+            self.photos[interface] = ImageTk.PhotoImage(self.scaled[interface])
+            self.canvas.create_image(x * self.SCALE, y * self.SCALE, anchor=NW, image=self.photos[interface])
 
-            # Expand dimensions for simulator image cache
-            if x + interface.size[0] + 1 > self.dimensions[0]:
-                self.dimensions[0] = x + interface.size[0] + 1
-            if y + interface.size[1] + 1 > self.dimensions[1]:
-                self.dimensions[1] = y + interface.size[1] + 1
-            
-            # Compute next position
-            x += interface.size[0] + 5
-            if interface.size[1] > max_height:
-                max_height = interface.size[1]
-
-            if x > self.MAX_WIDTH:  # New row
-                x = 0
-                y += max_height + 15
-                max_height = 0
-        
-        # Generate simulator background
-        self.backdrop = PilImage.new("RGB", tuple(self.dimensions), "black")
-        backdrop_draw = ImageDraw.Draw(self.backdrop)
-        font = ImageFont.load_default()
-        for interface in interface_manager.interfaces:
-            position = self.positions[interface]
-            backdrop_draw.rectangle((
-                position[0] - 1,
-                position[1] - 1,
-                position[0] + interface.size[0],
-                position[1] + interface.size[1]
-            ), outline="red")
-            backdrop_draw.text((position[0], position[1]-12), interface.name, "white", font)
-
-        self.image_label = Label(self)
-        self.image_label.pack()
+        self._pending = {interface: (0, 0) + interface.size for interface in self.layout.interfaces}
+        self._next_refresh = time.monotonic()
     
     def on_destroy(self):
         logging.warning("Recieved window close event, signaling application")
         self.close_event()
     
     def update(self):
-        """ Displays all the interface outputs on the simulator """
-        for interface in self.interfaces.interfaces:
-            self.backdrop.paste(interface.image, tuple(self.positions[interface]))
-        
-        # Not very efficent though this is only for development
-        if self.SCALE != 1:
-            self.image_photo = ImageTk.PhotoImage(ImageOps.scale(self.backdrop, self.SCALE, PilImage.NEAREST))
-        else:
-            self.image_photo = ImageTk.PhotoImage(self.backdrop)
-        
-        self.image_label.config(image=self.image_photo)
+        """ Collects the damaged areas of every interface and refreshes the window when it is next due """
+        for interface in self.layout.interfaces:
+            if interface.damage is not None:
+                self._pending[interface] = union_box(self._pending.get(interface), interface.damage)
+
+        now = time.monotonic()
+        if now < self._next_refresh:
+            return
+        self._next_refresh = max(self._next_refresh + self.period, now)
+
+        if self._pending:
+            for interface, damage in self._pending.items():
+                area = interface.current_image.crop(damage)
+                area = area.resize((area.width * self.SCALE, area.height * self.SCALE), PilImage.NEAREST)
+                self.scaled[interface].paste(area, (damage[0] * self.SCALE, damage[1] * self.SCALE))
+                self.photos[interface].paste(self.scaled[interface])
+            self._pending.clear()
+            self.refreshes += 1
         super().update()
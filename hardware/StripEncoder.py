@@ -0,0 +1,83 @@
+import numpy
+from typing import Tuple
+from PIL import Image
+
+class StripEncoder:
+    """
+        Converts interface images into the raw byte order of an LED strip
+        The wiring is resolved into an index map once, each frame is then encoded with a single gather
+    """
+    CORNERS = ("Top left", "Top right", "Bottom left", "Bottom right")
+
+    def __init__(self, size:Tuple[int, int], serpentine:bool=False, start_corner:str="Top left",
+            vertical:bool=False, colour_order:str="RGB"):
+        """ Creates an instance of StripEncoder
+
+        Args:
+            size: The width and height of the interface the strip is laid out as
+            serpentine: (OPTIONAL) Every other row (or column) is wired in reverse, zig-zagging across the image
+            start_corner: (OPTIONAL) The corner of the image the first LED is in, one of CORNERS
+            vertical: (OPTIONAL) The strip runs along columns instead of rows
+            colour_order: (OPTIONAL) The order the strip expects the colour channels in, e.g. GRB
+        Raises:
+            ValueError: An unknown start corner or colour order was given
+        """
+        if start_corner not in self.CORNERS:
+            raise ValueError(f"Unknown strip start corner {start_corner}")
+        colour_order = colour_order.upper()
+        if sorted(colour_order) != sorted("RGB"):
+            raise ValueError(f"Unknown strip colour order {colour_order}")
+
+        self.size = tuple(size)
+        self.led_count = self.size[0] * self.size[1]
+        self._channels = ["RGB".index(channel) for channel in colour_order]
+        self._pixels = self._build_pixel_map(serpentine, start_corner, vertical)
+        self._index_maps = {}
+        self._output = numpy.zeros(self.led_count * 3, numpy.uint8)
+
+    def _build_pixel_map(self, serpentine:bool, start_corner:str, vertical:bool) -> numpy.ndarray:
+        """ Computes the image pixel index of every LED along the strip
+
+        Returns:
+            numpy.ndarray: Flat pixel indices (y * width + x) in strip order
+        """
+        width, height = self.size
+        if vertical:
+            lines, length = width, height
+        else:
+            lines, length = height, width
+
+        along = numpy.tile(numpy.arange(length), lines).reshape(lines, length)
+        if serpentine:
+            along[1::2] = along[1::2, ::-1]
+        across = numpy.repeat(numpy.arange(lines), length).reshape(lines, length)
+
+        xs, ys = (across, along) if vertical else (along, across)
+        if start_corner.endswith("right"):
+            xs = width - 1 - xs
+        if start_corner.startswith("Bottom"):
+            ys = height - 1 - ys
+        return (ys * width + xs).reshape(-1)
+
+    def _index_map(self, bands:int) -> numpy.ndarray:
+        """ Gets the byte index map for images with the given number of bands, e.g. 3 for RGB and 4 for RGBX
+
+        Returns:
+            numpy.ndarray: Indices into the flat image bytes for every output byte
+        """
+        if bands not in self._index_maps:
+            channels = numpy.array(self._channels)
+            self._index_maps[bands] = (self._pixels[:, None] * bands + channels[None, :]).reshape(-1)
+        return self._index_maps[bands]
+
+    def encode(self, image:Image.Image) -> memoryview:
+        """ Encodes an image into strip data
+
+        Args:
+            image: The interface image, matching the size of this encoder
+        Returns:
+            memoryview: 3 bytes per LED in strip order, the memory is reused by the next call
+        """
+        pixels = numpy.asarray(image).reshape(-1)
+        numpy.take(pixels, self._index_map(len(image.getbands())), out=self._output)
+        return memoryview(self._output)
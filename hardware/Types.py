@@ -10,3 +10,9 @@ class HardwareType(Enum):
     Input = 0
     Output = 1
     InputOutput = 2
+
+class GroupTransform(Enum):
+    Identity = 0
+    Flip_horizontal = 1
+    Flip_vertical = 2
+    Rotate_180 = 3
@@ -0,0 +1,86 @@
+"""
+    Stand-in for the rpi-rgb-led-matrix python bindings, used to exercise hardware code on a normal machine
+    Only the parts of the API used by this project are provided, frames are kept in PIL images for inspection
+"""
+import time
+from PIL import Image
+
+
+class RGBMatrixOptions:
+    """
+        Mirrors the options object of the rgbmatrix library
+    """
+    def __init__(self):
+        self.rows = 32
+        self.cols = 32
+        self.chain_length = 1
+        self.parallel = 1
+        self.hardware_mapping = "regular"
+        self.gpio_slowdown = 1
+        self.panel_type = ""
+        self.drop_privileges = True
+        self.brightness = 100
+        self.limit_refresh_rate_hz = 0
+
+
+class FrameCanvas:
+    """
+        An offscreen canvas that can be drawn to and swapped onto the emulated panel
+    """
+    def __init__(self, width:int, height:int):
+        self.width = width
+        self.height = height
+        self.brightness = 100
+        self.image = Image.new("RGB", (width, height), "black")
+
+    def SetImage(self, image:Image.Image, offset_x:int=0, offset_y:int=0, unsafe:bool=True):
+        if image.mode != "RGB":
+            raise Exception("Currently, only RGB mode is supported for SetImage(). Please create images with mode 'RGB' or convert first with image = image.convert('RGB').")
+        self.image.paste(image, (offset_x, offset_y))
+
+    def SetPixel(self, x:int, y:int, red:int, green:int, blue:int):
+        if 0 <= x < self.width and 0 <= y < self.height:
+            self.image.putpixel((x, y), (red, green, blue))
+
+    def Fill(self, red:int, green:int, blue:int):
+        self.image.paste((red, green, blue), (0, 0, self.width, self.height))
+
+    def Clear(self):
+        self.Fill(0, 0, 0)
+
+
+class RGBMatrix(FrameCanvas):
+    """
+        The emulated panel, acts as the live canvas and emulates the vsync of the real refresh thread
+    """
+    DEFAULT_REFRESH_RATE = 120
+
+    def __init__(self, rows:int=32, chains:int=1, parallel:int=1, options:RGBMatrixOptions=None):
+        if options is None:
+            options = RGBMatrixOptions()
+            options.rows = rows
+            options.chain_length = chains
+            options.parallel = parallel
+
+        super().__init__(options.cols * options.chain_length, options.rows * options.parallel)
+        self.brightness = options.brightness
+        self.swap_count = 0
+
+        refresh_rate = options.limit_refresh_rate_hz or self.DEFAULT_REFRESH_RATE
+        self._refresh_period = 1 / refresh_rate
+        self._epoch = time.monotonic()
+
+    def CreateFrameCanvas(self) -> FrameCanvas:
+        return FrameCanvas(self.width, self.height)
+
+    def SwapOnVSync(self, canvas:FrameCanvas, framerate_fraction:int=1) -> FrameCanvas:
+        """ Waits for the next emulated vsync, shows the canvas and returns the previously shown canvas """
+        period = self._refresh_period * max(1, framerate_fraction)
+        elapsed = time.monotonic() - self._epoch
+        delay = period - (elapsed % period)
+        time.sleep(delay)
+
+        # The returned canvas holds the previously shown frame, as with the real library
+        self.image, canvas.image = canvas.image, self.image
+        self.swap_count += 1
+        return canvas
@@ -1,10 +1,18 @@
+import time
+STARTED = time.perf_counter()  # Before the other imports, so they're included in the startup report
+
 import logging
+import json
 import os
+import signal
 import argparse
 import commentjson
 
 from UserConfig import UserConfig
+from animation.AssetCache import AssetCache
 from app import App
+from runtime.FrameScheduler import SchedulePolicy
+from runtime.StartupTimer import StartupTimer
 
 LOGGING_FORMAT = "%(asctime)s [%(levelname)s]: %(message)s"
 LOGGING_LEVELS = {
@@ -28,12 +36,33 @@ def parse_arguments() -> argparse.Namespace:
     parser.add_argument("-simulate", action="store_true",
         help="Launch a simulator instead of interfacing with the real hardware")
     
+    parser.add_argument("-preview", type=str, default=None, choices=["png", "gif", "mjpeg"],
+        help="Write frames to a png sequence, animated gif or local mjpeg stream instead of the hardware")
+    
+    parser.add_argument("-preview_output", type=str, default=None,
+        help="The directory for png, file for gif or port for mjpeg previews")
+    
     parser.add_argument("-loglevel", type=str, default="debug", choices=list(LOGGING_LEVELS),
         help="The logging level to run the application in")
     
     parser.add_argument("-resetconfig", action="store_true",
         help="Wipes the user configuration and saves a default empty one")
     
+    parser.add_argument("-trace", type=str, default=None,
+        help="Writes a Chrome/Perfetto trace of the last frames to this file on exit")
+    
+    parser.add_argument("-runtime", type=str, default=None, choices=["loop", "asyncio"],
+        help="Run the app in a plain sleep loop or on an asyncio event loop with its services, overrides the config")
+    
+    parser.add_argument("-benchmark", action="store_true",
+        help="Runs every animation headless against Null hardware as fast as possible and saves the results")
+    
+    parser.add_argument("-benchmark_frames", type=int, default=500,
+        help="The number of frames to run each animation for when benchmarking")
+    
+    parser.add_argument("-benchmark_output", type=str, default="benchmark.json",
+        help="The json file to write the benchmark results to")
+    
     return parser.parse_args()
 
 
@@ -47,6 +76,8 @@ def main(args:argparse.Namespace):
         format=LOGGING_FORMAT,
         level=LOGGING_LEVELS.get(args.loglevel.lower(), logging.NOTSET)
     )
+    timer = StartupTimer(STARTED)
+    timer.mark("imports")
     
     logging.debug(f"Loading json configuration file at {args.config}")
     with open(args.config, "rb") as jfile:
@@ -63,10 +94,14 @@ def main(args:argparse.Namespace):
             userConfig.save_userconfig()
     
     userConfig.load_userconfig()
+    AssetCache.shared().byte_budget = config.get("Asset_cache_bytes", AssetCache.DEFAULT_BUDGET)
+    timer.mark("config")
 
     # Test envo
     from hardware.Configuration import Configuration
     rpi_conf = Configuration()
+    rpi_conf.name = "RpiMatrix"
+    rpi_conf.hardware_library = "RpiMatrix"
     rpi_conf.width = 64
     rpi_conf.height = 32
     
@@ -99,16 +134,58 @@ def main(args:argparse.Namespace):
         ]
     }
 
+    if args.benchmark:
+        from runtime.Benchmark import Benchmark
+        benchmark = Benchmark(userConfig, args.benchmark_frames, config.get("Shared_framebuffers", False))
+        results = benchmark.run()
+        with open(args.benchmark_output, "w") as output:
+            json.dump(results, output, indent=4)
+        logging.info(f"Benchmark results written to {args.benchmark_output}")
+        return
+
     app = App(userConfig)
-    if args.simulate:
-        app.load_simulator_and_interfaces()
+    if args.preview:
+        app.load_preview_and_interfaces(args.preview, args.preview_output, config.get("Preview_rate", 30),
+            config.get("Preview_scale", 1))
+    elif args.simulate:
+        app.load_simulator_and_interfaces(config.get("Simulator_rate", 60))
     else:
-        app.load_hardware_and_interfaces()
-    app.load_set("TestSet")
-    app.set.change_animation("Calibrate")
+        app.load_hardware_and_interfaces(config.get("Shared_framebuffers", False))
+        if config.get("Pipelined_push", False):
+            app.enable_pipelined_push(config.get("Push_queue_size", 1))
+    timer.mark("hardware")
+
+    boot = config.get("Boot", {})
+    app.boot(boot.get("Set", "TestSet"), boot.get("Animation", "Calibrate"), boot.get("Budget", 0.5), timer)
+
+    if hasattr(signal, "SIGUSR1"):
+        # Dumps a frame trace on demand, e.g. kill -USR1 <pid>
+        signal.signal(signal.SIGUSR1, lambda *_: app.request_trace(f"zerogen_trace_{int(time.time())}.json"))
 
     logging.info("Entering main loop, precc Ctrl-C to quit")
-    app.mainloop(config["Refresh_rate"])
+    policy = SchedulePolicy[config.get("Frame_policy", "Drop")]
+    api = None
+    if config.get("APIPort"):
+        from runtime.APIServer import APIServer  # Imports asyncio, so it's kept until after the first frame
+        api = APIServer(app, config["APIPort"])
+    timer.mark("services")
+    logging.info(f"Startup: {timer.format_report()}")
+
+    if (args.runtime or config.get("Runtime", "loop")) == "asyncio":
+        from runtime.AsyncRuntime import AsyncRuntime
+        runtime = AsyncRuntime(app)
+        if api is not None:
+            runtime.add_service("API", api.serve)
+        runtime.run(config["Refresh_rate"], policy)
+    else:
+        if api is not None:
+            api.start_thread()
+        app.mainloop(config["Refresh_rate"], policy)
+        if api is not None:
+            api.stop()
+
+    if args.trace:
+        app.dump_trace(args.trace)
 
 
 if __name__ == "__main__":
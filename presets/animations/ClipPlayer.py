@@ -0,0 +1,90 @@
+import logging
+import time
+
+from animation.IAnimation import IAnimation
+from animation.CompiledClip import CompiledClip
+from hardware.InterfaceManager import InterfaceManager
+
+class ClipPlayer(IAnimation):
+    """
+        Plays a compiled clip, frames are copied straight from the memory mapped file into the interfaces
+        Compile clips for the interface layout with tool_launcher.py -compile_clip
+
+        Arguments:
+            File: The compiled clip to play
+            Loop: (OPTIONAL) Restart the clip once it ends, defaults to true
+    """
+    def __init__(self, manager:InterfaceManager):
+        """ Creates an instance of ClipPlayer
+
+        Args:
+            manager: The instance of the interface manager with all it's interfaces loaded
+        """
+        self.manager = manager
+        self.file = None
+        self.loop = True
+
+        self._clip = None
+        self._targets = []
+        self._index = 0
+        self._frame_end = 0
+
+    def load_from_user_config(self, config:dict):
+        self.file = config["File"]
+        self.loop = config.get("Loop", True)
+
+    def _open(self):
+        """ Maps the clip and matches its layout to the loaded interfaces """
+        self._clip = CompiledClip(self.file)
+        self._targets = []
+        for name, size, offset in self._clip.layout:
+            interface = self.manager.get_interface(name)
+            if interface is None:
+                logging.warning(f"Clip {self.file} targets unknown interface {name}, it will be skipped")
+            elif tuple(interface.size) != tuple(size):
+                logging.warning(f"Clip {self.file} was compiled for {name} at {size}, "
+                    f"the interface is {interface.size}, it will be skipped")
+            else:
+                self._targets.append((interface, offset, size[0] * size[1] * 3))
+
+    def start(self):
+        if self.file is None:
+            logging.warning("ClipPlayer has no file to play")
+            return
+        if self._clip is None:
+            self._open()
+        self._index = -1
+        self._frame_end = time.monotonic()
+
+    def update(self):
+        if self._clip is None or self._clip.frame_count == 0:
+            return
+
+        now = time.monotonic()
+        if now < self._frame_end:
+            return
+
+        index = self._index + 1
+        if index >= self._clip.frame_count:
+            if not self.loop or self._clip.frame_count == 1:
+                return
+            index = 0
+        self._index = index
+
+        frame = self._clip.frame(index)
+        for interface, offset, length in self._targets:
+            interface.image.frombytes(frame[offset:offset + length], "raw", "RGB")
+        del frame
+
+        duration = self._clip.duration(index)
+        self._frame_end += duration
+        if self._frame_end < now:
+            self._frame_end = now + duration
+
+    def stop(self):
+        pass
+
+    def teardown(self):
+        if self._clip is not None:
+            self._clip.close()
+            self._clip = None
@@ -1,27 +1,192 @@
+import logging
+import threading
+import time
+from PIL import Image
+
 from animation.IAnimation import IAnimation
+from animation.AssetCache import AssetCache
+from animation.ClipDecoder import ClipDecoder
+from animation.FrameCache import FrameCache
 from hardware.InterfaceManager import InterfaceManager
+from hardware.Types import DisplayForms
 
 class FileViewer(IAnimation):
     """
         File playback animation, used to display static images or animated clips
+        Frames are decoded lazily, kept in a memory bounded cache and decoded ahead of time on a prefetch thread
+        Still images and image sequences are shared with other animations through the process wide asset cache
+
+        Arguments:
+            File: An animated image (GIF, APNG, WebP), a still image, a directory or a glob pattern of images
+            Interfaces: (OPTIONAL) Names of the interfaces to show the clip on, all matrix interfaces by default
+            Loop: (OPTIONAL) Restart the clip once it ends, defaults to true
+            Cache_bytes: (OPTIONAL) The memory budget of decoded frames, defaults to 4MB
+            Prefetch: (OPTIONAL) The number of frames to decode ahead, defaults to 8
+            Resample: (OPTIONAL) Nearest or Bilinear scaling, defaults to Nearest
     """
+    RESAMPLING = {"Nearest": Image.NEAREST, "Bilinear": Image.BILINEAR}
+
     def __init__(self, manager:InterfaceManager):
         """ Creates an instance of FileViewer
-        
+
         Args:
             manager: The instance of the interface manager with all it's interfaces loaded
         """
         self.manager = manager
-        # TODO
-        #   Store interfaces used and segment positions in seperate file
-        #   Use image loader, or video playback, must conserve RAM
-        #   Patial interfaces an be used for animation
-    
+        self.file = None
+        self.loop = True
+        self.prefetch = 8
+        self.resample = Image.NEAREST
+        self.interfaces = [interface for interface in manager.render_targets if interface.form == DisplayForms.Matrix]
+        self.cache = FrameCache(4 * 1024 * 1024, self._release_frame)
+
+        self._decoder = None
+        self._index = 0
+        self._shown = None
+        self._frame_end = 0
+        self._condition = threading.Condition()
+        self._prefetcher = None
+        self._running = False
+
+    def load_from_user_config(self, config:dict):
+        self.file = config["File"]
+        self.loop = config.get("Loop", True)
+        self.prefetch = config.get("Prefetch", 8)
+        self.resample = self.RESAMPLING[config.get("Resample", "Nearest")]
+        self.cache.byte_budget = config.get("Cache_bytes", self.cache.byte_budget)
+        if "Interfaces" in config:
+            self.interfaces = [self.manager.get_interface(name) for name in config["Interfaces"]]
+            self.interfaces = [interface for interface in self.interfaces if interface is not None]
+
+    @staticmethod
+    def _release_frame(frame:tuple):
+        """ Releases the images of a frame evicted from the cache, decoded clip frames aren't in the asset cache """
+        for image in frame[0].values():
+            AssetCache.shared().release(image)
+
+    @property
+    def _sizes(self) -> list:
+        return list({interface.size for interface in self.interfaces})
+
+    def _get_frame(self, index:int) -> tuple:
+        """ Gets a frame from the cache, decoding it if it isn't cached
+
+        Args:
+            index: The frame to get
+        Returns:
+            tuple: The frames keyed by size and the frame duration
+        """
+        # Frames aren't touched when shown so they are evicted in decode order, the frames behind the playhead first,
+        # marking the shown frame as recently used would make room for prefetched frames by evicting unshown ones
+        frame = self.cache.get(index, touch=False)
+        if frame is None:
+            frame = self._decoder.decode(index, self._sizes)
+            cached = self.cache.get(index, touch=False)
+            if cached is not None:
+                # The prefetch thread decoded it first, keep the cached frame and release the extra references
+                self._release_frame(frame)
+                return cached
+            self.cache.put(index, frame, sum(FrameCache.image_bytes(image) for image in frame[0].values()))
+        return frame
+
+    @property
+    def _prefetch_window(self) -> int:
+        """ Returns how many frames to decode ahead, limited to what fits in the cache beside the shown frame
+        Prefetching further would evict frames decoded ahead before they are shown, and decode them again forever
+        """
+        frame_bytes = sum(width * height * 4 for width, height in self._sizes)
+        return max(0, min(self.prefetch, self.cache.byte_budget // max(frame_bytes, 1) - 1))
+
+    def _prefetch_loop(self):
+        """ Prefetch thread, decodes the frames following the current frame into the cache """
+        window = self._prefetch_window
+        while True:
+            with self._condition:
+                if not self._running:
+                    return
+                index = self._index
+
+            upcoming = None
+            for ahead in range(1, window + 1):
+                candidate = index + ahead
+                if candidate >= self._decoder.frame_count:
+                    if not self.loop:
+                        break
+                    candidate %= self._decoder.frame_count
+                if candidate not in self.cache:
+                    upcoming = candidate
+                    break
+
+            if upcoming is None:
+                with self._condition:
+                    if self._running and self._index == index:
+                        self._condition.wait()
+                continue
+
+            try:
+                self._get_frame(upcoming)
+            except:
+                logging.exception(f"Failed to decode frame {upcoming} of {self.file}")
+                return
+
     def start(self):
-        pass
+        if self.file is None:
+            logging.warning("FileViewer has no file to play")
+            return
+
+        if self._decoder is None:
+            self._decoder = ClipDecoder(self.file, self.resample, AssetCache.shared())
+        self._index = 0
+        self._shown = None
+        self._frame_end = time.monotonic()
+
+        if self._decoder.frame_count > 1 and self._prefetch_window > 0:
+            self._running = True
+            self._prefetcher = threading.Thread(target=self._prefetch_loop, name="FileViewerPrefetch", daemon=True)
+            self._prefetcher.start()
 
     def update(self):
-        pass
+        if self._decoder is None:
+            return
+
+        now = time.monotonic()
+        if self._shown is not None and now < self._frame_end:
+            return
+
+        if self._shown is not None:
+            index = self._index + 1
+            if index >= self._decoder.frame_count:
+                if not self.loop or self._decoder.frame_count == 1:
+                    return
+                index = 0
+            with self._condition:
+                self._index = index
+                self._condition.notify()
+
+        frames, duration = self._get_frame(self._index)
+        for interface in self.interfaces:
+            interface.image.paste(frames[interface.size])
+        self._shown = self._index
+
+        # Keep to the clips timing, resyncing if playback has fallen more than a frame behind
+        self._frame_end += duration
+        if self._frame_end < now:
+            self._frame_end = now + duration
 
     def stop(self):
-        pass
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        if self._prefetcher is not None:
+            self._prefetcher.join()
+            self._prefetcher = None
+
+    def memory_usage(self) -> int:
+        return self.cache.used_bytes
+
+    def teardown(self):
+        self.stop()
+        if self._decoder is not None:
+            self._decoder.close()
+            self._decoder = None
+        self.cache.clear()
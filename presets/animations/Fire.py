@@ -0,0 +1,68 @@
+import numpy
+from typing import Tuple
+
+from animation.ArrayEffect import ArrayEffect
+from hardware.InterfaceManager import InterfaceManager
+
+class Fire(ArrayEffect):
+    """
+        Fire rising from the bottom of the frame, each step heat rises a row, drifting randomly sideways and cooling
+        The fire is stepped at a fixed rate, so it burns the same regardless of the refresh rate
+
+        Arguments:
+            Colours: (OPTIONAL) The RGB colours from cold to hot, defaults to black, red, orange, yellow and white
+            Cooling: (OPTIONAL) How quickly the flames die down, larger values give shorter flames, defaults to 1
+            Rate: (OPTIONAL) Fire steps per second, defaults to 30
+            Speed: (OPTIONAL) Scales the rate, defaults to 1
+    """
+    PARAMETERS = ArrayEffect.PARAMETERS + ("Colours", "Cooling", "Rate")
+    MAX_STEPS = 4  # Steps taken per frame when catching up, so a stall doesn't cause a burst of work
+
+    def __init__(self, manager:InterfaceManager):
+        """ Creates an instance of Fire
+
+        Args:
+            manager: The instance of the interface manager with all it's interfaces loaded
+        """
+        super().__init__(manager)
+        self.colours = [[0, 0, 0], [160, 0, 0], [255, 96, 0], [255, 200, 0], [255, 255, 200]]
+        self.cooling = 1.0
+        self.rate = 30
+        self._random = numpy.random.default_rng()
+        self._steps = {}  # Size to the number of steps taken
+
+    def prepare(self, size:Tuple[int, int], x:numpy.ndarray, y:numpy.ndarray) -> tuple:
+        self._steps[size] = None
+        # The extra row at the bottom holds the heat source
+        heat = numpy.zeros((size[1] + 1, size[0]), numpy.float32)
+        rows = numpy.arange(1, size[1] + 1)[:, None]
+        columns = numpy.arange(size[0])[None, :]
+        return heat, rows, columns
+
+    def _step(self, heat:numpy.ndarray, rows:numpy.ndarray, columns:numpy.ndarray, cooling:float):
+        """ Advances the fire by one step in place """
+        height, width = heat.shape[0] - 1, heat.shape[1]
+        heat[-1] = self._random.uniform(200, 255, width)
+        drift = (columns + self._random.integers(-1, 2, (height, width))) % width
+        risen = heat[rows, drift]
+        # Cooling half of the pixels each step by twice as much leaves gaps that break the flames into tongues
+        risen -= (self._random.random((height, width), numpy.float32) < 0.5) * (cooling * 2)
+        numpy.maximum(risen, 0, out=heat[:-1])
+
+    def render(self, size:Tuple[int, int], t:float) -> numpy.ndarray:
+        heat, rows, columns = self.grid(size)
+        target = int(t * self.rate)
+        steps = self._steps[size]
+        steps = target - self.MAX_STEPS if steps is None else max(steps, target - self.MAX_STEPS)
+
+        # Heat has to climb the full height, so cooling is scaled to give flames the same shape at any height
+        cooling = self.cooling * 480 / size[1]
+        while steps < target:
+            self._step(heat, rows, columns, cooling)
+            steps += 1
+        self._steps[size] = steps
+        return self.palette[heat[:size[1]].astype(numpy.uint8)]
+
+    def teardown(self):
+        super().teardown()
+        self._steps.clear()
@@ -0,0 +1,42 @@
+import math
+import numpy
+from typing import Tuple
+
+from animation.ArrayEffect import ArrayEffect
+from hardware.InterfaceManager import InterfaceManager
+
+class Gradient(ArrayEffect):
+    """
+        Linear gradient between colours at an angle, scrolling along its direction
+
+        Arguments:
+            Colours: (OPTIONAL) The RGB colours of the gradient, it wraps back to the first colour
+            Angle: (OPTIONAL) The direction of the gradient in degrees, 0 runs left to right
+            Length: (OPTIONAL) The length in pixels of one repeat of the gradient, defaults to 64
+            Speed: (OPTIONAL) Repeats scrolled per second, 0 for a still gradient, defaults to 0.25
+    """
+    PARAMETERS = ArrayEffect.PARAMETERS + ("Colours", "Angle", "Length")
+    GRID_PARAMETERS = ("Angle", "Length")
+    CYCLIC_PALETTE = True
+
+    def __init__(self, manager:InterfaceManager):
+        """ Creates an instance of Gradient
+
+        Args:
+            manager: The instance of the interface manager with all it's interfaces loaded
+        """
+        super().__init__(manager)
+        self.speed = 0.25
+        self.colours = [[255, 0, 0], [0, 0, 255]]
+        self.angle = 0
+        self.length = 64
+
+    def prepare(self, size:Tuple[int, int], x:numpy.ndarray, y:numpy.ndarray) -> tuple:
+        angle = math.radians(self.angle)
+        # Position along the gradient in palette entries, so each frame only adds an offset
+        return ((x * math.cos(angle) + y * math.sin(angle)) * (256 / self.length)).astype(numpy.int32),
+
+    def render(self, size:Tuple[int, int], t:float) -> numpy.ndarray:
+        position, = self.grid(size)
+        index = (position + int(t * 256)).astype(numpy.uint8)  # Wraps around the palette
+        return self.palette[index]
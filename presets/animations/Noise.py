@@ -0,0 +1,70 @@
+import numpy
+from typing import Tuple
+
+from animation.ArrayEffect import ArrayEffect
+from hardware.InterfaceManager import InterfaceManager
+
+class Noise(ArrayEffect):
+    """
+        Smooth value noise field that slowly morphs, random values on a coarse lattice are interpolated across the
+        frame and blended into the next lattice over each second
+
+        Arguments:
+            Scale: (OPTIONAL) The spacing in pixels of the noise lattice, defaults to 8
+            Colours: (OPTIONAL) The RGB colours from low to high noise values
+            Seed: (OPTIONAL) The seed of the noise, the same seed always gives the same field
+            Speed: (OPTIONAL) Lattices blended through per second, defaults to 0.5
+    """
+    PARAMETERS = ArrayEffect.PARAMETERS + ("Scale", "Colours", "Seed")
+    GRID_PARAMETERS = ("Scale", "Seed")  # Preparing the grids also discards the lattices of the old seed
+
+    def __init__(self, manager:InterfaceManager):
+        """ Creates an instance of Noise
+
+        Args:
+            manager: The instance of the interface manager with all it's interfaces loaded
+        """
+        super().__init__(manager)
+        self.speed = 0.5
+        self.scale = 8
+        self.colours = [[0, 0, 32], [0, 96, 160], [120, 255, 255]]
+        self.seed = 0
+        self._lattices = {}  # (size, index) of the most recently used lattices
+
+    @staticmethod
+    def _smoothstep(value:numpy.ndarray) -> numpy.ndarray:
+        return value * value * (3 - 2 * value)
+
+    def prepare(self, size:Tuple[int, int], x:numpy.ndarray, y:numpy.ndarray) -> tuple:
+        self._lattices.clear()
+        x, y = x / self.scale, y / self.scale
+        column, row = x.astype(numpy.int32), y.astype(numpy.int32)
+        return column, row, self._smoothstep(x - column), self._smoothstep(y - row)
+
+    def _lattice(self, size:Tuple[int, int], index:int) -> numpy.ndarray:
+        """ Gets the random lattice for a whole second of noise time, generated from the seed so it can be recreated """
+        key = (size, index)
+        if key not in self._lattices:
+            if len(self._lattices) >= 4:
+                self._lattices.pop(next(iter(self._lattices)))
+            shape = (size[1] // self.scale + 2, size[0] // self.scale + 2)
+            self._lattices[key] = numpy.random.default_rng((self.seed, index % 2**32)).random(shape, numpy.float32)
+        return self._lattices[key]
+
+    def _sample(self, lattice:numpy.ndarray, column, row, blend_x, blend_y) -> numpy.ndarray:
+        """ Bilinearly interpolates a lattice at every pixel """
+        top = lattice[row, column] + (lattice[row, column + 1] - lattice[row, column]) * blend_x
+        bottom = lattice[row + 1, column] + (lattice[row + 1, column + 1] - lattice[row + 1, column]) * blend_x
+        return top + (bottom - top) * blend_y
+
+    def render(self, size:Tuple[int, int], t:float) -> numpy.ndarray:
+        grids = self.grid(size)
+        index = int(numpy.floor(t))
+        current = self._sample(self._lattice(size, index), *grids)
+        following = self._sample(self._lattice(size, index + 1), *grids)
+        value = current + (following - current) * float(self._smoothstep(numpy.float32(t - index)))
+        return self.palette[(value * 255).astype(numpy.uint8)]
+
+    def teardown(self):
+        super().teardown()
+        self._lattices.clear()
@@ -0,0 +1,44 @@
+import numpy
+from typing import Tuple
+
+from animation.ArrayEffect import ArrayEffect
+from hardware.InterfaceManager import InterfaceManager
+
+class Plasma(ArrayEffect):
+    """
+        Classic plasma, a sum of sine waves over the frame coloured through a cyclic palette
+
+        Arguments:
+            Scale: (OPTIONAL) The size in pixels of the plasma waves, defaults to 8
+            Colours: (OPTIONAL) The RGB colours the plasma cycles through
+            Speed: (OPTIONAL) How fast the plasma moves, defaults to 1
+    """
+    PARAMETERS = ArrayEffect.PARAMETERS + ("Scale", "Colours")
+    GRID_PARAMETERS = ("Scale",)
+    CYCLIC_PALETTE = True
+
+    def __init__(self, manager:InterfaceManager):
+        """ Creates an instance of Plasma
+
+        Args:
+            manager: The instance of the interface manager with all it's interfaces loaded
+        """
+        super().__init__(manager)
+        self.scale = 8
+        self.colours = [[255, 0, 128], [0, 64, 255], [0, 255, 160], [255, 200, 0]]
+
+    def prepare(self, size:Tuple[int, int], x:numpy.ndarray, y:numpy.ndarray) -> tuple:
+        x, y = x / self.scale, y / self.scale
+        centre_x, centre_y = size[0] / 2 / self.scale, size[1] / 2 / self.scale
+        return x, y, x + y, numpy.hypot(x - centre_x, y - centre_y)
+
+    def render(self, size:Tuple[int, int], t:float) -> numpy.ndarray:
+        x, y, diagonal, radius = self.grid(size)
+        value = numpy.sin(x + t)
+        value += numpy.sin(y * 1.3 - t * 0.7)
+        value += numpy.sin(diagonal * 0.6 + t * 1.3)
+        value += numpy.sin(radius - t * 1.7)
+        # The sum lies in -4 to 4, spread it over the palette twice so colours repeat across the frame. Casting a
+        # float past 255 to uint8 wraps on x86 but saturates on ARM, so it's wrapped as an integer first
+        index = (((value + 4) * 64).astype(numpy.int32) & 255).astype(numpy.uint8)
+        return self.palette[index]
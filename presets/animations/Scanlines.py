@@ -0,0 +1,45 @@
+import numpy
+from typing import Tuple
+
+from animation.ArrayEffect import ArrayEffect
+from hardware.InterfaceManager import InterfaceManager
+
+class Scanlines(ArrayEffect):
+    """
+        CRT style scanlines, every other row dimmed with a bright band sweeping down the frame
+
+        Arguments:
+            Colour: (OPTIONAL) The RGB colour of the lines, defaults to green
+            Dim: (OPTIONAL) The brightness of the dimmed rows from 0 to 1, defaults to 0.3
+            Band: (OPTIONAL) The height in pixels of the sweeping band, defaults to 4
+            Speed: (OPTIONAL) Sweeps down the frame per second, defaults to 0.5
+    """
+    PARAMETERS = ArrayEffect.PARAMETERS + ("Colour", "Dim", "Band")
+    GRID_PARAMETERS = ("Colour", "Dim")
+
+    def __init__(self, manager:InterfaceManager):
+        """ Creates an instance of Scanlines
+
+        Args:
+            manager: The instance of the interface manager with all it's interfaces loaded
+        """
+        super().__init__(manager)
+        self.speed = 0.5
+        self.colour = [0, 255, 64]
+        self.dim = 0.3
+        self.band = 4
+
+    def prepare(self, size:Tuple[int, int], x:numpy.ndarray, y:numpy.ndarray) -> tuple:
+        rows = numpy.arange(size[1], dtype=numpy.float32)
+        base = numpy.where(rows % 2 == 0, 0.6, 0.6 * self.dim).astype(numpy.float32)
+        return rows, base, numpy.array(self.colour, numpy.float32)
+
+    def render(self, size:Tuple[int, int], t:float) -> numpy.ndarray:
+        rows, base, colour = self.grid(size)
+        # The band travels past the bottom edge before wrapping so it fully leaves the frame
+        travel = size[1] + self.band * 2
+        position = (t % 1) * travel - self.band
+        brightness = numpy.minimum(base + numpy.exp(-((rows - position) / self.band) ** 2), 1)
+        line = (brightness[:, None] * colour).astype(numpy.uint8)
+        # Every pixel in a row has the same colour, so the row colours are broadcast instead of computed per pixel
+        return numpy.broadcast_to(line[:, None, :], (size[1], size[0], 3))
@@ -0,0 +1,36 @@
+from PIL import Image
+from hardware.IHardware import IHardware
+from hardware.Configuration import Configuration
+
+class Null(IHardware):
+    """
+        Hardware that accepts every frame and discards it, used to profile the pipeline without any hardware
+    """
+    def __init__(self, config:Configuration):
+        self.image = Image.new("RGB", (config.width, config.height), "black")
+
+    @property
+    def has_inputs(self) -> bool:
+        return False
+
+    @property
+    def supports_push(self) -> bool:
+        return True
+
+    @staticmethod
+    def new_config() -> Configuration:
+        config = Configuration()
+        config.hardware_library = "Null"
+        config.name = "Null"
+        config.width = 64
+        config.height = 32
+        return config
+
+    def update(self):
+        pass
+
+    def push(self, image:Image.Image):
+        pass
+
+    def teardown(self):
+        pass
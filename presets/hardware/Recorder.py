@@ -0,0 +1,84 @@
+import logging
+import threading
+from collections import deque
+from typing import List
+from PIL import Image
+from hardware.IHardware import IHardware
+from hardware.Configuration import Configuration
+
+class Recorder(IHardware):
+    """
+        Hardware that records every pushed frame, either into a bounded in-memory ring or streamed to a raw file
+        Each frame is the colour corrected RGB image bytes, followed by the strip data if any strips are attached
+    """
+    def __init__(self, config:Configuration):
+        self.image = Image.new("RGB", (config.width, config.height), "black")
+        self.mode = config.args["Mode"]
+        self.frame_count = 0
+
+        self._lock = threading.Lock()
+        self._file = None
+        if self.mode == "File":
+            self._file = open(config.args["Path"], "wb")
+            logging.info(f"Recording frames to {config.args['Path']}")
+        self.frames = deque(maxlen=max(1, int(config.args["Frames"])))
+
+    @property
+    def has_inputs(self) -> bool:
+        return False
+
+    @property
+    def supports_push(self) -> bool:
+        return True
+
+    @staticmethod
+    def new_config() -> Configuration:
+        config = Configuration()
+        config.hardware_library = "Recorder"
+        config.name = "Recorder"
+        config.width = 64
+        config.height = 32
+        config.args = {
+            "Mode": "Memory",
+            "Frames": 256,
+            "Path": "recording.raw"
+        }
+        config.display_values = {
+            "Mode": {"Type": "Combo", "Values": ["Memory", "File"]}
+        }
+        return config
+
+    def update(self):
+        self.push(self.image)
+
+    def push(self, image:Image.Image):
+        image = self.colour_correct(image)
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        frame = image.tobytes()
+        if self.strip_data is not None:
+            frame += bytes(self.strip_data)
+
+        with self._lock:
+            self.frame_count += 1
+            if self._file is not None:
+                self._file.write(frame)
+            else:
+                self.frames.append(frame)
+
+    def recorded_images(self) -> List[Image.Image]:
+        """ Rebuilds the frames in the in-memory ring as images, oldest first
+
+        Returns:
+            list: The recorded frames as RGB images
+        """
+        with self._lock:
+            frames = list(self.frames)
+        size = self.image.size
+        return [Image.frombytes("RGB", size, frame[:size[0] * size[1] * 3]) for frame in frames]
+
+    def teardown(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
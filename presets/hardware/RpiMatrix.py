@@ -5,16 +5,20 @@ from hardware.Configuration import Configuration
 
 Import_failure = False
 try:
-    from rgbmatrix import RGBMatrix, RGBMatrixOptions
+    import rgbmatrix
 except ImportError:
     Import_failure = True
     traceback.print_exc()
 
 class RpiMatrix(IHardware):
     def __init__(self, config:Configuration):
-        assert not Import_failure, "Hardware import failed"
+        if config.args.get("Use stub library", False):
+            from hardware.stubs import rgbmatrix as library
+        else:
+            assert not Import_failure, "Hardware import failed"
+            library = rgbmatrix
 
-        options = RGBMatrixOptions()
+        options = library.RGBMatrixOptions()
         options.rows = config.args["rows"]
         options.cols = config.args["columns"]
         options.chain_length = config.args["Chain length"]
@@ -25,13 +29,25 @@ class RpiMatrix(IHardware):
         if config.args["Panel type"]:
             options.panel_type = config.args["Panel type"]
 
-        self.matrix = RGBMatrix(options=options)
+        self.matrix = library.RGBMatrix(options=options)
         self.image = Image.new("RGB", (self.matrix.width, self.matrix.height), "black")
 
+        # Frames are drawn to an offscreen canvas and swapped in on vsync to avoid tearing
+        self.canvas = self.matrix.CreateFrameCanvas() if config.args.get("VSync", True) else None
+        self._vsync_pacing = self.canvas is not None and config.args.get("VSync pacing", False)
+
     @property
     def has_inputs(self) -> bool:
         return False
 
+    @property
+    def supports_push(self) -> bool:
+        return True
+
+    @property
+    def paces_frames(self) -> bool:
+        return self._vsync_pacing
+
     @staticmethod
     def new_config() -> Configuration:
         config = Configuration()
@@ -48,7 +64,10 @@ class RpiMatrix(IHardware):
             "Drop privileges": False,
             "Hardware mapping": "adafruit-hat",
             "Panel type": "",
-            "GPIO Slowdown": "1"
+            "GPIO Slowdown": "1",
+            "VSync": True,
+            "VSync pacing": False,
+            "Use stub library": False
         }
         config.display_values = {
             "Hardware mapping": {"Type": "Combo", "Values":
@@ -58,7 +77,17 @@ class RpiMatrix(IHardware):
         return config
     
     def update(self):
-        self.matrix.SetImage(self.image)
+        self.push(self.image)
+
+    def push(self, image:Image.Image):
+        image = self.colour_correct(image)
+        if image.mode != "RGB":  # Shared framebuffers are RGBX
+            image = image.convert("RGB")
+        if self.canvas is not None:
+            self.canvas.SetImage(image)
+            self.canvas = self.matrix.SwapOnVSync(self.canvas)
+        else:
+            self.matrix.SetImage(image)
 
     def teardown(self):
         pass
@@ -0,0 +1,423 @@
+import asyncio
+import base64
+import hashlib
+import io
+import json
+import logging
+import struct
+import threading
+import time
+from http import HTTPStatus
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from animation.AssetCache import AssetCache
+from animation.Transition import TransitionType
+from hardware.InterfaceLayout import InterfaceLayout
+
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+OPCODE_BINARY = 0x2
+OPCODE_CLOSE = 0x8
+OPCODE_PING = 0x9
+OPCODE_PONG = 0xA
+
+class APIError(Exception):
+    """ Raised by route handlers to respond with an error status """
+    def __init__(self, status:HTTPStatus, message:str):
+        super().__init__(message)
+        self.status = status
+
+class PreviewClient:
+    """
+        A connected preview stream, only the latest encoded frame is kept so a slow client skips frames
+        instead of queueing them
+    """
+    def __init__(self, writer:asyncio.StreamWriter, rate:float):
+        """ Creates an instance of PreviewClient
+
+        Args:
+            writer: The stream of the websocket connection
+            rate: The maximum frames per second to send
+        """
+        self.writer = writer
+        self.rate = rate
+        self.latest = None
+        self.sent_frames = 0
+        self.dropped_frames = 0
+        self.ready = asyncio.Event()
+
+    def offer(self, frame:bytes):
+        """ Replaces the frame waiting to be sent with a newer one """
+        if self.latest is not None:
+            self.dropped_frames += 1
+        self.latest = frame
+        self.ready.set()
+
+class APIServer:
+    """
+        HTTP and WebSocket control API, served on the APIPort with asyncio streams
+        Commands are queued onto the render thread with App.call_on_frame, preview frames are captured at a frame
+        boundary and PNG encoded on an executor so neither blocks rendering
+
+        Routes:
+            GET /status: The current set and animation and the frame rate
+            GET /sets: The sets in the user config and their animations
+            GET /animations: The animations of the current set and their status
+            GET /stats: Frame counters, stage timing percentiles and asset cache usage
+            GET /preview.png: A single preview of every interface
+            GET /preview: WebSocket stream of PNG previews, ?rate= sets the frames per second
+            POST /sets/<name>: Loads a set and starts its first animation, the optional json body may give an Animation
+            POST /animations/<name>: Changes animation, the optional json body may give a Transition and Duration
+            POST /triggers/<input>/<event>: Sends an input event to the trigger bindings, the optional json body
+                may give its Value
+    """
+    PREVIEW_RATE = 5
+    MAX_PREVIEW_RATE = 15
+    MAX_REQUEST_BYTES = 16 * 1024
+    REQUEST_TIMEOUT = 10.0
+
+    def __init__(self, app, port:int, host:str="0.0.0.0"):
+        """ Creates an instance of APIServer
+
+        Args:
+            app: The app to control
+            port: The port to listen on
+            host: (OPTIONAL) The address to listen on, all addresses by default
+        """
+        self.app = app
+        self.port = port
+        self.host = host
+
+        self._layout = None
+        self._clients = set()
+        self._preview_task = None
+        self._server = None
+        self._loop = None
+        self._thread = None
+
+        self.routes = {
+            ("GET", "status"): self.get_status,
+            ("GET", "sets"): self.get_sets,
+            ("GET", "animations"): self.get_animations,
+            ("GET", "stats"): self.get_stats,
+            ("GET", "preview.png"): self.get_preview,
+            ("POST", "sets"): self.post_set,
+            ("POST", "animations"): self.post_animation,
+            ("POST", "triggers"): self.post_trigger,
+        }
+
+    #region Serving
+
+    async def serve(self):
+        """ Serves the API until cancelled, register this as a service of the asyncio runtime """
+        self._loop = asyncio.get_running_loop()
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port,
+            limit=self.MAX_REQUEST_BYTES)
+        logging.info(f"API listening on {self.host}:{self.port}")
+        try:
+            async with self._server:
+                await self._server.serve_forever()
+        finally:
+            if self._preview_task is not None:
+                self._preview_task.cancel()
+            for client in list(self._clients):
+                client.writer.close()
+
+    def start_thread(self):
+        """ Serves the API on its own thread and event loop, for when the app runs in the plain loop runtime """
+        def run():
+            try:
+                asyncio.run(self.serve())
+            except asyncio.CancelledError:
+                pass
+            except OSError:
+                logging.exception(f"API failed to listen on port {self.port}")
+
+        self._thread = threading.Thread(target=run, name="APIServer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """ Stops a server started with start_thread """
+        if self._thread is None:
+            return
+        if self._loop is not None and self._server is not None:
+            self._loop.call_soon_threadsafe(self._server.close)
+        self._thread.join(1.0)
+        self._thread = None
+
+    async def _handle_connection(self, reader:asyncio.StreamReader, writer:asyncio.StreamWriter):
+        """ Handles a single request, upgrading preview requests to a websocket """
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.REQUEST_TIMEOUT)
+            request_line, *header_lines = head.decode("latin-1").split("\r\n")
+            method, target, _ = request_line.split(" ", 2)
+            headers = {}
+            for line in header_lines:
+                if ":" in line:
+                    key, value = line.split(":", 1)
+                    headers[key.strip().lower()] = value.strip()
+
+            url = urlsplit(target)
+            path = [unquote(part) for part in url.path.split("/") if part]
+            query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+            if method == "GET" and path == ["preview"] and headers.get("upgrade", "").lower() == "websocket":
+                await self._serve_preview(reader, writer, headers, query)
+                return
+
+            body = b""
+            length = int(headers.get("content-length", 0))
+            if length > self.MAX_REQUEST_BYTES:
+                raise APIError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body is too large")
+            if length > 0:
+                body = await asyncio.wait_for(reader.readexactly(length), self.REQUEST_TIMEOUT)
+
+            handler = self.routes.get((method, path[0] if path else ""))
+            if handler is None:
+                raise APIError(HTTPStatus.NOT_FOUND, f"No route for {method} {url.path}")
+            result = await handler(path[1:], query, body)
+
+            if isinstance(result, bytes):
+                await self._respond(writer, HTTPStatus.OK, result, "image/png")
+            else:
+                await self._respond(writer, HTTPStatus.OK, json.dumps(result).encode(), "application/json")
+        except APIError as error:
+            await self._respond(writer, error.status, json.dumps({"Error": str(error)}).encode(), "application/json")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError, ValueError):
+            await self._respond(writer, HTTPStatus.BAD_REQUEST, b"", "text/plain")
+        except ConnectionError:
+            pass
+        except Exception:
+            logging.exception("API request failed")
+            await self._respond(writer, HTTPStatus.INTERNAL_SERVER_ERROR, b"", "text/plain")
+        finally:
+            writer.close()
+
+    async def _respond(self, writer:asyncio.StreamWriter, status:HTTPStatus, body:bytes, content_type:str):
+        """ Writes a complete response, the connection is closed afterwards """
+        head = (f"HTTP/1.1 {status.value} {status.phrase}\r\nContent-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\nAccess-Control-Allow-Origin: *\r\nConnection: close\r\n\r\n")
+        try:
+            writer.write(head.encode("latin-1") + body)
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    async def _on_frame(self, func, *args):
+        """ Runs a function on the render thread at the next frame boundary and waits for its result """
+        return await asyncio.wrap_future(self.app.call_on_frame(func, *args))
+
+    #endregion
+
+    #region Routes
+
+    async def get_status(self, path:list, query:dict, body:bytes) -> dict:
+        animation_set = self.app.set
+        animation = animation_set.current_animation if animation_set is not None else None
+        scheduler = self.app.scheduler
+        return {
+            "Set": animation_set.name if animation_set is not None else None,
+            "Animation": animation.name if animation is not None else None,
+            "Transitioning": animation_set.transitioning if animation_set is not None else False,
+            "Target_rate": scheduler.target_rate if scheduler is not None else None,
+            "Rate": scheduler.rate if scheduler is not None else None,
+            "Preview_clients": len(self._clients)
+        }
+
+    async def get_sets(self, path:list, query:dict, body:bytes) -> dict:
+        return {name: {
+            "Name": config["Name"],
+            "Animations": [animation["Name"] for animation in config["Animations"]]
+        } for name, config in self.app.config.sets.items()}
+
+    async def get_animations(self, path:list, query:dict, body:bytes) -> dict:
+        animation_set = self.app.set
+        if animation_set is None:
+            raise APIError(HTTPStatus.CONFLICT, "No set is loaded")
+        return {name: {
+            "Status": animation.status.name,
+            "Loaded": animation.loaded,
+            "Memory_usage": animation.memory_usage()
+        } for name, animation in list(animation_set.animations.items())}
+
+    async def get_stats(self, path:list, query:dict, body:bytes) -> dict:
+        scheduler = self.app.scheduler
+        stats = {
+            "Frames": scheduler.frames if scheduler is not None else 0,
+            "Late_frames": scheduler.late_frames if scheduler is not None else 0,
+            "Dropped_frames": scheduler.dropped_frames if scheduler is not None else 0,
+            "Assets": AssetCache.shared().stats()
+        }
+        stats["Stages"] = await asyncio.get_running_loop().run_in_executor(None, self.app.profiler.percentiles)
+        return stats
+
+    async def get_preview(self, path:list, query:dict, body:bytes) -> bytes:
+        return await self._capture_preview()
+
+    @staticmethod
+    def _options(body:bytes) -> dict:
+        """ Parses the JSON object of options sent with a request
+
+        Args:
+            body: The request body, empty for no options
+        Returns:
+            dict: The options
+        Raises:
+            APIError: The body is JSON but not an object
+        """
+        options = json.loads(body) if body else {}
+        if not isinstance(options, dict):
+            raise APIError(HTTPStatus.BAD_REQUEST, "Expected a JSON object of options")
+        return options
+
+    async def post_set(self, path:list, query:dict, body:bytes) -> dict:
+        if len(path) != 1:
+            raise APIError(HTTPStatus.NOT_FOUND, "Expected /sets/<name>")
+        if path[0] not in self.app.config.sets:
+            raise APIError(HTTPStatus.NOT_FOUND, f"Unknown set {path[0]}")
+
+        options = self._options(body)
+        animation = options.get("Animation")
+        if animation is not None and \
+                animation not in [config["Name"] for config in self.app.config.sets[path[0]]["Animations"]]:
+            raise APIError(HTTPStatus.NOT_FOUND, f"Set {path[0]} has no animation {animation}")
+        await self._on_frame(self.app.change_set, path[0], animation)
+        return await self.get_status([], {}, b"")
+
+    async def post_animation(self, path:list, query:dict, body:bytes) -> dict:
+        if len(path) != 1:
+            raise APIError(HTTPStatus.NOT_FOUND, "Expected /animations/<name>")
+        animation_set = self.app.set
+        if animation_set is None:
+            raise APIError(HTTPStatus.CONFLICT, "No set is loaded")
+        if path[0] not in animation_set.animations:
+            raise APIError(HTTPStatus.NOT_FOUND, f"Unknown animation {path[0]}")
+
+        options = self._options(body)
+        try:
+            transition = TransitionType[options["Transition"]] if "Transition" in options else None
+        except KeyError:
+            raise APIError(HTTPStatus.BAD_REQUEST, f"Unknown transition {options['Transition']}")
+        await self._on_frame(animation_set.change_animation, path[0], transition, options.get("Duration"))
+        return await self.get_status([], {}, b"")
+
+    async def post_trigger(self, path:list, query:dict, body:bytes) -> dict:
+        if len(path) != 2:
+            raise APIError(HTTPStatus.NOT_FOUND, "Expected /triggers/<input>/<event>")
+        options = self._options(body)
+        self.app.triggers.push_event(path[0], path[1], options.get("Value"))
+        return {"Bound": self.app.triggers.lookup(path[0], path[1]) is not None}
+
+    #endregion
+
+    #region Preview
+
+    def _snapshot(self):
+        """ Copies every interface into one image, runs on the render thread between frames """
+        if self._layout is None:
+            self._layout = InterfaceLayout(self.app.interfaces.output_interfaces, padding=0, spacing=1, label_height=0)
+        image = self._layout.create_backdrop()
+        self._layout.compose(image)
+        return image
+
+    @staticmethod
+    def _encode(image) -> bytes:
+        output = io.BytesIO()
+        image.save(output, "PNG", compress_level=1)
+        return output.getvalue()
+
+    async def _capture_preview(self) -> bytes:
+        """ Snapshots the interfaces at a frame boundary and encodes them off the render thread """
+        image = await self._on_frame(self._snapshot)
+        return await asyncio.get_running_loop().run_in_executor(None, self._encode, image)
+
+    async def _preview_loop(self):
+        """ Captures previews at the rate of the fastest client and offers them to every client """
+        while self._clients:
+            start = time.monotonic()
+            frame = await self._capture_preview()
+            for client in list(self._clients):
+                client.offer(frame)
+            rate = max(client.rate for client in self._clients) if self._clients else self.PREVIEW_RATE
+            await asyncio.sleep(max(0, 1 / rate - (time.monotonic() - start)))
+        self._preview_task = None
+
+    async def _serve_preview(self, reader:asyncio.StreamReader, writer:asyncio.StreamWriter, headers:dict,
+            query:dict):
+        """ Completes the websocket handshake and streams previews until the client leaves """
+        key = headers.get("sec-websocket-key")
+        if key is None:
+            raise APIError(HTTPStatus.BAD_REQUEST, "Missing Sec-WebSocket-Key")
+        accept = base64.b64encode(hashlib.sha1((key + WEBSOCKET_GUID).encode()).digest()).decode()
+        writer.write((f"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode("latin-1"))
+        await writer.drain()
+
+        rate = min(self.MAX_PREVIEW_RATE, max(0.1, float(query.get("rate", self.PREVIEW_RATE))))
+        client = PreviewClient(writer, rate)
+        self._clients.add(client)
+        if self._preview_task is None:
+            self._preview_task = asyncio.get_running_loop().create_task(self._preview_loop())
+        logging.debug(f"Preview client connected at {rate} fps")
+
+        receiver = asyncio.get_running_loop().create_task(self._receive_websocket(reader, writer))
+        try:
+            while not receiver.done():
+                ready = asyncio.get_running_loop().create_task(client.ready.wait())
+                await asyncio.wait((ready, receiver), return_when=asyncio.FIRST_COMPLETED)
+                if not ready.done():
+                    ready.cancel()
+                    break
+
+                client.ready.clear()
+                frame, client.latest = client.latest, None
+                sent = time.monotonic()
+                await self._send_websocket(writer, OPCODE_BINARY, frame)
+                client.sent_frames += 1
+                await asyncio.sleep(max(0, 1 / client.rate - (time.monotonic() - sent)))
+        except ConnectionError:
+            pass
+        finally:
+            self._clients.discard(client)
+            receiver.cancel()
+            logging.debug(f"Preview client left after {client.sent_frames} frame(s), "
+                f"{client.dropped_frames} dropped")
+
+    @staticmethod
+    async def _send_websocket(writer:asyncio.StreamWriter, opcode:int, payload:bytes):
+        """ Writes a single unmasked websocket frame """
+        length = len(payload)
+        if length < 126:
+            head = struct.pack("!BB", 0x80 | opcode, length)
+        elif length < 65536:
+            head = struct.pack("!BBH", 0x80 | opcode, 126, length)
+        else:
+            head = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+        writer.write(head + payload)
+        await writer.drain()
+
+    async def _receive_websocket(self, reader:asyncio.StreamReader, writer:asyncio.StreamWriter):
+        """ Reads client frames, answering pings, until the client closes the connection """
+        try:
+            while True:
+                first, second = await reader.readexactly(2)
+                opcode = first & 0x0F
+                length = second & 0x7F
+                if length == 126:
+                    length, = struct.unpack("!H", await reader.readexactly(2))
+                elif length == 127:
+                    length, = struct.unpack("!Q", await reader.readexactly(8))
+                if length > self.MAX_REQUEST_BYTES:
+                    return
+                mask = await reader.readexactly(4) if second & 0x80 else b"\0\0\0\0"
+                payload = bytes(byte ^ mask[index % 4] for index, byte in enumerate(await reader.readexactly(length)))
+
+                if opcode == OPCODE_CLOSE:
+                    await self._send_websocket(writer, OPCODE_CLOSE, payload[:2])
+                    return
+                if opcode == OPCODE_PING:
+                    await self._send_websocket(writer, OPCODE_PONG, payload)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            return
+
+    #endregion
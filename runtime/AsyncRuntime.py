@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import signal
+from typing import Awaitable, Callable
+
+from animation.IAnimation import IAnimation
+from runtime.FrameScheduler import FrameScheduler, SchedulePolicy
+
+class AsyncRuntime:
+    """
+        Runs an app on an asyncio event loop, rendering is a task paced by a FrameScheduler
+        Services such as the API server or input polling run as coroutines in the same loop, so no thread is needed
+        per concern and everything shares the single core between frames
+    """
+    def __init__(self, app):
+        """ Creates an instance of AsyncRuntime
+
+        Args:
+            app: The app to run, with its hardware, interfaces and set loaded
+        """
+        self.app = app
+        self.loop = None
+
+        self._services = {}
+        self._tasks = {}
+        self._hooked = None  # The animation instance the current hook task belongs to
+        self._hook_task = None
+
+    def add_service(self, name:str, service:Callable[[], Awaitable]):
+        """ Registers a coroutine function to run alongside rendering, started with the runtime
+
+        Args:
+            name: The name of the service, used for logging
+            service: Called with no arguments to create the services coroutine
+        """
+        self._services[name] = service
+        if self.loop is not None and self.loop.is_running():
+            self._start_service(name)
+
+    def _start_service(self, name:str):
+        """ Starts a registered service as a task on the running loop """
+        task = self.loop.create_task(self._services[name](), name=f"Service {name}")
+        task.add_done_callback(lambda task: self._service_done(name, task))
+        self._tasks[name] = task
+
+    def _service_done(self, name:str, task:asyncio.Task):
+        """ Logs services that stop while the app is still running """
+        self._tasks.pop(name, None)
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            logging.error(f"Service {name} failed", exc_info=task.exception())
+        elif self.app.running:
+            logging.debug(f"Service {name} finished")
+
+    def _update_animation_hook(self):
+        """ Starts the run_async hook of the current animation and cancels the hook of the previous one """
+        animation = self.app.set.current_animation if self.app.set is not None else None
+        instance = animation.instance if animation is not None else None
+        if instance is self._hooked:
+            return
+
+        if self._hook_task is not None:
+            self._hook_task.cancel()
+            self._hook_task = None
+        self._hooked = instance
+
+        if instance is not None and type(instance).run_async is not IAnimation.run_async:
+            self._hook_task = self.loop.create_task(instance.run_async(), name=f"Animation {animation.name}")
+            self._hook_task.add_done_callback(self._hook_done)
+
+    def _hook_done(self, task:asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            logging.error("Animation coroutine hook failed", exc_info=task.exception())
+
+    async def _render(self, rate:int, policy:SchedulePolicy):
+        """ The render task, updates the app each frame and sleeps until the next deadline """
+        paced = self.app.paced_by_hardware
+        if paced:
+            logging.info("Frame rate is paced by the hardware refresh")
+
+        self.app.scheduler = FrameScheduler(rate, policy)
+        self.app.scheduler.start()
+        while self.app.running:
+            self.app.update()
+            self._update_animation_hook()
+
+            delay = self.app.scheduler.frame_done()
+            # Always yield, even for late or paced frames, so services still get a turn every frame
+            await asyncio.sleep(delay if delay > 0 and not paced else 0)
+
+    async def _main(self, rate:int, policy:SchedulePolicy):
+        self.loop = asyncio.get_running_loop()
+        try:
+            self.loop.add_signal_handler(signal.SIGINT, self._interrupt)
+        except (NotImplementedError, RuntimeError):
+            pass  # Not supported on this platform, KeyboardInterrupt is caught by run instead
+
+        for name in list(self._services):
+            self._start_service(name)
+
+        try:
+            await self._render(rate, policy)
+        finally:
+            tasks = list(self._tasks.values())
+            if self._hook_task is not None:
+                tasks.append(self._hook_task)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self._hook_task = None
+            self._hooked = None
+
+    def _interrupt(self):
+        logging.warning("Recieved keyboard interrupt, exiting...")
+        self.app.signal_terminate()
+
+    def run(self, rate:int, policy:SchedulePolicy=SchedulePolicy.Drop):
+        """ Runs the app until it is terminated then tears it down, blocking the calling thread
+
+        Args:
+            rate: Refresh rate in hz to update the app
+            policy: (OPTIONAL) How frames that overrun their deadline are handled
+        """
+        try:
+            asyncio.run(self._main(rate, policy))
+        except KeyboardInterrupt:
+            self._interrupt()
+        finally:
+            self.loop = None
+
+        scheduler = self.app.scheduler
+        if scheduler is not None:
+            logging.info(f"Ran {scheduler.frames} frame(s), {scheduler.late_frames} late "
+                f"and {scheduler.dropped_frames} dropped")
+        self.app.teardown()
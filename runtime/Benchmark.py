@@ -0,0 +1,153 @@
+import logging
+import os
+import time
+from typing import List, Tuple
+
+from UserConfig import UserConfig
+from app import App
+from animation.Transition import TransitionType
+from hardware.Types import DisplayForms
+from presets.hardware.Null import Null
+from runtime.FrameProfiler import FrameProfiler
+
+try:
+    import resource
+except ImportError:  # Not availible on Windows
+    resource = None
+
+def peak_rss() -> int:
+    """ Gets the peak resident memory of this process
+
+    Returns:
+        int: The peak resident set size in kilobytes, 0 if it cannot be measured on this platform
+    """
+    if resource is None:
+        return 0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def current_rss() -> int:
+    """ Gets the resident memory of this process right now
+
+    Returns:
+        int: The resident set size in kilobytes, 0 if it cannot be measured on this platform
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, AttributeError, IndexError):
+        return 0
+
+class Benchmark:
+    """
+        Runs every animation in the configured sets as fast as possible against Null hardware
+        Sets are loaded without the background preloader and each animation is loaded, cut to and rendered for a
+        few warm up frames first, so the timed frames don't include loading, first use or a transition
+    """
+    WARMUP_FRAMES = 10
+    def __init__(self, config:UserConfig, frames:int=500, shared_framebuffers:bool=False):
+        """ Creates an instance of Benchmark
+
+        Args:
+            config: The loaded user configuration, providing the hardware, interfaces and sets
+            frames: (OPTIONAL) The number of frames to run each animation for
+            shared_framebuffers: (OPTIONAL) Benchmark with interfaces drawing straight into hardware framebuffers
+        """
+        self.config = config
+        self.frames = frames
+        self.shared_framebuffers = shared_framebuffers
+
+    @staticmethod
+    def layout_config(layout:List[Tuple[str, Tuple[int, int]]], animations:List[str]) -> UserConfig:
+        """ Builds a user config in memory for benchmarking animations on a layout without a config file
+
+        Args:
+            layout: The name and size of each matrix interface, placed side by side on one piece of hardware
+            animations: The module paths of the animations, e.g. presets.animations.Plasma
+        Returns:
+            UserConfig: The config with a single set named Benchmark holding the animations
+        """
+        config = UserConfig("benchmark.zerousr")  # Never saved
+        hardware = Null.new_config()
+        hardware.width = sum(size[0] for _, size in layout)
+        hardware.height = max(size[1] for _, size in layout)
+        config.hardware[hardware.name] = hardware
+
+        offset = 0
+        for name, size in layout:
+            config.interfaces.append({
+                "Hardware": hardware.name,
+                "Name": name,
+                "Form": DisplayForms.Matrix.value,
+                "Offset": [offset, 0],
+                "Size": list(size)
+            })
+            offset += size[0]
+
+        config.sets["Benchmark"] = {
+            "Name": "Benchmark",
+            "Animations": [{"Name": path.rsplit(".", 1)[-1], "Path": path} for path in animations]
+        }
+        return config
+
+    def create_app(self) -> App:
+        """ Creates an app with the configured interfaces attached to Null hardware
+
+        Returns:
+            App: The app, ready for a set to be loaded
+        """
+        app = App(self.config)
+        for name, hardware_config in self.config.hardware.items():
+            app.hardware.hardware[name] = Null(hardware_config)
+        app.interfaces.initilize_interfaces(self.config.interfaces, app.hardware, self.shared_framebuffers)
+        app.interfaces.initilize_groups(self.config.groups)
+        return app
+
+    def run_animation(self, app:App, name:str) -> dict:
+        """ Runs a single animation of the loaded set for the configured number of frames
+
+        Args:
+            app: The app with the animations set loaded
+            name: The name of the animation to run
+        Returns:
+            dict: The results of the animation
+        """
+        rss = current_rss()
+        app.set.animations[name].load()
+        app.set.change_animation(name, TransitionType.Cut)
+        for _ in range(self.WARMUP_FRAMES):
+            app.update()
+
+        app.profiler = FrameProfiler(self.frames)
+        start = time.perf_counter()
+        for _ in range(self.frames):
+            app.update()
+        elapsed = time.perf_counter() - start
+
+        return {
+            "fps": self.frames / elapsed if elapsed > 0 else 0,
+            "seconds": elapsed,
+            "stages": app.profiler.percentiles((50, 99)),
+            "rss_delta_kb": current_rss() - rss  # Includes loading the animation, peak_rss only ever grows
+        }
+
+    def run(self) -> dict:
+        """ Runs every animation in every set
+
+        Returns:
+            dict: The results keyed by set and animation name
+        """
+        app = self.create_app()
+        results = {"frames": self.frames, "sets": {}}
+
+        for set_name in self.config.sets:
+            app.load_set(set_name, preload=False)  # A preloading thread would compete with the timed frames
+            set_results = {}
+            for name in app.set.animations:
+                logging.info(f"Benchmarking {set_name}/{name} for {self.frames} frames")
+                set_results[name] = self.run_animation(app, name)
+                logging.info(f"{set_name}/{name}: {set_results[name]['fps']:.1f} fps")
+            results["sets"][set_name] = set_results
+
+        app.teardown()
+        results["peak_rss_kb"] = peak_rss()
+        return results
@@ -0,0 +1,132 @@
+import json
+import os
+import time
+from array import array
+from typing import Dict, Sequence
+
+class FrameProfiler:
+    """
+        Times each stage of a frame into a fixed size ring buffer
+        Rolling percentiles can be reported from the buffer and it can be exported as a Chrome/Perfetto trace
+        Frames are recorded into plain arrays, NumPy is only imported once a report is made so it stays off the boot path
+    """
+    STAGES = ("animation", "paste", "push", "simulator")
+
+    def __init__(self, capacity:int=1024, stages:Sequence[str]=STAGES):
+        """ Creates an instance of FrameProfiler
+
+        Args:
+            capacity: (OPTIONAL) The number of frames kept in the ring buffer
+            stages: (OPTIONAL) The names of the stages timed each frame
+        """
+        self.capacity = capacity
+        self.stages = tuple(stages)
+        self._stage_index = {stage: index for index, stage in enumerate(self.stages)}
+
+        # Per stage values are stored row major, capacity rows of one value per stage
+        self._frame_starts = array("d", [0.0]) * capacity
+        self._frame_ends = array("d", [0.0]) * capacity
+        self._stage_starts = array("d", [0.0]) * (capacity * len(self.stages))
+        self._durations = array("d", [0.0]) * (capacity * len(self.stages))
+        self._no_durations = array("d", [0.0]) * len(self.stages)
+
+        self._row = 0
+        self._count = 0
+        self._last_mark = 0.0
+
+    def begin_frame(self):
+        """ Starts timing a new frame, overwriting the oldest frame once the buffer is full """
+        self._last_mark = time.perf_counter()
+        self._frame_starts[self._row] = self._last_mark
+        base = self._row * len(self.stages)
+        self._durations[base:base + len(self.stages)] = self._no_durations
+
+    def mark(self, stage:str):
+        """ Records the time since the previous mark (or the frame start) against a stage
+
+        Args:
+            stage: The name of the stage that just finished
+        """
+        now = time.perf_counter()
+        index = self._row * len(self.stages) + self._stage_index[stage]
+        if self._durations[index] == 0:
+            self._stage_starts[index] = self._last_mark
+        self._durations[index] += now - self._last_mark
+        self._last_mark = now
+
+    def end_frame(self):
+        """ Finishes the current frame """
+        self._frame_ends[self._row] = time.perf_counter()
+        self._row = (self._row + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def _ordered_rows(self) -> list:
+        """ Returns the indices of the recorded frames, oldest first """
+        if self._count < self.capacity:
+            return list(range(self._count))
+        return [(row + self._row) % self.capacity for row in range(self.capacity)]
+
+    def percentiles(self, percentiles:Sequence[float]=(50, 90, 99)) -> Dict[str, Dict[str, float]]:
+        """ Calculates percentiles of each stage and the whole frame over the frames in the buffer
+
+        Args:
+            percentiles: (OPTIONAL) The percentiles to calculate
+        Returns:
+            dict: Milliseconds for each percentile keyed by stage, e.g. {"animation": {"p50": 1.2}}
+        """
+        import numpy
+
+        rows = self._ordered_rows()
+        if len(rows) == 0:
+            return {}
+
+        durations = numpy.frombuffer(self._durations).reshape(self.capacity, len(self.stages))
+        columns = dict(zip(self.stages, durations[rows].T))
+        columns["frame"] = numpy.frombuffer(self._frame_ends)[rows] - numpy.frombuffer(self._frame_starts)[rows]
+
+        report = {}
+        for stage, durations in columns.items():
+            values = numpy.percentile(durations, percentiles) * 1000
+            report[stage] = {f"p{percentile:g}": float(value) for percentile, value in zip(percentiles, values)}
+        return report
+
+    def format_report(self) -> str:
+        """ Formats the stage percentiles as a single readable line
+
+        Returns:
+            str: The report, e.g. "animation p50 1.20ms p99 3.40ms | ..."
+        """
+        parts = []
+        for stage, values in self.percentiles((50, 99)).items():
+            parts.append(f"{stage} " + " ".join(f"{name} {value:.2f}ms" for name, value in values.items()))
+        return " | ".join(parts)
+
+    def export_trace(self, path:str):
+        """ Writes the frames in the buffer as a Chrome/Perfetto trace, viewable in chrome://tracing or ui.perfetto.dev
+
+        Args:
+            path: The json file to write
+        """
+        rows = self._ordered_rows()
+        origin = self._frame_starts[rows[0]] if len(rows) else 0
+        pid = os.getpid()
+
+        events = []
+        for frame, row in enumerate(rows):
+            events.append({
+                "name": "frame", "ph": "X", "pid": pid, "tid": 0,
+                "ts": (self._frame_starts[row] - origin) * 1e6,
+                "dur": (self._frame_ends[row] - self._frame_starts[row]) * 1e6,
+                "args": {"frame": frame}
+            })
+            for stage_index, stage in enumerate(self.stages):
+                index = row * len(self.stages) + stage_index
+                if self._durations[index] > 0:
+                    events.append({
+                        "name": stage, "ph": "X", "pid": pid, "tid": 0,
+                        "ts": (self._stage_starts[index] - origin) * 1e6,
+                        "dur": self._durations[index] * 1e6
+                    })
+
+        with open(path, "w") as trace_file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, trace_file)
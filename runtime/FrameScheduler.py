@@ -0,0 +1,97 @@
+import logging
+import time
+from enum import Enum
+
+class SchedulePolicy(Enum):
+    CatchUp = 0  # Late frames run back to back until the schedule is met again
+    Drop = 1  # Deadlines that have fully passed are skipped
+    Degrade = 2  # As Drop, but the frame rate is lowered while frames keep overrunning
+
+class FrameScheduler:
+    """
+        Paces frames against absolute deadlines, so an overrunning frame never shifts the schedule
+        Late and dropped frames are counted and handled by the selected policy
+    """
+    MAX_CATCH_UP = 5  # Frames behind after which catching up gives up and skips to the current deadline
+    DEGRADE_AFTER = 10  # Consecutive late frames before the rate is lowered
+    RECOVER_AFTER = 2.0  # Seconds of on time frames before a lowered rate is raised again
+
+    def __init__(self, rate:int, policy:SchedulePolicy=SchedulePolicy.Drop):
+        """ Creates an instance of FrameScheduler
+
+        Args:
+            rate: The target frame rate in hz
+            policy: (OPTIONAL) How frames that miss their deadline are handled
+        """
+        self.target_rate = rate
+        self.policy = policy
+
+        self.frames = 0
+        self.late_frames = 0
+        self.dropped_frames = 0
+
+        self._divisor = 1
+        self._period = 1 / rate
+        self._deadline = None
+        self._late_streak = 0
+        self._on_time_streak = 0
+
+    @property
+    def rate(self) -> float:
+        """ Returns the frame rate currently being scheduled, this is below the target rate when degraded """
+        return self.target_rate / self._divisor
+
+    @property
+    def deadline(self) -> float:
+        """ Returns the monotonic time the current frame should be finished by """
+        return self._deadline
+
+    def start(self):
+        """ Starts the schedule from now, call before the first frame """
+        self._deadline = time.monotonic() + self._period
+
+    def frame_done(self) -> float:
+        """ Called when a frame has finished, advances the schedule to the next frame
+
+        Returns:
+            float: The time in seconds to wait before starting the next frame
+        """
+        if self._deadline is None:
+            self.start()
+
+        now = time.monotonic()
+        self.frames += 1
+
+        if now <= self._deadline:
+            delay = self._deadline - now
+            self._late_streak = 0
+            self._on_time_streak += 1
+            self._deadline += self._period
+            if self.policy == SchedulePolicy.Degrade and self._divisor > 1 and \
+                    self._on_time_streak * self._period >= self.RECOVER_AFTER:
+                self._set_divisor(self._divisor - 1)
+            return delay
+
+        self.late_frames += 1
+        self._late_streak += 1
+        self._on_time_streak = 0
+        behind = int((now - self._deadline) // self._period)  # Deadlines after this one that have also passed
+
+        if self.policy == SchedulePolicy.CatchUp and behind < self.MAX_CATCH_UP:
+            self._deadline += self._period
+        else:
+            self.dropped_frames += behind
+            self._deadline += (behind + 1) * self._period
+
+        if self.policy == SchedulePolicy.Degrade and self._late_streak >= self.DEGRADE_AFTER:
+            self._set_divisor(self._divisor + 1)
+        return 0
+
+    def _set_divisor(self, divisor:int):
+        """ Changes the rate divisor, the next deadline is kept and the schedule continues from it """
+        self._divisor = divisor
+        self._deadline += (divisor / self.target_rate) - self._period
+        self._period = divisor / self.target_rate
+        self._late_streak = 0
+        self._on_time_streak = 0
+        logging.info(f"Frame rate changed to {self.rate:.1f}hz")
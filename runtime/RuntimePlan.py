@@ -0,0 +1,110 @@
+import importlib.util
+import json
+import logging
+import os
+
+class RuntimePlan:
+    """
+        The parts of booting that only depend on the user config, worked out once and cached beside the config
+        The plan is keyed by the hash of the config file, so an unchanged config skips validation, hardware library
+        discovery and animation module resolution on the next boot
+    """
+    VERSION = 2  # Bumped when validation gets stricter, so configs cached as valid are checked again
+
+    def __init__(self, config_hash:str):
+        """ Creates an empty instance of RuntimePlan, use compile or load to fill it
+
+        Args:
+            config_hash: The hash of the user config the plan was compiled from
+        """
+        self.config_hash = config_hash
+        self.hardware_libraries = {}  # Hardware name to its preset library
+        self.animation_modules = {}  # Set name to a dictionary of animation name to absolute module path
+
+    @staticmethod
+    def _module_exists(module:str) -> bool:
+        try:
+            return importlib.util.find_spec(module) is not None
+        except (ImportError, ValueError):
+            return False
+
+    @staticmethod
+    def compile(config:dict, config_hash:str) -> "RuntimePlan":
+        """ Compiles a plan from a validated user config
+
+        Args:
+            config: The user config, at the current version
+            config_hash: The hash of the user config file
+        Returns:
+            RuntimePlan: The compiled plan
+        """
+        plan = RuntimePlan(config_hash)
+        for hardware in config["Hardware"]:
+            library = hardware.get("Library", "NotSet")
+            if RuntimePlan._module_exists(f"presets.hardware.{library}"):
+                plan.hardware_libraries[hardware["Name"]] = library
+            else:
+                logging.warning(f"Hardware {hardware['Name']} uses unknown library {library}")
+
+        for set_name, set_config in config["Sets"].items():
+            modules = {}
+            for animation in set_config["Animations"]:
+                path = animation["Path"]
+                try:
+                    module = importlib.util.resolve_name(path, animation.get("Package"))
+                except (ImportError, ValueError):
+                    module = None
+                if module is not None and RuntimePlan._module_exists(module):
+                    modules[animation["Name"]] = module
+                else:
+                    logging.warning(f"Animation {animation['Name']} of set {set_name} has an unknown module {path}")
+            plan.animation_modules[set_name] = modules
+
+        logging.debug(f"Compiled runtime plan for user config {config_hash[:12]}")
+        return plan
+
+    @staticmethod
+    def load(path:str, config_hash:str) -> "RuntimePlan":
+        """ Loads a cached plan if it was compiled from the same config
+
+        Args:
+            path: The cached plan file
+            config_hash: The hash of the user config being loaded
+        Returns:
+            RuntimePlan: The cached plan
+            None: There is no cached plan for this config
+        """
+        try:
+            with open(path, "r") as plan_file:
+                cached = json.load(plan_file)
+        except (OSError, ValueError):
+            return None
+
+        if not isinstance(cached, dict) or cached.get("Version") != RuntimePlan.VERSION or \
+                cached.get("Config_hash") != config_hash:
+            return None
+
+        plan = RuntimePlan(config_hash)
+        plan.hardware_libraries = cached["Hardware_libraries"]
+        plan.animation_modules = cached["Animation_modules"]
+        logging.debug("Using cached runtime plan")
+        return plan
+
+    def save(self, path:str):
+        """ Caches the plan, failing to write it only costs the next boot a recompile
+
+        Args:
+            path: The file to cache the plan in
+        """
+        try:
+            temporary = path + ".tmp"
+            with open(temporary, "w") as plan_file:
+                json.dump({
+                    "Version": self.VERSION,
+                    "Config_hash": self.config_hash,
+                    "Hardware_libraries": self.hardware_libraries,
+                    "Animation_modules": self.animation_modules
+                }, plan_file)
+            os.replace(temporary, path)
+        except OSError:
+            logging.warning(f"Failed to cache the runtime plan at {path}")
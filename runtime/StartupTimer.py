@@ -0,0 +1,45 @@
+import time
+from typing import Dict
+
+class StartupTimer:
+    """
+        Times each phase of startup, from the process start until the app is fully running
+    """
+    def __init__(self, start:float=None):
+        """ Creates an instance of StartupTimer
+
+        Args:
+            start: (OPTIONAL) The perf_counter time startup began, now if not given
+        """
+        self.start = start if start is not None else time.perf_counter()
+        self.phases = []  # (phase, seconds) in the order they finished
+        self._last = self.start
+
+    @property
+    def elapsed(self) -> float:
+        """ Returns the seconds since startup began """
+        return time.perf_counter() - self.start
+
+    def mark(self, phase:str):
+        """ Records the time since the previous mark (or the start) against a phase
+
+        Args:
+            phase: The name of the phase that just finished
+        """
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+
+    def as_dict(self) -> Dict[str, float]:
+        """ Returns the milliseconds of each phase and the total """
+        report = {phase: duration * 1000 for phase, duration in self.phases}
+        report["total"] = (self._last - self.start) * 1000
+        return report
+
+    def format_report(self) -> str:
+        """ Formats the phases as a single readable line
+
+        Returns:
+            str: The report, e.g. "imports 85ms, config 3ms, total 88ms"
+        """
+        return ", ".join(f"{phase} {duration:.0f}ms" for phase, duration in self.as_dict().items())
@@ -0,0 +1,214 @@
+import logging
+import time
+from collections import deque
+from enum import Enum
+
+from animation.Transition import TransitionType
+from hardware.Interface import InputInterface
+
+class TriggerAction(Enum):
+    Animation = 0  # Changes the current animation of the set
+    Parameter = 1  # Sets a parameter of an animation
+    Set = 2  # Loads another set
+
+class TriggerBinding:
+    """
+        A binding compiled from a sets "Trigger_bindings", resolved once so dispatching it is only a lookup
+    """
+    def __init__(self, key:tuple, config:dict):
+        """ Creates an instance of TriggerBinding
+
+        Args:
+            key: The (input, event) the binding is triggered by
+            config: The binding from the user config
+        Raises:
+            KeyError: A required field of the binding is missing or unknown
+        """
+        self.key = key
+        self.action = TriggerAction[config["Action"]]
+        self.debounce = config.get("Debounce", TriggerEngine.DEFAULT_DEBOUNCE)
+        self.last_fired = float("-inf")
+        self.deferred_value = None  # The latest value of a Parameter binding that arrived while debouncing
+
+        self.target = config.get("Animation")
+        self.set_animation = None  # The animation started by a Set binding, resolved when compiled
+        if self.action == TriggerAction.Set:
+            self.target = config["Set"]
+            self.set_animation = config.get("Animation")
+        elif self.action == TriggerAction.Animation and self.target is None:
+            raise KeyError("Animation")
+
+        self.parameter = config["Parameter"] if self.action == TriggerAction.Parameter else None
+        self.has_value = "Value" in config  # Events carry their own value unless the binding sets one
+        self.value = config.get("Value")
+        self.transition = TransitionType[config["Transition"]] if "Transition" in config else None
+        self.duration = config.get("Duration")
+
+class TriggerEngine:
+    """
+        Dispatches input events to the actions bound by the current set
+        Bindings are compiled into a table keyed by (input, event), so the cost of each frame depends only on the
+        number of events that arrived, not the number of bindings. Events are debounced per binding and coalesced so
+        each binding fires at most once a frame with its latest value, actions run at the start of the next frame
+        Events repeating within the debounce window are dropped, except for Parameter bindings whose latest value is
+        applied once the window ends, so a dial always settles on the last value it was turned to
+
+        Bindings are keyed "Input:Event", an input of * matches any input:
+            "Trigger_bindings": {
+                "Buttons:Left": {"Action": "Animation", "Animation": "Wink", "Transition": "Crossfade"},
+                "Dial:Turned": {"Action": "Parameter", "Animation": "Eyes", "Parameter": "Hue"},
+                "*:Hold": {"Action": "Set", "Set": "Idle", "Animation": "Sleep", "Debounce": 1.0}
+            }
+        A Set binding starts the given animation of the new set, or its first animation if none is given
+    """
+    DEFAULT_DEBOUNCE = 0.03  # Seconds after firing that a binding ignores repeated events, e.g. switch bounce
+
+    def __init__(self, app):
+        """ Creates an instance of TriggerEngine
+
+        Args:
+            app: The app whose set the bindings act on
+        """
+        self.app = app
+        self.bindings = {}
+        self.fired = 0
+        self.debounced = 0
+
+        self._inputs = []
+        self._external = deque(maxlen=InputInterface.MAX_PENDING_EVENTS)
+        self._deferred = {}  # Key to the Parameter bindings waiting for their debounce window to end
+
+    def load_bindings(self, bindings:dict):
+        """ Compiles the trigger bindings of a set, replacing any previous bindings
+
+        Args:
+            bindings: The "Trigger_bindings" of the set config
+        """
+        self._inputs = [interface for interface in self.app.interfaces.interfaces if isinstance(interface, InputInterface)]
+        self.bindings = {}
+        self._deferred.clear()
+        animations = self.app.set.animations if self.app.set is not None else {}
+
+        for name, config in bindings.items():
+            input_name, _, event = name.partition(":")
+            key = (input_name.lower(), event.lower())
+            try:
+                binding = TriggerBinding(key, config)
+            except KeyError as error:
+                logging.warning(f"Ignoring trigger binding {name}, {error} is missing or unknown")
+                continue
+            if binding.action == TriggerAction.Set:
+                if not self._resolve_set(name, binding):
+                    continue
+            elif binding.target is not None and binding.target not in animations:
+                logging.warning(f"Ignoring trigger binding {name}, the set has no animation {binding.target}")
+                continue
+            self.bindings[key] = binding
+        logging.debug(f"Compiled {len(self.bindings)} trigger binding(s)")
+
+    def _resolve_set(self, name:str, binding:TriggerBinding) -> bool:
+        """ Checks the set and animation of a Set binding exist, defaulting the animation to the sets first
+
+        Returns:
+            bool: True if the binding is valid
+        """
+        set_config = self.app.config.sets.get(binding.target)
+        if set_config is None:
+            logging.warning(f"Ignoring trigger binding {name}, there is no set {binding.target}")
+            return False
+        names = [animation["Name"] for animation in set_config["Animations"]]
+        if binding.set_animation is None:
+            binding.set_animation = names[0] if names else None
+        elif binding.set_animation not in names:
+            logging.warning(f"Ignoring trigger binding {name}, set {binding.target} has no animation "
+                f"{binding.set_animation}")
+            return False
+        return True
+
+    def push_event(self, input_name:str, event:str, value=None):
+        """ Queues an event that didn't come from an input interface, e.g. from the API, safe to call from any thread
+
+        Args:
+            input_name: The name of the input the event is from
+            event: The name of the event
+            value: (OPTIONAL) A value carried by the event
+        """
+        self._external.append((input_name, event, value, time.monotonic()))
+
+    def lookup(self, input_name:str, event:str) -> TriggerBinding:
+        """ Finds the binding for an event, or None if it isn't bound """
+        event = event.lower()
+        return self.bindings.get((input_name.lower(), event)) or self.bindings.get(("*", event))
+
+    def update(self):
+        """ Takes the events since the last frame and runs the actions they trigger, call at the frame boundary """
+        if not self.bindings:
+            for interface in self._inputs:
+                interface.poll_events()
+            self._external.clear()
+            return
+
+        triggered = {}  # Coalesced by binding, keeping the latest value in the order bindings were first hit
+        for interface in self._inputs:
+            for event, value, timestamp in interface.poll_events():
+                self._accept(interface.name, event, value, timestamp, triggered)
+        while self._external:
+            self._accept(*self._external.popleft(), triggered)
+        if self._deferred:
+            self._release_deferred(time.monotonic(), triggered)
+
+        for binding, value in triggered.values():
+            if not self._run(binding, value):
+                break
+
+    def _accept(self, input_name:str, event:str, value, timestamp:float, triggered:dict):
+        """ Looks up the binding for an event, debouncing it and coalescing it into the triggered bindings """
+        binding = self.lookup(input_name, event)
+        if binding is None:
+            return
+        if binding.key in triggered:  # Already firing this frame, only the latest value is kept
+            triggered[binding.key] = (binding, binding.value if binding.has_value else value)
+            return
+        if timestamp - binding.last_fired < binding.debounce:
+            self.debounced += 1
+            if binding.action == TriggerAction.Parameter:
+                binding.deferred_value = binding.value if binding.has_value else value
+                self._deferred[binding.key] = binding
+            return
+        binding.last_fired = timestamp
+        self._deferred.pop(binding.key, None)  # This event is newer than any deferred value
+        triggered[binding.key] = (binding, binding.value if binding.has_value else value)
+
+    def _release_deferred(self, now:float, triggered:dict):
+        """ Triggers the deferred Parameter bindings whose debounce window has ended with their latest value """
+        for key, binding in list(self._deferred.items()):
+            if now - binding.last_fired >= binding.debounce:
+                del self._deferred[key]
+                binding.last_fired = now
+                triggered[key] = (binding, binding.deferred_value)
+
+    def _run(self, binding:TriggerBinding, value) -> bool:
+        """ Runs the action of a binding
+
+        Returns:
+            bool: False if the action replaced the set, so the remaining bindings no longer apply
+        """
+        self.fired += 1
+        animation_set = self.app.set
+        try:
+            if binding.action == TriggerAction.Set:
+                self.app.change_set(binding.target, binding.set_animation)
+                return False
+            if animation_set is None:
+                return True
+
+            if binding.action == TriggerAction.Animation:
+                animation_set.change_animation(binding.target, binding.transition, binding.duration)
+            elif binding.action == TriggerAction.Parameter:
+                animation = animation_set.animations[binding.target] if binding.target is not None else \
+                    animation_set.current_animation
+                if animation is not None:
+                    animation.set_parameter(binding.parameter, value)
+        except Exception:
+            logging.exception(f"Trigger binding {':'.join(binding.key)} failed")
+        return True
@@ -0,0 +1,29 @@
+import asyncio
+from http import HTTPStatus
+import pytest
+
+from runtime.APIServer import APIServer, APIError
+from runtime.Benchmark import Benchmark
+
+@pytest.fixture
+def api():
+    config = Benchmark.layout_config([("Panel", (16, 8))], ["presets.animations.Gradient"])
+    app = Benchmark(config, 1).create_app()
+    app.load_set("Benchmark", preload=False)
+    app.set.change_animation("Gradient")
+    yield APIServer(app, 0)
+    app.teardown()
+
+@pytest.mark.parametrize("route, path", [
+    ("post_set", ["Benchmark"]),
+    ("post_animation", ["Gradient"]),
+    ("post_trigger", ["Buttons", "A"])
+])
+@pytest.mark.parametrize("body", [b"[]", b"\"Gradient\"", b"1", b"null"])
+def test_options_must_be_an_object(api, route, path, body):
+    with pytest.raises(APIError) as error:
+        asyncio.run(getattr(api, route)(path, {}, body))
+    assert error.value.status == HTTPStatus.BAD_REQUEST
+
+def test_trigger_without_options(api):
+    assert asyncio.run(api.post_trigger(["Buttons", "A"], {}, b"")) == {"Bound": False}
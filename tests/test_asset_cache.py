@@ -0,0 +1,71 @@
+import logging
+import pytest
+from PIL import Image
+
+from animation.AssetCache import AssetCache
+
+IMAGE_BYTES = 4 * 4 * 4
+
+@pytest.fixture
+def images(tmp_path):
+    paths = []
+    for index in range(3):
+        path = str(tmp_path / f"sprite{index}.png")
+        Image.new("RGB", (4, 4), (index, 0, 0)).save(path)
+        paths.append(path)
+    return paths
+
+def test_acquires_share_one_image(images):
+    cache = AssetCache()
+    first = cache.acquire(images[0])
+    assert cache.acquire(images[0]) is first
+    assert cache.stats()["Hits"] == 1 and cache.stats()["Misses"] == 1
+
+def test_images_are_keyed_by_size_and_mode(images):
+    cache = AssetCache()
+    assert cache.acquire(images[0], (2, 2)).size == (2, 2)
+    assert cache.acquire(images[0], mode="L").mode == "L"
+    assert cache.stats()["Images"] == 2
+
+def test_referenced_images_are_never_evicted(images):
+    cache = AssetCache(IMAGE_BYTES)
+    first = cache.acquire(images[0])
+    cache.acquire(images[1])
+    assert cache.stats()["Images"] == 2  # Over budget, but both are in use
+    cache.release(first)
+    assert cache.stats()["Images"] == 1
+    assert cache.used_bytes <= cache.byte_budget
+
+def test_least_recently_used_images_are_evicted_first(images):
+    cache = AssetCache(2 * IMAGE_BYTES)
+    for path in images[:2]:
+        cache.release(cache.acquire(path))
+    cache.release(cache.acquire(images[0]))  # The second image is now the least recently used
+    cache.release(cache.acquire(images[2]))
+    assert cache.acquire(images[0]) is not None and cache.stats()["Misses"] == 3
+
+def test_images_are_evicted_once_every_reference_is_released(images):
+    cache = AssetCache(0)
+    image = cache.acquire(images[0])
+    cache.acquire(images[0])
+    cache.release(image)
+    assert cache.stats()["Referenced"] == 1
+    cache.release(image)
+    assert cache.stats()["Images"] == 0
+
+def test_releasing_a_foreign_or_released_image(images, caplog):
+    cache = AssetCache()
+    assert not cache.release(Image.new("RGB", (4, 4)))
+    image = cache.acquire(images[0])
+    cache.release(image)
+    with caplog.at_level(logging.WARNING):
+        assert cache.release(image)
+    assert "released more times" in caplog.text
+
+def test_clear_keeps_referenced_images(images):
+    cache = AssetCache()
+    kept = cache.acquire(images[0])
+    cache.release(cache.acquire(images[1]))
+    cache.clear()
+    assert cache.stats()["Images"] == 1
+    assert cache.acquire(images[0]) is kept
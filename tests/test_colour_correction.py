@@ -0,0 +1,43 @@
+import pytest
+from PIL import Image
+
+from hardware.ColourCorrection import ColourCorrection
+
+def test_neutral_settings_return_the_same_image():
+    correction = ColourCorrection()
+    correction.configure(100, 1.0, [1, 1, 1])
+    image = Image.new("RGB", (2, 2), (10, 20, 30))
+    assert correction.identity
+    assert correction.apply(image) is image
+
+def test_brightness_white_balance_and_gamma_fold_into_one_table():
+    correction = ColourCorrection()
+    correction.configure(50, 2.0, [1, 0.5, 0])
+    image = correction.apply(Image.new("RGB", (1, 1), (255, 255, 128)))
+    assert image.getpixel((0, 0)) == (128, 64, 0)
+    assert correction.lut(3)[128] == round(255 * (128 / 255) ** 2 * 0.5)
+
+def test_settings_are_clamped():
+    correction = ColourCorrection()
+    correction.configure(150, 1.0, [2, -1, 1])
+    assert correction.apply(Image.new("RGB", (1, 1), (200, 200, 200))).getpixel((0, 0)) == (200, 0, 200)
+
+def test_padding_bands_are_unchanged():
+    correction = ColourCorrection()
+    correction.configure(50, 1.0, [1, 1, 1])
+    image = correction.apply(Image.new("RGBX", (1, 1), (200, 100, 50, 77)))
+    assert image.getpixel((0, 0)) == (100, 50, 25, 77)
+
+def test_tables_are_only_rebuilt_when_settings_change():
+    correction = ColourCorrection()
+    correction.configure(50, 1.0, [1, 1, 1])
+    lut = correction.lut(3)
+    correction.configure(50, 1.0, (1, 1, 1))
+    assert correction.lut(3) is lut
+    correction.configure(60, 1.0, (1, 1, 1))
+    assert correction.lut(3) is not lut
+
+@pytest.mark.parametrize("white_balance", [[1, 1], [1, 1, 1, 1]])
+def test_white_balance_needs_three_channels(white_balance):
+    with pytest.raises(ValueError):
+        ColourCorrection().configure(100, 1.0, white_balance)
@@ -0,0 +1,66 @@
+import pytest
+from PIL import Image
+
+from animation.CompiledClip import CompiledClip, HEADER, _rle_decode, _rle_encode, compile_clip
+from exceptions import InvalidClipException
+
+LAYOUT = [("Left", (8, 4)), ("Right", (4, 4))]
+
+def make_frames() -> list:
+    """ Frames with a solid colour on the left half and noise on the right, so both encodings get used """
+    frames = []
+    for index in range(3):
+        frame = Image.new("RGB", (8, 4), (index * 60, 10, 20))
+        frame.putpixel((7, 3), (255, index, 0))
+        frames.append(frame)
+    return frames
+
+@pytest.fixture
+def source(tmp_path):
+    frames = make_frames()
+    path = tmp_path / "clip.gif"
+    frames[0].save(path, save_all=True, append_images=frames[1:], duration=[40, 80, 120])
+    return path
+
+@pytest.fixture(params=[False, True], ids=["raw", "rle"])
+def clip_path(request, source, tmp_path):
+    path = tmp_path / "clip.zclp"
+    compile_clip(str(source), str(path), LAYOUT, rle=request.param)
+    return path
+
+def test_rle_round_trip():
+    pixels = bytes([1, 2, 3] * 300 + [4, 5, 6] + [7, 8, 9] * 2)
+    assert bytes(_rle_decode(_rle_encode(pixels), len(pixels) // 3)) == pixels
+
+def test_compiled_clip_round_trip(clip_path):
+    clip = CompiledClip(str(clip_path))
+    try:
+        assert clip.frame_count == 3
+        assert [(name, tuple(size)) for name, size, _ in clip.layout] == LAYOUT
+        assert clip.frame_bytes == (8 * 4 + 4 * 4) * 3
+        assert [clip.duration(frame) for frame in range(3)] == pytest.approx([0.04, 0.08, 0.12])
+
+        for index, expected in enumerate(make_frames()):
+            data = bytes(clip.frame(index))
+            left = Image.frombytes("RGB", (8, 4), data[:8 * 4 * 3])
+            assert left.tobytes() == expected.tobytes()
+            right = Image.frombytes("RGB", (4, 4), data[8 * 4 * 3:])
+            assert right.size == (4, 4)
+    finally:
+        clip.close()
+
+def test_truncated_clips_raise_invalid_clip(clip_path, tmp_path):
+    data = clip_path.read_bytes()
+    truncated = tmp_path / "truncated.zclp"
+    for length in [0, 3, HEADER.size - 1, HEADER.size, HEADER.size + 1, HEADER.size + 8, HEADER.size + 20,
+            len(data) - 1]:
+        truncated.write_bytes(data[:length])
+        with pytest.raises(InvalidClipException):
+            CompiledClip(str(truncated))
+
+def test_wrong_magic_raises_invalid_clip(clip_path):
+    data = bytearray(clip_path.read_bytes())
+    data[:4] = b"NOPE"
+    clip_path.write_bytes(bytes(data))
+    with pytest.raises(InvalidClipException):
+        CompiledClip(str(clip_path))
@@ -0,0 +1,64 @@
+import pytest
+from PIL import Image, ImageDraw
+
+from hardware.Damage import DamageDraw, clip_box, flip_box, offset_box, points_box, union_box
+from hardware.Interface import Interface
+
+@pytest.fixture
+def damage():
+    boxes = []
+    draw = DamageDraw(ImageDraw.Draw(Image.new("RGB", (64, 32))), boxes.append)
+    return draw, boxes
+
+def test_union_box():
+    assert union_box(None, None) is None
+    assert union_box(None, (1, 2, 3, 4)) == (1, 2, 3, 4)
+    assert union_box((0, 5, 4, 6), (2, 1, 8, 3)) == (0, 1, 8, 6)
+
+def test_clip_box():
+    assert clip_box((-5, -5, 10, 10), (8, 8)) == (0, 0, 8, 8)
+    assert clip_box((10, 10, 20, 20), (8, 8)) is None
+
+def test_offset_and_flip_box():
+    assert offset_box((1, 2, 3, 4), (10, 20)) == (11, 22, 13, 24)
+    assert flip_box((0, 0, 2, 1), (8, 4), True, False) == (6, 0, 8, 1)
+    assert flip_box((0, 0, 2, 1), (8, 4), False, True) == (0, 3, 2, 4)
+
+def test_points_box_is_exclusive():
+    assert points_box([(1, 2), (5, 3)]) == (1, 2, 6, 4)
+    assert points_box([1.5, 2.5, 3.2, 4.0], padding=1) == (0, 1, 6, 6)
+
+@pytest.mark.parametrize("call, box", [
+    (lambda draw: draw.line((10, 10, 30, 10), (255, 0, 0), 5), (5, 5, 36, 16)),
+    (lambda draw: draw.line((10, 10, 30, 10), fill=(255, 0, 0), width=5), (5, 5, 36, 16)),
+    (lambda draw: draw.rectangle((5, 5, 20, 20), None, (255, 255, 255), 3), (2, 2, 24, 24)),
+    (lambda draw: draw.rounded_rectangle((5, 5, 20, 20), 2, None, (255, 255, 255), 4), (1, 1, 25, 25)),
+    (lambda draw: draw.point((1, 1), (255, 255, 255)), (0, 0, 3, 3)),
+])
+def test_shape_damage_covers_width(damage, call, box):
+    draw, boxes = damage
+    call(draw)
+    assert boxes == [box]
+
+def test_unwrapped_draw_method_damages_everything(damage):
+    draw, boxes = damage
+    draw.regular_polygon((16, 16, 8), 5, fill=(255, 255, 255))
+    draw.textlength("text")  # Measuring doesn't draw anything
+    assert boxes == [None]
+
+def test_interface_tracks_damage_and_covers_drawn_pixels():
+    interface = Interface(None)
+    interface.size = (16, 8)
+    interface._image = Image.new("RGB", interface.size)
+    interface._draw = DamageDraw(ImageDraw.Draw(interface._image), interface.invalidate)
+
+    interface.draw.line((2, 2, 6, 2), (255, 255, 255), 3)
+    damage = interface.damage
+    pixels = interface.current_image.load()
+    drawn = [(x, y) for x in range(16) for y in range(8) if pixels[x, y] != (0, 0, 0)]
+    assert drawn and all(damage[0] <= x < damage[2] and damage[1] <= y < damage[3] for x, y in drawn)
+
+    interface.reset_access_flag()
+    assert interface.damage is None
+    interface.image  # Taking the image may change any of it
+    assert interface.damage == (0, 0, 16, 8)
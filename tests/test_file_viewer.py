@@ -0,0 +1,78 @@
+import time
+import pytest
+from PIL import Image
+
+from animation.ClipDecoder import ClipDecoder
+from animation.FrameCache import FrameCache
+from presets.animations import FileViewer as viewer_module
+from runtime.Benchmark import Benchmark
+
+SIZE = (16, 8)
+FRAME_COUNT = 12
+FRAME_BYTES = SIZE[0] * SIZE[1] * 4
+
+class Clock:
+    """ Stands in for time.monotonic so every update shows the next frame """
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def viewer(tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(viewer_module.time, "monotonic", clock)
+    decodes = []
+    decode = ClipDecoder.decode
+    monkeypatch.setattr(ClipDecoder, "decode", lambda self, index, sizes: decodes.append(index) or decode(self, index, sizes))
+
+    path = str(tmp_path / "clip.gif")
+    frames = [Image.new("RGB", SIZE, (index * 20, 0, 0)) for index in range(FRAME_COUNT)]
+    frames[0].save(path, save_all=True, append_images=frames[1:], duration=50, loop=0)
+
+    config = Benchmark.layout_config([("Panel", SIZE)], ["presets.animations.FileViewer"])
+    config.sets["Benchmark"]["Animations"][0]["Arguments"] = {"File": path, "Cache_bytes": 6 * FRAME_BYTES, "Prefetch": 8}
+    app = Benchmark(config, 1).create_app()
+    app.load_set("Benchmark", preload=False)
+    app.set.change_animation("FileViewer")
+    yield app, app.set.current_animation.instance, clock, decodes
+    app.teardown()
+
+def wait_for_prefetch(viewer:viewer_module.FileViewer):
+    """ Waits until the prefetch thread has decoded the whole window after the shown frame """
+    upcoming = [(viewer._index + ahead) % FRAME_COUNT for ahead in range(1, viewer._prefetch_window + 1)]
+    deadline = time.monotonic() + 5
+    while not all(index in viewer.cache for index in upcoming):
+        assert time.monotonic() < deadline, "Prefetching stalled"
+        time.sleep(0.001)
+
+def test_frame_cache_evicts_in_store_order_without_touch():
+    cache = FrameCache(2)
+    cache.put("a", "A", 1)
+    cache.put("b", "B", 1)
+    assert cache.get("a", touch=False) == "A"
+    cache.put("c", "C", 1)
+    assert "a" not in cache and "b" in cache
+
+def test_frame_cache_touch_keeps_recent_frames():
+    cache = FrameCache(2)
+    cache.put("a", "A", 1)
+    cache.put("b", "B", 1)
+    cache.get("a")
+    cache.put("c", "C", 1)
+    assert "a" in cache and "b" not in cache
+
+def test_prefetch_decodes_each_shown_frame_once(viewer):
+    app, instance, clock, decodes = viewer
+    assert instance._prefetch_window == 5
+    shown = 0
+    for _ in range(4 * FRAME_COUNT):
+        app.update()
+        shown += 1
+        wait_for_prefetch(instance)
+        clock.now += 0.05
+
+    # The first window is decoded ahead of the frames shown, after that every frame is decoded exactly once
+    assert len(decodes) == shown + instance._prefetch_window
+    assert instance.cache.used_bytes <= instance.cache.byte_budget
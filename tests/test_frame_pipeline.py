@@ -0,0 +1,118 @@
+import threading
+import pytest
+from PIL import Image
+
+from hardware.Configuration import Configuration
+from hardware.FramePipeline import FramePipeline
+from hardware.IHardware import IHardware
+
+class SyncHardware(IHardware):
+    """ Hardware that can only show its own image """
+    def __init__(self):
+        self.image = Image.new("RGB", (4, 2))
+        self.updates = 0
+
+    @property
+    def has_inputs(self) -> bool:
+        return False
+
+    @staticmethod
+    def new_config() -> Configuration:
+        return Configuration()
+
+    def update(self):
+        self.updates += 1
+
+    def teardown(self):
+        pass
+
+class PushHardware(SyncHardware):
+    """ Hardware recording the first pixel of every pushed frame, blocking each push until released """
+    def __init__(self):
+        super().__init__()
+        self.pushed = []
+        self.release = threading.Semaphore(0)
+        self.entered = threading.Semaphore(0)
+
+    @property
+    def supports_push(self) -> bool:
+        return True
+
+    def push(self, image:Image.Image):
+        self.entered.release()
+        self.release.acquire()
+        self.pushed.append(image.getpixel((0, 0)))
+
+@pytest.fixture
+def pipeline():
+    pipeline = FramePipeline()
+    yield pipeline
+    pipeline.stop()
+
+def test_hardware_without_push_is_updated_synchronously(pipeline):
+    hardware = SyncHardware()
+    pipeline.submit([hardware])
+    assert not FramePipeline.supports_push(hardware)
+    assert hardware.updates == 1
+
+def test_base_push_falls_back_to_update():
+    hardware = SyncHardware()
+    hardware.push(hardware.image)
+    assert hardware.updates == 1
+
+def test_push_hardware_is_pushed_on_the_pipeline_thread(pipeline):
+    hardware = PushHardware()
+    hardware.image.putpixel((0, 0), (1, 0, 0))
+    pipeline.submit([hardware])
+    assert hardware.entered.acquire(timeout=5)
+    hardware.release.release()
+    pipeline.stop()
+    assert hardware.pushed == [(1, 0, 0)]
+    assert hardware.updates == 0
+
+def submit_colour(pipeline:FramePipeline, hardware_list:list, red:int):
+    for hardware in hardware_list:
+        hardware.image.putpixel((0, 0), (red, 0, 0))
+    pipeline.submit(hardware_list)
+
+def test_stale_frames_are_dropped_for_the_newest(pipeline):
+    hardware = PushHardware()
+    submit_colour(pipeline, [hardware], 1)
+    assert hardware.entered.acquire(timeout=5)  # Frame 1 is being pushed, the queue is empty
+
+    for red in (2, 3, 4):
+        submit_colour(pipeline, [hardware], red)
+    for _ in range(2):
+        hardware.release.release()
+    assert hardware.entered.acquire(timeout=5)
+    pipeline.stop()
+
+    assert hardware.pushed == [(1, 0, 0), (4, 0, 0)]
+    assert pipeline.dropped_frames == 2
+
+def test_dropped_frames_carry_over_hardware_missing_from_the_next_frame(pipeline):
+    blocker, first, second = PushHardware(), PushHardware(), PushHardware()
+    for hardware in (first, second):
+        for _ in range(5):
+            hardware.release.release()
+    submit_colour(pipeline, [blocker], 1)
+    assert blocker.entered.acquire(timeout=5)
+
+    submit_colour(pipeline, [first], 2)
+    submit_colour(pipeline, [second], 3)  # Replaces the frame holding first, which has to be carried over
+    blocker.release.release()
+    assert first.entered.acquire(timeout=5) and second.entered.acquire(timeout=5)
+    pipeline.stop()
+
+    assert first.pushed == [(2, 0, 0)]
+    assert second.pushed == [(3, 0, 0)]
+    assert pipeline.dropped_frames == 1
+
+def test_buffers_are_snapshots_of_the_image(pipeline):
+    hardware = PushHardware()
+    submit_colour(pipeline, [hardware], 1)
+    hardware.image.putpixel((0, 0), (9, 0, 0))  # Drawing the next frame must not change the queued one
+    hardware.release.release()
+    assert hardware.entered.acquire(timeout=5)
+    pipeline.stop()
+    assert hardware.pushed == [(1, 0, 0)]
@@ -0,0 +1,74 @@
+import pytest
+
+from runtime import FrameScheduler as scheduler_module
+from runtime.FrameScheduler import FrameScheduler, SchedulePolicy
+
+class Clock:
+    """ Stands in for time.monotonic so frames can take exact amounts of time """
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(scheduler_module.time, "monotonic", clock)
+    return clock
+
+def run_frame(scheduler:FrameScheduler, clock:Clock, duration:float) -> float:
+    """ Runs a frame taking the given time, then waits the returned delay like the main loop """
+    clock.now += duration
+    delay = scheduler.frame_done()
+    clock.now += delay
+    return delay
+
+def test_on_time_frames_wait_until_their_deadline(clock):
+    scheduler = FrameScheduler(10)
+    scheduler.start()
+    assert run_frame(scheduler, clock, 0.03) == pytest.approx(0.07)
+    assert run_frame(scheduler, clock, 0.05) == pytest.approx(0.05)
+    assert (scheduler.frames, scheduler.late_frames, scheduler.dropped_frames) == (2, 0, 0)
+
+def test_overrun_does_not_shift_the_schedule(clock):
+    scheduler = FrameScheduler(10, SchedulePolicy.CatchUp)
+    scheduler.start()
+    run_frame(scheduler, clock, 0.15)  # Finishes half way into the next frame
+    assert run_frame(scheduler, clock, 0.01) == pytest.approx(0.04)
+
+def test_catch_up_runs_late_frames_back_to_back(clock):
+    scheduler = FrameScheduler(10, SchedulePolicy.CatchUp)
+    scheduler.start()
+    assert run_frame(scheduler, clock, 0.35) == 0  # Three deadlines behind
+    assert run_frame(scheduler, clock, 0.0) == 0
+    assert run_frame(scheduler, clock, 0.0) == 0
+    assert run_frame(scheduler, clock, 0.0) == pytest.approx(0.05)
+    assert scheduler.dropped_frames == 0
+
+def test_catch_up_gives_up_when_too_far_behind(clock):
+    scheduler = FrameScheduler(10, SchedulePolicy.CatchUp)
+    scheduler.start()
+    run_frame(scheduler, clock, (FrameScheduler.MAX_CATCH_UP + 1.5) / 10)
+    assert scheduler.dropped_frames == FrameScheduler.MAX_CATCH_UP
+    assert run_frame(scheduler, clock, 0.0) == pytest.approx(0.05)
+
+def test_drop_skips_passed_deadlines(clock):
+    scheduler = FrameScheduler(10, SchedulePolicy.Drop)
+    scheduler.start()
+    assert run_frame(scheduler, clock, 0.35) == 0
+    assert scheduler.late_frames == 1
+    assert scheduler.dropped_frames == 2
+    assert run_frame(scheduler, clock, 0.0) == pytest.approx(0.05)
+
+def test_degrade_lowers_and_recovers_the_rate(clock):
+    scheduler = FrameScheduler(10, SchedulePolicy.Degrade)
+    scheduler.start()
+    for _ in range(FrameScheduler.DEGRADE_AFTER):
+        run_frame(scheduler, clock, 0.15)
+    assert scheduler.rate == pytest.approx(5)
+
+    frames_to_recover = int(FrameScheduler.RECOVER_AFTER * scheduler.rate) + 1
+    for _ in range(frames_to_recover):
+        run_frame(scheduler, clock, 0.01)
+    assert scheduler.rate == pytest.approx(10)
@@ -0,0 +1,79 @@
+import threading
+import pytest
+
+from hardware import Preview as preview_module
+from hardware.Preview import Preview, PreviewSink, PngSequenceSink
+from runtime.Benchmark import Benchmark
+
+class Clock:
+    """ Stands in for time.monotonic so a frame is due on every update """
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+class BlockingSink(PreviewSink):
+    """ Records the timestamp of every frame, blocking each write until released """
+    def __init__(self):
+        self.timestamps = []
+        self.entered = threading.Semaphore(0)
+        self.release = threading.Semaphore(0)
+        self.closed = False
+
+    def write(self, image, timestamp:float):
+        self.entered.release()
+        self.release.acquire()
+        self.timestamps.append(timestamp)
+
+    def close(self):
+        self.closed = True
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setattr(preview_module.time, "monotonic", Clock())
+    config = Benchmark.layout_config([("Panel", (16, 8))], ["presets.animations.Gradient"])
+    app = Benchmark(config, 1).create_app()
+    yield app
+    app.teardown()
+
+def test_frames_waiting_for_a_slow_sink_are_dropped(app):
+    sink = BlockingSink()
+    preview = Preview(app.interfaces, sink, rate=10)
+    preview.update()
+    assert sink.entered.acquire(timeout=5)  # The first frame is being written
+
+    for _ in range(3):
+        preview_module.time.monotonic.now += 0.1
+        preview.update()
+    for _ in range(2):
+        sink.release.release()
+    preview.destroy()
+
+    assert (preview.frames, preview.dropped_frames) == (4, 2)
+    assert sink.timestamps == [pytest.approx(100.0), pytest.approx(100.3)]
+    assert sink.closed
+
+def test_frames_are_only_composed_at_the_rate(app):
+    sink = BlockingSink()
+    for _ in range(5):
+        sink.release.release()
+    preview = Preview(app.interfaces, sink, rate=10)
+    preview.update()
+    preview_module.time.monotonic.now += 0.05
+    preview.update()
+    preview.destroy()
+    assert preview.frames == 1
+
+def test_png_sink_refuses_a_non_empty_directory(tmp_path):
+    (tmp_path / "frame_00000.png").write_bytes(b"")
+    with pytest.raises(FileExistsError):
+        PngSequenceSink(str(tmp_path))
+    assert (tmp_path / "frame_00000.png").exists()
+
+def test_png_sink_numbers_frames(tmp_path, app):
+    sink = PngSequenceSink(str(tmp_path / "frames"))
+    preview = Preview(app.interfaces, sink, rate=10)
+    preview.update()
+    preview.destroy()
+    assert [path.name for path in (tmp_path / "frames").iterdir()] == ["frame_00000.png"]
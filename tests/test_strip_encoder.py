@@ -0,0 +1,43 @@
+import pytest
+from PIL import Image
+
+from hardware.StripEncoder import StripEncoder
+
+def position_image(size:tuple, mode:str="RGB") -> Image.Image:
+    """ Builds an image where every pixel is coloured (x, y, 9) so the wiring order can be read back """
+    image = Image.new(mode, size)
+    for y in range(size[1]):
+        for x in range(size[0]):
+            image.putpixel((x, y), (x, y, 9) if mode == "RGB" else (x, y, 9, 255))
+    return image
+
+def positions(data:memoryview) -> list:
+    data = bytes(data)
+    return [(data[index], data[index + 1]) for index in range(0, len(data), 3)]
+
+@pytest.mark.parametrize("options, expected", [
+    ({}, [(0, 0), (1, 0), (2, 0), (0, 1), (1, 1), (2, 1)]),
+    ({"serpentine": True}, [(0, 0), (1, 0), (2, 0), (2, 1), (1, 1), (0, 1)]),
+    ({"start_corner": "Bottom right"}, [(2, 1), (1, 1), (0, 1), (2, 0), (1, 0), (0, 0)]),
+    ({"vertical": True}, [(0, 0), (0, 1), (1, 0), (1, 1), (2, 0), (2, 1)]),
+    ({"vertical": True, "serpentine": True, "start_corner": "Top right"},
+        [(2, 0), (2, 1), (1, 1), (1, 0), (0, 0), (0, 1)])
+])
+def test_wiring_order(options, expected):
+    encoder = StripEncoder((3, 2), **options)
+    assert positions(encoder.encode(position_image((3, 2)))) == expected
+
+def test_colour_order():
+    encoder = StripEncoder((3, 2), colour_order="grb")
+    assert bytes(encoder.encode(position_image((3, 2))))[3:6] == bytes((0, 1, 9))
+
+def test_four_band_images_skip_the_padding_byte():
+    encoder = StripEncoder((3, 2), serpentine=True)
+    assert positions(encoder.encode(position_image((3, 2), "RGBA"))) == \
+        positions(encoder.encode(position_image((3, 2))))
+    assert len(encoder.encode(position_image((3, 2), "RGBA"))) == 18
+
+@pytest.mark.parametrize("options", [{"start_corner": "Middle"}, {"colour_order": "RGGB"}, {"colour_order": "RGX"}])
+def test_invalid_wiring_is_rejected(options):
+    with pytest.raises(ValueError):
+        StripEncoder((3, 2), **options)
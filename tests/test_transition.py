@@ -0,0 +1,80 @@
+import pytest
+from PIL import Image
+
+from animation import Transition as transition_module
+from animation.Transition import Transition, TransitionType
+
+OUTGOING = (200, 0, 0)
+INCOMING = (0, 0, 200)
+
+class Clock:
+    """ Stands in for time.monotonic so the transition can be stopped at an exact progress """
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+class FakeInterface:
+    def __init__(self, size:tuple):
+        self.size = size
+        self.image = Image.new("RGB", size)
+
+class FillAnimation:
+    """ Fills every interface with one colour """
+    def __init__(self, interfaces:list, colour:tuple):
+        self.interfaces = interfaces
+        self.colour = colour
+        self.stopped = False
+
+    def update(self):
+        for interface in self.interfaces:
+            interface.image.paste(self.colour, (0, 0) + interface.size)
+
+    def stop(self):
+        self.stopped = True
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(transition_module.time, "monotonic", clock)
+    return clock
+
+def half_way(kind:TransitionType, clock:Clock, size:tuple=(4, 2)):
+    interface = FakeInterface(size)
+    outgoing, incoming = FillAnimation([interface], OUTGOING), FillAnimation([interface], INCOMING)
+    transition = Transition(kind, 1.0, outgoing, incoming, [interface], {})
+    clock.now += 0.5
+    transition.update()
+    return transition, interface, outgoing
+
+def test_crossfade_blends_both_animations(clock):
+    _, interface, _ = half_way(TransitionType.Crossfade, clock)
+    red, green, blue = interface.image.getpixel((0, 0))
+    assert abs(red - 100) <= 1 and green == 0 and abs(blue - 100) <= 1
+
+def test_wipe_reveals_the_incoming_animation_from_the_left(clock):
+    _, interface, _ = half_way(TransitionType.Wipe, clock)
+    assert [interface.image.getpixel((x, 1)) for x in range(4)] == [INCOMING] * 2 + [OUTGOING] * 2
+
+def test_dissolve_shows_a_share_of_each_animation(clock):
+    _, interface, _ = half_way(TransitionType.Dissolve, clock, (32, 32))
+    colours = interface.image.getcolors()
+    assert {colour for _, colour in colours} == {OUTGOING, INCOMING}
+    assert all(300 < count < 724 for count, _ in colours)
+
+def test_finish_leaves_the_incoming_animation(clock):
+    transition, interface, outgoing = half_way(TransitionType.Crossfade, clock)
+    clock.now += 0.5
+    assert transition.finished
+    transition.finish()
+    assert interface.image.getcolors() == [(8, INCOMING)]
+    assert outgoing.stopped
+
+def test_buffers_are_reused_between_transitions(clock):
+    interface, buffers = FakeInterface((4, 2)), {}
+    animation = FillAnimation([interface], OUTGOING)
+    Transition(TransitionType.Crossfade, 1.0, animation, animation, [interface], buffers)
+    reused = buffers[interface]
+    Transition(TransitionType.Wipe, 1.0, animation, animation, [interface], buffers)
+    assert buffers[interface] is reused
@@ -0,0 +1,72 @@
+import time
+import pytest
+
+from runtime.Benchmark import Benchmark
+from runtime.TriggerEngine import TriggerEngine
+
+@pytest.fixture
+def app():
+    config = Benchmark.layout_config([("Panel", (16, 8))], ["presets.animations.Gradient", "presets.animations.Scanlines"])
+    config.sets["Benchmark"]["Trigger_bindings"] = {
+        "Buttons:A": {"Action": "Animation", "Animation": "Scanlines"},
+        "Buttons:B": {"Action": "Set", "Set": "Other"},
+        "Buttons:C": {"Action": "Set", "Set": "Other", "Animation": "Plasma"},
+        "Buttons:Missing": {"Action": "Set", "Set": "Other", "Animation": "Missing"},
+        "Dial:Turned": {"Action": "Parameter", "Parameter": "Speed"}
+    }
+    config.sets["Other"] = {
+        "Name": "Other",
+        "Animations": [
+            {"Name": "Noise", "Path": "presets.animations.Noise"},
+            {"Name": "Plasma", "Path": "presets.animations.Plasma"}
+        ]
+    }
+    app = Benchmark(config, 1).create_app()
+    app.load_set("Benchmark", preload=False)
+    app.set.change_animation("Gradient")
+    yield app
+    app.teardown()
+
+def test_invalid_set_bindings_are_ignored(app):
+    assert ("buttons", "missing") not in app.triggers.bindings
+
+def test_animation_binding(app):
+    app.triggers.push_event("Buttons", "A")
+    app.update()
+    assert app.set.current_animation.name == "Scanlines"
+
+@pytest.mark.parametrize("event, animation", [("B", "Noise"), ("C", "Plasma")])
+def test_set_binding_starts_an_animation(app, event, animation):
+    app.triggers.push_event("Buttons", event)
+    app.update()
+    assert app.set.name == "Other"
+    assert app.set.current_animation is not None
+    assert app.set.current_animation.name == animation
+
+def test_parameter_binding_keeps_the_latest_value_of_a_frame(app):
+    for value in (1, 2, 3):
+        app.triggers.push_event("Dial", "Turned", value)
+    app.update()
+    assert app.set.current_animation.instance.speed == 3
+    assert app.triggers.fired == 1
+
+def test_parameter_binding_applies_a_value_debounced_at_the_end_of_its_window(app):
+    app.triggers.push_event("Dial", "Turned", 1)
+    app.update()
+    app.triggers.push_event("Dial", "Turned", 2)  # Well inside the debounce window of the first event
+    app.update()
+    assert app.set.current_animation.instance.speed == 1
+
+    time.sleep(TriggerEngine.DEFAULT_DEBOUNCE * 1.5)
+    app.update()
+    assert app.set.current_animation.instance.speed == 2
+
+def test_animation_binding_drops_bounces(app):
+    app.triggers.push_event("Buttons", "A")
+    app.update()
+    app.set.change_animation("Gradient")
+    app.triggers.push_event("Buttons", "A")  # A bounce of the same press
+    app.update()
+    time.sleep(TriggerEngine.DEFAULT_DEBOUNCE * 1.5)
+    app.update()
+    assert app.set.current_animation.name == "Gradient"
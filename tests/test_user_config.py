@@ -0,0 +1,86 @@
+import json
+import pickle
+import zlib
+import pytest
+
+import UserConfig as user_config_module
+from UserConfig import UserConfig, HEADER, MAGIC, FORMAT_VERSION
+from exceptions import InvalidUserConfigException
+from presets.hardware.Null import Null
+
+def write_payload(path:str, config:dict):
+    payload = json.dumps(config).encode("utf-8")
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(payload), zlib.crc32(payload)) + payload)
+
+def saved_config(path:str) -> UserConfig:
+    config = UserConfig(path)
+    hardware = Null.new_config()
+    config.hardware[hardware.name] = hardware
+    config.interfaces.append({"Hardware": hardware.name, "Name": "Panel", "Form": 0, "Offset": [0, 0], "Size": [8, 4]})
+    config.sets["Main"] = {"Name": "Main", "Animations": [{"Name": "Plasma", "Path": "presets.animations.Plasma"}]}
+    config.save_userconfig()
+    return config
+
+def test_save_and_load_round_trip(tmp_path):
+    path = str(tmp_path / "config.zerousr")
+    saved_config(path)
+    config = UserConfig(path)
+    config.load_userconfig()
+    assert list(config.hardware) == ["Null"]
+    assert config.interfaces[0]["Name"] == "Panel"
+    assert config.sets["Main"]["Animations"][0]["Name"] == "Plasma"
+
+def test_corrupt_payload_fails_the_checksum(tmp_path):
+    path = str(tmp_path / "config.zerousr")
+    saved_config(path)
+    with open(path, "r+b") as file:
+        file.seek(HEADER.size + 5)
+        byte = file.read(1)
+        file.seek(HEADER.size + 5)
+        file.write(bytes([byte[0] ^ 1]))
+    with pytest.raises(InvalidUserConfigException, match="checksum"):
+        UserConfig(path).load_userconfig()
+
+def test_truncated_file_is_rejected(tmp_path):
+    path = str(tmp_path / "config.zerousr")
+    saved_config(path)
+    with open(path, "r+b") as file:
+        file.truncate(HEADER.size + 10)
+    with pytest.raises(InvalidUserConfigException):
+        UserConfig(path).load_userconfig()
+
+def test_version_1_configs_are_migrated(tmp_path):
+    path = str(tmp_path / "config.zerousr")
+    hardware = Null.new_config().format_as_dictionary()
+    write_payload(path, {"Version": 1, "Hardware": {"Null": hardware}, "Interfaces": []})
+    config = UserConfig(path)
+    config.load_userconfig()
+    assert list(config.hardware) == ["Null"]
+    assert (config.groups, config.sets) == ([], {})
+
+@pytest.mark.parametrize("version", [UserConfig.VERSION + 1, "2", None])
+def test_unsupported_versions_are_rejected(version):
+    with pytest.raises(InvalidUserConfigException, match="version"):
+        UserConfig.migrate({"Version": version})
+
+def test_schema_mismatch_is_rejected_on_load(tmp_path):
+    path = str(tmp_path / "config.zerousr")
+    write_payload(path, {"Version": UserConfig.VERSION, "Hardware": [], "Interfaces": [{"Name": "Panel"}],
+        "Groups": [], "Sets": {}})
+    with pytest.raises(InvalidUserConfigException, match=r"Interfaces\[0\] is missing Hardware"):
+        UserConfig(path).load_userconfig()
+
+def test_schema_mismatch_is_rejected_on_save(tmp_path):
+    path = str(tmp_path / "config.zerousr")
+    config = saved_config(path)
+    config.hardware["Null"].white_balance = [1, 1]
+    with pytest.raises(InvalidUserConfigException, match="White_balance"):
+        config.save_userconfig()
+
+def test_legacy_pickles_only_load_plain_data(tmp_path):
+    path = str(tmp_path / "config.zerousr")
+    with open(path, "wb") as file:
+        pickle.dump({"Version": 1, "Hardware": {}, "Interfaces": [user_config_module.OptionalKey(int)]}, file)
+    with pytest.raises(InvalidUserConfigException, match="only plain data"):
+        UserConfig(path).load_userconfig()
@@ -1,6 +1,24 @@
 import argparse
+import json
 
-from tools.userconfig_editor.ConfigEditorWindow import ConfigEditorWindow
+
+EFFECTS = ("Plasma", "Fire", "Noise", "Gradient", "Scanlines")  # The ArrayEffect presets
+
+
+def parse_layout(layout:list) -> list:
+    """ Parses interface layouts given as Name:WIDTHxHEIGHT
+    
+    Args:
+        layout: The layout strings from the command line
+    Returns:
+        list: The name and size of each interface
+    """
+    interfaces = []
+    for interface in layout:
+        name, size = interface.rsplit(":", 1)
+        width, height = size.lower().split("x")
+        interfaces.append((name, (int(width), int(height))))
+    return interfaces
 
 
 def main():
@@ -9,12 +27,56 @@ def main():
     parser.add_argument("-config_editor", action="store_true",
         help="Launches the user config editor UI tool")
     
+    parser.add_argument("-compile_clip", type=str, nargs=2, metavar=("SOURCE", "OUTPUT"),
+        help="Compiles a clip into a memory mappable clip for the given -layout, played with ClipPlayer")
+    
+    parser.add_argument("-layout", type=str, nargs="+", default=[],
+        help="The interfaces to compile a clip for, as Name:WIDTHxHEIGHT")
+    
+    parser.add_argument("-rle", action="store_true",
+        help="Run length encode compiled clip frames when it makes them smaller")
+    
+    parser.add_argument("-benchmark_effects", action="store_true",
+        help="Benchmarks the procedural effects on the -layout, 128x32 as two 64x32 panels by default")
+    
+    parser.add_argument("-frames", type=int, default=500,
+        help="The number of frames to run each effect for when benchmarking")
+    
+    parser.add_argument("-refresh_rate", type=int, default=90,
+        help="The frame rate each effect has to hold when benchmarking")
+    
+    parser.add_argument("-shared_framebuffers", action="store_true",
+        help="Benchmark with interfaces drawing straight into hardware framebuffers")
+    
+    parser.add_argument("-output", type=str, default=None,
+        help="The json file to write the benchmark results to")
+    
 
     args = parser.parse_args()
 
     if args.config_editor:
+        from tools.userconfig_editor.ConfigEditorWindow import ConfigEditorWindow
         app = ConfigEditorWindow()
         app.mainloop()
+    
+    if args.compile_clip:
+        from animation.CompiledClip import compile_clip
+        if not args.layout:
+            parser.error("-compile_clip requires a -layout")
+        compile_clip(args.compile_clip[0], args.compile_clip[1], parse_layout(args.layout), args.rle)
+    
+    if args.benchmark_effects:
+        from runtime.Benchmark import Benchmark
+        layout = parse_layout(args.layout or ["Left:64x32", "Right:64x32"])
+        config = Benchmark.layout_config(layout, [f"presets.animations.{effect}" for effect in EFFECTS])
+        results = Benchmark(config, args.frames, args.shared_framebuffers).run()
+        
+        for name, result in results["sets"]["Benchmark"].items():
+            verdict = "holds" if result["fps"] >= args.refresh_rate else "misses"
+            print(f"{name:<10} {result['fps']:8.1f} fps, {verdict} {args.refresh_rate} hz")
+        if args.output:
+            with open(args.output, "w") as output:
+                json.dump(results, output, indent=4)
 
 
 if __name__ == "__main__":
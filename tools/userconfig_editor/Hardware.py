@@ -385,7 +385,9 @@ class Hardware(Frame):
         """
         # TODO, make dynamic
         hardware_list = {
-            "RpiMatrix": "RpiMatrix"
+            "RpiMatrix": "RpiMatrix",
+            "Null": "Null",
+            "Recorder": "Recorder"
         }
 
         return hardware_list